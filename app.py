@@ -11,35 +11,105 @@ logging.basicConfig(level=logging.DEBUG)
 class Base(DeclarativeBase):
     pass
 
-# Create Flask app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
-
-# Configure database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///job_assistant.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-
-# Configure file uploads
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
-
-# Initialize SQLAlchemy
+# Initialize SQLAlchemy; bound to an app by create_app()
 db = SQLAlchemy(model_class=Base)
-db.init_app(app)
 
-# Make datetime available in all templates
-@app.context_processor
-def inject_datetime():
-    from datetime import datetime
-    return {'datetime': datetime}
 
-# Create database tables
-with app.app_context():
-    from models import JobPosting, UserProfile, GeneratedContent
-    db.create_all()
+def create_app(config=None):
+    """Build and configure the Flask app.
 
-# Import routes after models
-import routes
+    Nothing here touches the database schema; call init_db() (or run
+    init_db.py / migrate.py) to create tables and apply migrations. The Gemini
+    SDK and the resume parsers are imported on first use, not here.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+
+    # Configure database
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///job_assistant.db")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+
+    # Configure file uploads
+    app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
+
+    # Configure background jobs
+    app.config['JOB_BACKEND'] = os.environ.get('JOB_BACKEND', 'thread')  # thread, async or inline
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 4))
+    app.config['JOB_MAX_PENDING'] = int(os.environ.get('JOB_MAX_PENDING', 100))
+
+    # Reuse the analysis of a near-duplicate posting: auto, offer (ask first) or off
+    app.config['DUPLICATE_ANALYSIS_REUSE'] = os.environ.get('DUPLICATE_ANALYSIS_REUSE', 'auto')
+
+    # Configure list pagination (?per_page= may ask for up to MAX_PAGE_SIZE rows)
+    app.config['PAGE_SIZE'] = int(os.environ.get('PAGE_SIZE', 25))
+    app.config['MAX_PAGE_SIZE'] = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+    # Sampling profiler for slow requests: profile PROFILER_SAMPLE_RATE of requests
+    # and keep the collapsed stacks of those slower than PROFILER_SLOW_MS, or
+    # profile any request sent with the PROFILER_HEADER: <PROFILER_TOKEN> header
+    app.config['PROFILER_ENABLED'] = os.environ.get('PROFILER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    app.config['PROFILER_SAMPLE_RATE'] = float(os.environ.get('PROFILER_SAMPLE_RATE', 1.0))
+    app.config['PROFILER_INTERVAL_MS'] = float(os.environ.get('PROFILER_INTERVAL_MS', 5))
+    app.config['PROFILER_SLOW_MS'] = float(os.environ.get('PROFILER_SLOW_MS', 500))
+    app.config['PROFILER_DIR'] = os.environ.get('PROFILER_DIR')  # default: instance/profiles
+    app.config['PROFILER_HEADER'] = os.environ.get('PROFILER_HEADER', 'X-Profile')
+    app.config['PROFILER_TOKEN'] = os.environ.get('PROFILER_TOKEN')
+
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+
+    # Make datetime available in all templates
+    @app.context_processor
+    def inject_datetime():
+        from datetime import datetime
+        return {'datetime': datetime}
+
+    with app.app_context():
+        # SQLite connections get decompress_text() for the full-text index triggers
+        from sqlalchemy import event
+        from compression import register_sqlite_functions
+        event.listen(db.engine, 'connect', register_sqlite_functions)
+
+        # Request latency, SQL and Gemini call metrics, served at /metrics
+        import metrics
+        metrics.init_app(app, db.engine)
+
+    # Background jobs keep Gemini round trips off the request workers
+    from jobs import job_queue
+    job_queue.init_app(app)
+
+    import profiler
+    profiler.init_app(app)
+
+    import routes
+    import tasks  # noqa: F401 - registers the background job handlers
+    routes.init_app(app)
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and apply pending migrations."""
+        init_db(app)
+        print("Database schema is up to date")
+
+    return app
+
+
+def init_db(app):
+    """Create missing tables, then bring databases created by older versions up to date"""
+    import models  # noqa: F401 - registers every table on db.metadata
+    from migrations import run_migrations
+
+    with app.app_context():
+        db.create_all()
+        run_migrations(db.engine)
+
+
+def auto_migrate_enabled():
+    """Whether server entry points should run init_db() when they start (AUTO_MIGRATE)"""
+    return os.environ.get('AUTO_MIGRATE', 'true').lower() not in ('0', 'false', 'no')
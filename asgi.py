@@ -0,0 +1,147 @@
+"""ASGI entry point, for serving many concurrent generations from one process.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+/stream/<content_type>/<job_id> is served here as a coroutine on the async
+Gemini client, so an open stream holds no thread while it waits for tokens;
+the posting and profile are loaded, and the result saved, in worker threads.
+Every other route goes to the Flask app through a pool of ASGI_WSGI_WORKERS
+threads. Run it with JOB_BACKEND=async so queued generations share the same
+approach.
+
+Natively served streams are not counted in the /metrics request series (they
+never reach Flask); their LLM calls are.
+"""
+import os
+import re
+import asyncio
+import logging
+from urllib.parse import parse_qs
+from a2wsgi import WSGIMiddleware
+from app import db
+from main import app
+from models import JobPosting
+from gemini_service import JobAssistantService
+from jobs import job_queue
+from profile_cache import get_profile
+from routes import sse_event
+from tasks import save_generated_content, posting_digest
+from text_extraction import text_extractor
+
+STREAM_PATH = re.compile(r'^/stream/(cover_letter|interview_questions)/(\d+)$')
+
+ASYNC_STREAMING_GENERATORS = {
+    'cover_letter': lambda posting, profile, use_cache: JobAssistantService.stream_cover_letter_async(
+        posting['description'], profile, posting['company'], posting['title'], use_cache=use_cache
+    ),
+    'interview_questions': lambda posting, profile, use_cache: JobAssistantService.stream_interview_questions_async(
+        posting['description'], profile, use_cache=use_cache
+    ),
+}
+
+wsgi_application = WSGIMiddleware(app, workers=int(os.environ.get('ASGI_WSGI_WORKERS', 10)))
+
+
+def load_stream_inputs(job_id):
+    """The posting as a dict and the cached profile, or (None, None) if the posting does not exist"""
+    job_posting = db.session.get(JobPosting, job_id)
+    if job_posting is None:
+        return None, None
+    posting = {'id': job_posting.id, 'description': posting_digest(job_posting),
+               'company': job_posting.company, 'title': job_posting.title}
+    return posting, get_profile()
+
+def save_streamed_content(content_type, text, job_posting_id, user_profile_id):
+    try:
+        return save_generated_content(content_type, text, job_posting_id, user_profile_id).id
+    except Exception:
+        db.session.rollback()
+        raise
+
+async def send_event(send, text):
+    await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+async def stream_content(scope, send, content_type, posting, profile):
+    """Async version of routes.stream_content"""
+    use_cache = not parse_qs(scope.get('query_string', b'').decode('latin-1')).get('regenerate')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),  # Disable proxy buffering (nginx)
+        ],
+    })
+    # Send something immediately so proxies and the browser open the stream
+    await send_event(send, ': stream opened\n\n')
+
+    if not profile:
+        await send_event(send, sse_event({'message': 'Please create your profile first.'}, event='failed'))
+    else:
+        chunks = []
+        try:
+            async for chunk in ASYNC_STREAMING_GENERATORS[content_type](posting, profile, use_cache):
+                chunks.append(chunk)
+                await send_event(send, sse_event({'text': chunk}))
+
+            if not chunks:
+                raise ValueError('No content generated.')
+
+            content_id = await job_queue.run_sync(
+                save_streamed_content, content_type, ''.join(chunks), posting['id'], profile.id)
+            url = app.url_map.bind('', script_name=scope.get('root_path') or '/').build(
+                'view_content', {'content_id': content_id})
+            await send_event(send, sse_event({'content_id': content_id, 'url': url}, event='done'))
+
+        except Exception as e:
+            logging.error(f"Error streaming {content_type}: {e}")
+            await send_event(send, sse_event({'message': f'Error generating content: {str(e)}'}, event='failed'))
+
+    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+async def serve_stream(scope, receive, send, content_type, job_id):
+    """Stream until done, or stop generating as soon as the client goes away"""
+    posting, profile = await job_queue.run_sync(load_stream_inputs, job_id)
+    if posting is None:
+        # Let Flask render its usual 404 page
+        await wsgi_application(scope, receive, send)
+        return
+
+    streaming = asyncio.ensure_future(stream_content(scope, send, content_type, posting, profile))
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    await asyncio.wait((streaming, disconnected), return_when=asyncio.FIRST_COMPLETED)
+    for task in (streaming, disconnected):
+        task.cancel()
+    if streaming.done() and not streaming.cancelled() and streaming.exception() is not None:
+        raise streaming.exception()
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            job_queue.shutdown(wait=False)
+            text_extractor.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        match = STREAM_PATH.match(scope['path'])
+        if match:
+            await serve_stream(scope, receive, send, match.group(1), int(match.group(2)))
+            return
+
+    await wsgi_application(scope, receive, send)
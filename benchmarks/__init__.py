@@ -0,0 +1,23 @@
+"""Benchmarks for the Job Application Assistant.
+
+Run ``python -m benchmarks.seed`` to fill a benchmark database with synthetic
+data, then ``python -m benchmarks.run`` to measure route latency, query counts
+and memory against it. Results are written as JSON so runs from different
+commits can be compared with ``python -m benchmarks.compare``.
+"""
+import os
+
+DEFAULT_DATABASE_URL = 'sqlite:///benchmark.db'
+
+
+def configure_environment(database_url=None):
+    """Point the app at the benchmark database and an offline LLM backend.
+
+    Must be called before ``main`` is imported, since the app reads its
+    configuration from the environment at import time.
+    """
+    os.environ['DATABASE_URL'] = database_url or os.environ.get('BENCHMARK_DATABASE_URL', DEFAULT_DATABASE_URL)
+    os.environ.setdefault('LLM_BACKEND', 'stub')
+    os.environ.setdefault('LLM_CACHE_ENABLED', 'false')
+    os.environ.setdefault('GEMINI_RATE_LIMIT', '1000000')
+    os.environ.setdefault('JOB_BACKEND', 'inline')
@@ -0,0 +1,39 @@
+"""Compare two benchmark result files route by route.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_mean', 'peak_memory_kb')
+
+
+def change(before, after):
+    if before in (None, 0) or after is None:
+        return ''
+    return f'{(after - before) / before * 100:+.1f}%'
+
+def main():
+    parser = argparse.ArgumentParser(description='Show per-route differences between two benchmark runs.')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"before: {before['meta'].get('git_revision')}  after: {after['meta'].get('git_revision')}")
+    for route in sorted(set(before['routes']) | set(after['routes'])):
+        old = before['routes'].get(route, {})
+        new = after['routes'].get(route, {})
+        print(route)
+        for metric in METRICS:
+            if metric in old or metric in new:
+                print(f"    {metric:15s} {old.get(metric, '-'):>12}  ->  {new.get(metric, '-'):>12}  "
+                      f"{change(old.get(metric), new.get(metric))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Measure what compressing stored text saves and what it costs per value.
+
+    python -m benchmarks.compression --sample 5000 --database-size
+
+Reads job descriptions and generated content from the benchmark database and
+reports, for each codec, the stored size against the plain UTF-8 size and the
+CPU time added per write (compress) and per read (decompress). With
+--database-size it also compresses a copy of a SQLite database with the
+background migration and compares file sizes after VACUUM.
+
+Seeded content is built from a small vocabulary and compresses far better than
+real postings and resumes; run it against a copy of a real database for
+representative ratios.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from benchmarks import configure_environment
+
+CODECS = [('zlib', 1), ('zlib', 6), ('zlib', 9), ('zstd', 1), ('zstd', 3), ('zstd', 9)]
+
+
+def load_texts(sample):
+    from app import db
+    from main import app
+    from models import JobPosting, GeneratedContent
+
+    with app.app_context():
+        texts = {}
+        for label, column in (('description', JobPosting.description), ('content', GeneratedContent.content)):
+            texts[label] = [value for (value,) in db.session.query(column).limit(sample)]
+    return texts
+
+def measure(texts, codec, level, min_size):
+    from compression import compress_text, decompress_text
+
+    raw_bytes = sum(len(text.encode('utf-8')) for text in texts)
+    started = time.perf_counter()
+    stored = [compress_text(text, codec=codec, level=level, min_size=min_size) for text in texts]
+    write_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for value in stored:
+        decompress_text(value)
+    read_seconds = time.perf_counter() - started
+
+    stored_bytes = sum(len(value) if isinstance(value, bytes) else len(value.encode('utf-8')) for value in stored)
+    return {
+        'codec': f'{codec}-{level}',
+        'raw_bytes': raw_bytes,
+        'stored_bytes': stored_bytes,
+        'ratio': raw_bytes / stored_bytes if stored_bytes else 0.0,
+        'write_us': write_seconds / len(texts) * 1e6,
+        'read_us': read_seconds / len(texts) * 1e6,
+    }
+
+def database_size(database_url, batch_size):
+    """File size of a SQLite database before and after compressing a copy of it"""
+    from sqlalchemy import create_engine, event, text
+    from compression import compress_existing_rows, register_sqlite_functions
+
+    path = database_url.replace('sqlite:///', '', 1)
+    if not os.path.isabs(path):
+        path = os.path.join('instance', path)
+    with tempfile.TemporaryDirectory() as directory:
+        copy = os.path.join(directory, 'compressed.db')
+        shutil.copyfile(path, copy)
+        engine = create_engine(f'sqlite:///{copy}')
+        event.listen(engine, 'connect', register_sqlite_functions)
+        with engine.connect() as connection:
+            connection.execute(text('VACUUM'))
+            before = os.path.getsize(copy)
+            started = time.perf_counter()
+            rewritten = compress_existing_rows(connection, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            connection.execute(text('VACUUM'))
+        engine.dispose()
+        return before, os.path.getsize(copy), rewritten, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark text compression codecs on stored content.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    parser.add_argument('--sample', type=int, default=2000, help='rows of each column to measure')
+    parser.add_argument('--min-size', type=int, default=256, help='values shorter than this stay uncompressed')
+    parser.add_argument('--database-size', action='store_true',
+                        help='also compress a copy of the SQLite database and compare file sizes')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from compression import zstandard
+
+    texts = load_texts(args.sample)
+    for label, values in texts.items():
+        if not values:
+            print(f"No {label} rows to measure")
+            continue
+        print(f"\n{label}: {len(values)} values")
+        print(f"{'codec':10s} {'raw KB':>10s} {'stored KB':>10s} {'ratio':>7s} {'write us':>9s} {'read us':>9s}")
+        for codec, level in CODECS:
+            if codec == 'zstd' and zstandard is None:
+                continue
+            result = measure(values, codec, level, args.min_size)
+            print(f"{result['codec']:10s} {result['raw_bytes'] / 1024:10.1f} {result['stored_bytes'] / 1024:10.1f} "
+                  f"{result['ratio']:7.2f} {result['write_us']:9.1f} {result['read_us']:9.1f}")
+    if zstandard is None:
+        print("\nzstd skipped: the zstandard package is not installed")
+
+    if args.database_size:
+        database_url = os.environ['DATABASE_URL']
+        if not database_url.startswith('sqlite:///'):
+            print("\n--database-size only supports SQLite databases")
+            return
+        before, after, rewritten, elapsed = database_size(database_url, args.batch_size)
+        print(f"\nDatabase file: {before / 1048576:.1f} MB -> {after / 1048576:.1f} MB "
+              f"({rewritten} rows compressed in {elapsed:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Compare how many generations one process keeps in flight, threaded versus async.
+
+    python -m benchmarks.concurrency --requests 100 --latency-ms 500
+
+Two measurements, both against the stub LLM backend with a fixed latency:
+
+* jobs: queue ``--requests`` cover letter jobs with JOB_BACKEND=thread
+  (JOB_WORKERS threads) and with JOB_BACKEND=async, and time until all finish.
+* streams: open ``--requests`` SSE streams at once, through the Flask app with
+  ``--threads`` request threads (like a gunicorn gthread worker) and through
+  asgi.application (uvicorn), and time until all complete.
+
+Peak in flight is the most stub LLM calls waiting at the same time.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks import configure_environment
+
+
+def run_jobs(backend, count, job_posting_id, user_profile_id):
+    from app import db
+    from main import app
+    from models import BackgroundJob
+    from jobs import job_queue
+
+    app.config['JOB_BACKEND'] = backend
+    app.config['JOB_MAX_PENDING'] = max(app.config['JOB_MAX_PENDING'], count)
+    with app.app_context():
+        started = time.perf_counter()
+        job_ids = [job_queue.submit('cover_letter', job_posting_id=job_posting_id,
+                                    user_profile_id=user_profile_id, use_cache=False)
+                   for _ in range(count)]
+        while True:
+            db.session.expire_all()
+            jobs = db.session.query(BackgroundJob).filter(BackgroundJob.id.in_(job_ids)).all()
+            if all(job.is_done for job in jobs):
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+    failed = sum(job.status != 'finished' for job in jobs)
+    return elapsed, failed
+
+def run_threaded_streams(count, threads, job_posting_id):
+    from main import app
+
+    def stream(_):
+        with app.test_client() as client:
+            return b'event: done' in client.get(f'/stream/cover_letter/{job_posting_id}?regenerate=1').data
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        done = sum(executor.map(stream, range(count)))
+    return time.perf_counter() - started, count - done
+
+def run_async_streams(count, job_posting_id):
+    import httpx
+    from asgi import application
+
+    async def main():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+            responses = await asyncio.gather(*[
+                client.get(f'/stream/cover_letter/{job_posting_id}?regenerate=1') for _ in range(count)
+            ])
+        return sum('event: done' in response.text for response in responses)
+
+    started = time.perf_counter()
+    done = asyncio.run(main())
+    return time.perf_counter() - started, count - done
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare threaded and async generation concurrency.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    parser.add_argument('--requests', type=int, default=100, help='generations started at once')
+    parser.add_argument('--latency-ms', type=float, default=500.0, help='stub LLM latency per call')
+    parser.add_argument('--workers', type=int, default=4, help='JOB_WORKERS for the thread backend')
+    parser.add_argument('--threads', type=int, default=8, help='request threads for threaded streaming')
+    parser.add_argument('--skip-jobs', action='store_true')
+    parser.add_argument('--skip-streams', action='store_true')
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app import db
+    from main import app
+    from models import JobPosting, UserProfile
+    import gemini_service
+
+    app.config['JOB_WORKERS'] = args.workers
+    gemini_service.backend.latency_ms = args.latency_ms
+    with app.app_context():
+        job_posting_id = db.session.query(JobPosting.id).order_by(JobPosting.id).limit(1).scalar()
+        user_profile_id = db.session.query(UserProfile.id).order_by(UserProfile.id).limit(1).scalar()
+    if job_posting_id is None or user_profile_id is None:
+        print("The benchmark database needs a job posting and a profile; run python -m benchmarks.seed first")
+        return
+
+    runs = []
+    if not args.skip_jobs:
+        runs.append((f'jobs, thread ({args.workers} workers)',
+                     lambda: run_jobs('thread', args.requests, job_posting_id, user_profile_id)))
+        runs.append(('jobs, async', lambda: run_jobs('async', args.requests, job_posting_id, user_profile_id)))
+    if not args.skip_streams:
+        runs.append((f'streams, Flask ({args.threads} threads)',
+                     lambda: run_threaded_streams(args.requests, args.threads, job_posting_id)))
+        runs.append(('streams, ASGI', lambda: run_async_streams(args.requests, job_posting_id)))
+
+    print(f"{args.requests} generations, {args.latency_ms:.0f} ms stub latency\n")
+    print(f"{'mode':32s} {'seconds':>8s} {'gen/s':>7s} {'peak in flight':>15s} {'failed':>7s}")
+    for label, run in runs:
+        gemini_service.backend.peak_in_flight = 0
+        elapsed, failed = run()
+        print(f"{label:32s} {elapsed:8.2f} {args.requests / elapsed:7.1f} "
+              f"{gemini_service.backend.peak_in_flight:15d} {failed:7d}")
+
+
+if __name__ == '__main__':
+    main()
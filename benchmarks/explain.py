@@ -0,0 +1,92 @@
+"""Print the query plan of every SQL statement the read-heavy routes issue.
+
+    python -m benchmarks.explain > plans.txt
+
+Each route is requested once through the test client while statements are
+recorded, then each distinct statement is re-run under EXPLAIN QUERY PLAN
+(SQLite) or EXPLAIN (PostgreSQL) with the parameters it was issued with.
+"""
+import re
+import argparse
+import logging
+from benchmarks import configure_environment
+
+
+def capture_statements(app, db, url):
+    """Distinct (statement, parameters) pairs issued while serving ``url``"""
+    from sqlalchemy import event
+
+    seen = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            seen.setdefault(statement, parameters)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        app.test_client().get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return list(seen.items())
+
+def explain(db, statement, parameters):
+    prefix = 'EXPLAIN ' if db.engine.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN '
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+
+    if db.engine.dialect.name == 'postgresql':
+        return [row[0] for row in rows]
+    # SQLite rows are (id, parent, notused, detail); indent children under their parent
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Show query plans for the statements behind each route.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app import db
+    from main import app
+    from models import JobApplication, GeneratedContent
+    from pagination import encode_cursor
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        posting_id = db.session.query(GeneratedContent.job_posting_id).filter(
+            GeneratedContent.job_posting_id.isnot(None)).limit(1).scalar()
+        application = db.session.query(JobApplication.id, JobApplication.application_date).first()
+        content = db.session.query(GeneratedContent.id, GeneratedContent.created_at).first()
+
+        routes = [
+            '/applications',
+            '/applications?status=Offer',
+            '/applications?sort=company',
+            '/history',
+            '/customize_resume',
+        ]
+        if application:
+            routes.append(f'/applications?cursor={encode_cursor((application.application_date, application.id))}')
+            routes.append(f'/applications/{application.id}')
+        if content:
+            routes.append(f'/history?cursor={encode_cursor((content.created_at, content.id))}')
+        if posting_id:
+            routes.append(f'/application_kit/{posting_id}')
+
+        print(f"-- {db.engine.dialect.name} {app.config['SQLALCHEMY_DATABASE_URI']}")
+        for url in routes:
+            print(f"\n== GET {url}")
+            for statement, parameters in capture_statements(app, db, url):
+                # The select list adds nothing to the plan, so keep only FROM onwards
+                print('\n' + re.sub(r'^SELECT .*? FROM ', 'SELECT ... FROM ', ' '.join(statement.split())))
+                for line in explain(db, statement, parameters):
+                    print('    ' + line)
+
+
+if __name__ == '__main__':
+    main()
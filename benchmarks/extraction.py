@@ -0,0 +1,108 @@
+"""Time resume text extraction: inline in the request thread versus the process pool and cache.
+
+    python -m benchmarks.extraction --pages 20 --runs 3
+
+Builds a synthetic text PDF and extracts it the way upload_resume used to
+(page by page in the calling thread, with no limits), then with
+text_extraction.TextExtractor cold (empty cache) and warm (same file uploaded
+again). A second, --long-pages PDF shows the page cap bounding the work.
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = ('python', 'engineer', 'delivered', 'platform', 'team', 'design', 'customer', 'data',
+         'pipeline', 'reduced', 'latency', 'service', 'migrated', 'led', 'built', 'analytics')
+
+
+def make_pdf(pages, lines_per_page=45, seed=7):
+    """A minimal, valid PDF with ``pages`` pages of Helvetica text"""
+    rng = random.Random(seed)
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for _ in range(pages):
+        lines = [' '.join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+        stream = 'BT /F1 10 Tf 12 TL 40 800 Td ' + ' '.join(f'({line}) Tj T*' for line in lines) + ' ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream'.encode('latin-1'))
+        content_id = len(objects)
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {content_id} 0 R '
+                       f'/Resources << /Font << /F1 3 0 R >> >> >>'.encode('latin-1'))
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects[1] = f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode('latin-1')
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n'.encode('latin-1') + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1'))
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode('latin-1'))
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1'))
+    return out.getvalue()
+
+def extract_inline(data):
+    """What upload_resume did before: every page in the calling thread, concatenated with +="""
+    import PyPDF2
+    text_content = ''
+    for page in PyPDF2.PdfReader(io.BytesIO(data)).pages:
+        text_content += page.extract_text()
+    return text_content
+
+def upload(data, filename='resume.pdf'):
+    from werkzeug.datastructures import FileStorage
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+def timed(func, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resume text extraction.')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--long-pages', type=int, default=300, help='pages in the oversized PDF')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None, help='defaults to EXTRACTION_WORKERS')
+    args = parser.parse_args()
+
+    from llm_cache import ResponseCache
+    from text_extraction import TextExtractor, EXTRACTION_WORKERS, EXTRACTION_MAX_PAGES
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(path=os.path.join(directory, 'extraction.db'))
+        uncached = TextExtractor(workers=args.workers or EXTRACTION_WORKERS)
+        cached = TextExtractor(workers=args.workers or EXTRACTION_WORKERS, cache=cache)
+        # Start the worker processes outside the timings
+        uncached.extract_upload(upload(make_pdf(1)))
+        cached.extract_upload(upload(make_pdf(1)))
+
+        print(f"{'document':18s} {'method':22s} {'ms':>9s} {'chars':>9s}")
+        for label, pages in ((f'{args.pages} pages', args.pages), (f'{args.long_pages} pages', args.long_pages)):
+            data = make_pdf(pages)
+            rows = [
+                ('inline (before)', lambda: extract_inline(data)),
+                (f'pool, {uncached.workers} workers', lambda: uncached.extract_upload(upload(data))),
+                ('pool, cached', lambda: cached.extract_upload(upload(data))),
+            ]
+            for method, func in rows:
+                seconds, text = timed(func, args.runs)
+                print(f"{label:18s} {method:22s} {seconds * 1000:9.1f} {len(text):9d}")
+        print(f"\nThe pool extracts at most EXTRACTION_MAX_PAGES={EXTRACTION_MAX_PAGES} pages per document.")
+        uncached.shutdown()
+        cached.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Report how many prompt tokens the job and profile digests save, per call type.
+
+    python -m benchmarks.prompt_digest --postings 200
+
+Builds the resume customization, cover letter and interview prompts for the
+first --postings postings of the benchmark database and the profile, once with
+the full description and profile (PROMPT_DIGESTS_ENABLED=false) and once with
+the digests, and prints the estimated prompt tokens of each. Digests are
+stored on the postings as they would be in use; --job-tokens and
+--profile-tokens override the budgets.
+"""
+import argparse
+import statistics
+from benchmarks import configure_environment
+
+OPERATIONS = ('resume_customization', 'cover_letter', 'interview_questions')
+
+
+def build_prompt(operation, job_text, profile, posting):
+    from gemini_service import JobAssistantService
+
+    if operation == 'resume_customization':
+        return JobAssistantService._resume_customization_prompt(job_text, profile)
+    if operation == 'cover_letter':
+        return JobAssistantService._cover_letter_prompt(job_text, profile, posting.company, posting.title)
+    return JobAssistantService._interview_questions_prompt(job_text, profile)
+
+def main():
+    parser = argparse.ArgumentParser(description='Report prompt token savings from job and profile digests.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    parser.add_argument('--postings', type=int, default=200)
+    parser.add_argument('--job-tokens', type=int, help='defaults to JOB_DIGEST_TOKENS')
+    parser.add_argument('--profile-tokens', type=int, help='defaults to PROFILE_DIGEST_TOKENS')
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from main import app
+    from models import JobPosting
+    from profile_cache import get_profile
+    from tasks import posting_digest
+    import prompt_digest
+
+    if args.job_tokens:
+        prompt_digest.JOB_DIGEST_TOKENS = args.job_tokens
+    if args.profile_tokens:
+        prompt_digest.PROFILE_DIGEST_TOKENS = args.profile_tokens
+
+    tokens = {(operation, mode): [] for operation in OPERATIONS for mode in ('full', 'digest')}
+    with app.app_context():
+        profile = get_profile()
+        postings = JobPosting.query.order_by(JobPosting.id).limit(args.postings).all()
+        if profile is None or not postings:
+            print("The benchmark database needs job postings and a profile; run python -m benchmarks.seed first")
+            return
+
+        for mode, enabled in (('full', False), ('digest', True)):
+            prompt_digest.PROMPT_DIGESTS_ENABLED = enabled
+            for posting in postings:
+                job_text = posting_digest(posting)
+                for operation in OPERATIONS:
+                    prompt = build_prompt(operation, job_text, profile, posting)
+                    tokens[(operation, mode)].append(prompt_digest.estimate_tokens(prompt))
+        from_analysis = sum(posting.digest_key.startswith('analysis:') for posting in postings)
+
+    print(f"{len(postings)} postings ({from_analysis} digested from a job analysis), "
+          f"budgets: job {prompt_digest.JOB_DIGEST_TOKENS}, profile {prompt_digest.PROFILE_DIGEST_TOKENS} tokens\n")
+    print(f"{'operation':22s} {'full':>8s} {'digest':>8s} {'saved':>8s} {'saved %':>8s}")
+    for operation in OPERATIONS:
+        full = statistics.mean(tokens[(operation, 'full')])
+        digest = statistics.mean(tokens[(operation, 'digest')])
+        print(f"{operation:22s} {full:8.0f} {digest:8.0f} {full - digest:8.0f} {(full - digest) / full:8.1%}")
+    print("\nMean estimated prompt tokens per call (four characters per token).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""Drive the Flask app with its test client and record per-route performance.
+
+    python -m benchmarks.run --iterations 50 --output benchmark-results.json
+
+Reports p50/p95/p99 latency, SQL queries per request and peak Python memory
+per request for each route, using the offline stub LLM backend.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks import configure_environment
+from benchmarks.seed import COMPANIES
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def build_scenarios(app, db, rng):
+    """(name, method, url factory, form data factory) tuples for every benchmarked route"""
+    from models import JobPosting, JobApplication, GeneratedContent
+    from pagination import encode_cursor
+
+    with app.app_context():
+        posting_ids = [row[0] for row in db.session.query(JobPosting.id).order_by(db.func.random()).limit(500)]
+        application_ids = [row[0] for row in db.session.query(JobApplication.id).order_by(db.func.random()).limit(500)]
+
+        # Cursors pointing near the end of each listing, to check deep pages stay as fast as the first
+        last_application = db.session.query(JobApplication.application_date, JobApplication.id).order_by(
+            JobApplication.application_date.asc(), JobApplication.id.asc()).offset(10).first()
+        last_content = db.session.query(GeneratedContent.created_at, GeneratedContent.id).order_by(
+            GeneratedContent.created_at.asc(), GeneratedContent.id.asc()).offset(10).first()
+
+    if not posting_ids:
+        raise SystemExit('The benchmark database is empty. Run `python -m benchmarks.seed` first.')
+
+    def job_form():
+        return {'job_id': rng.choice(posting_ids)}
+
+    scenarios = [
+        ('GET /applications', 'GET', lambda: '/applications', None),
+        ('GET /applications?status=Offer', 'GET', lambda: '/applications?status=Offer', None),
+        ('GET /applications?sort=company', 'GET', lambda: '/applications?sort=company', None),
+        ('GET /history', 'GET', lambda: '/history', None),
+        ('GET /customize_resume', 'GET', lambda: '/customize_resume', None),
+        ('GET /customize_resume?view=ranked', 'GET', lambda: '/customize_resume?view=ranked', None),
+        ('GET /search?q=<company>', 'GET', lambda: f'/search?q={rng.choice(COMPANIES)}', None),
+        ('POST /analyze_job', 'POST', lambda: '/analyze_job', lambda: {
+            'job_title': 'Benchmark Engineer',
+            'company_name': 'Benchmark Co',
+            'job_description': f'Benchmark posting {rng.random()} requiring python, sql and flask.',
+        }),
+        ('POST /process_resume_customization', 'POST', lambda: '/process_resume_customization', job_form),
+        ('POST /process_cover_letter', 'POST', lambda: '/process_cover_letter', job_form),
+        ('POST /process_interview_prep', 'POST', lambda: '/process_interview_prep', job_form),
+    ]
+    if last_application:
+        cursor = encode_cursor(tuple(last_application))
+        scenarios.insert(1, ('GET /applications (last page)', 'GET', lambda: f'/applications?cursor={cursor}', None))
+    if last_content:
+        cursor = encode_cursor(tuple(last_content))
+        scenarios.insert(-5, ('GET /history (last page)', 'GET', lambda: f'/history?cursor={cursor}', None))
+    if application_ids:
+        scenarios.insert(3, ('GET /applications/<id>', 'GET',
+                             lambda: f'/applications/{rng.choice(application_ids)}', None))
+    return scenarios
+
+def run_scenario(client, counter, method, url_factory, data_factory, iterations, warmup, track_memory):
+    latencies = []
+    queries = []
+    peaks = []
+    statuses = {}
+
+    for i in range(warmup + iterations):
+        url = url_factory()
+        data = data_factory() if data_factory else None
+
+        if track_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        counter.count = 0
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(counter.count)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if track_memory:
+            peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+
+    latencies.sort()
+    result = {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+    if track_memory:
+        result['peak_memory_kb'] = round(max(peaks), 1)
+    return result
+
+def run(iterations=30, warmup=3, only=None, track_memory=True, seed_value=1234):
+    from app import db
+    from main import app
+    from models import JobPosting, GeneratedContent, JobApplication
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(seed_value)
+    scenarios = build_scenarios(app, db, rng)
+    if only:
+        scenarios = [scenario for scenario in scenarios if any(name in scenario[0] for name in only)]
+
+    with app.app_context():
+        counts = {
+            'job_postings': db.session.query(db.func.count(JobPosting.id)).scalar(),
+            'applications': db.session.query(db.func.count(JobApplication.id)).scalar(),
+            'generated_content': db.session.query(db.func.count(GeneratedContent.id)).scalar(),
+        }
+        counter = QueryCounter(db.engine)
+
+    if track_memory:
+        tracemalloc.start()
+
+    client = app.test_client()
+    routes = {}
+    for name, method, url_factory, data_factory in scenarios:
+        routes[name] = run_scenario(client, counter, method, url_factory, data_factory,
+                                    iterations, warmup, track_memory)
+        summary = routes[name]
+        print(f"{name:45s} p50 {summary['p50_ms']:9.2f} ms  p95 {summary['p95_ms']:9.2f} ms  "
+              f"p99 {summary['p99_ms']:9.2f} ms  queries {summary['queries_mean']:7.1f}")
+
+    if track_memory:
+        tracemalloc.stop()
+
+    return {
+        'meta': {
+            'git_revision': git_revision(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database_url': app.config['SQLALCHEMY_DATABASE_URI'],
+            'llm_backend': os.environ.get('LLM_BACKEND'),
+            'job_backend': app.config.get('JOB_BACKEND'),
+            'iterations': iterations,
+            'warmup': warmup,
+            'row_counts': counts,
+        },
+        'routes': routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Flask routes against the seeded database.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', action='append', help='only run routes whose name contains this text')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc (it slows every request)')
+    parser.add_argument('--llm-latency-ms', type=float, help='stub LLM latency per call (default: 0)')
+    parser.add_argument('--output', default='benchmark-results.json')
+    args = parser.parse_args()
+
+    if args.llm_latency_ms is not None:
+        os.environ['LLM_STUB_LATENCY_MS'] = str(args.llm_latency_ms)
+    configure_environment(args.database_url)
+
+    results = run(iterations=args.iterations, warmup=args.warmup, only=args.only,
+                  track_memory=not args.no_memory)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
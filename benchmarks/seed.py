@@ -0,0 +1,151 @@
+"""Fill the benchmark database with synthetic postings, applications and content.
+
+    python -m benchmarks.seed --postings 100000 --applications 100000 --content 100000
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks import configure_environment
+
+STATUSES = ('Applied', 'Phone Screen', 'Interview', 'Technical Round', 'Final Round',
+            'Offer', 'Accepted', 'Rejected', 'Withdrawn')
+CONTENT_TYPES = ('job_analysis', 'resume_customization', 'cover_letter', 'interview_questions')
+TITLES = ('Software Engineer', 'Senior Backend Engineer', 'Data Scientist', 'Product Manager',
+          'DevOps Engineer', 'Frontend Developer', 'Machine Learning Engineer', 'QA Engineer')
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+             'Wonka', 'Cyberdyne', 'Tyrell')
+WORDS = ('python', 'flask', 'sql', 'kubernetes', 'aws', 'react', 'teamwork', 'ownership', 'testing',
+         'design', 'scalable', 'distributed', 'customers', 'mentoring', 'analytics', 'communication')
+
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def insert_batches(db, model, rows, batch_size):
+    """Insert generated rows with executemany in fixed-size batches"""
+    from sqlalchemy import insert
+
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(insert(model), batch)
+            db.session.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        count += len(batch)
+    return count
+
+def seed(postings, applications, contents, description_words=250, content_words=400,
+         batch_size=5000, reset=False, seed_value=42):
+    from app import db
+    from main import app
+    from models import JobPosting, UserProfile, GeneratedContent, JobApplication
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        if reset:
+            from migrations import reset_database
+            reset_database(db.engine)
+
+        profile = UserProfile.query.first()
+        if not profile:
+            profile = UserProfile(
+                name='Benchmark User',
+                email='benchmark@example.com',
+                summary=paragraph(rng, 60),
+                experience=paragraph(rng, 400),
+                education=paragraph(rng, 80),
+                skills=paragraph(rng, 80),
+                projects=paragraph(rng, 300),
+                certifications=paragraph(rng, 40),
+            )
+            db.session.add(profile)
+            db.session.commit()
+
+        first_posting_id = (db.session.query(db.func.max(JobPosting.id)).scalar() or 0) + 1
+
+        started = time.perf_counter()
+        created = insert_batches(db, JobPosting, (
+            {
+                'title': rng.choice(TITLES),
+                'company': rng.choice(COMPANIES),
+                'description': paragraph(rng, description_words),
+                'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            }
+            for _ in range(postings)
+        ), batch_size)
+        print(f"Inserted {created} job postings in {time.perf_counter() - started:.1f}s")
+
+        last_posting_id = db.session.query(db.func.max(JobPosting.id)).scalar() or 0
+        if last_posting_id < first_posting_id:
+            first_posting_id = 1
+        if not last_posting_id:
+            print("No job postings available; skipping applications and content")
+            return
+
+        started = time.perf_counter()
+        created = insert_batches(db, JobApplication, (
+            {
+                'job_posting_id': rng.randint(first_posting_id, last_posting_id),
+                'user_profile_id': profile.id,
+                'status': rng.choice(STATUSES),
+                'application_date': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                'location': rng.choice(('Remote', 'New York', 'London', 'Berlin')),
+                'job_type': rng.choice(('Full-time', 'Contract', 'Remote')),
+                'notes': paragraph(rng, 20),
+                'created_at': now,
+                'updated_at': now,
+            }
+            for _ in range(applications)
+        ), batch_size)
+        print(f"Inserted {created} applications in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        created = insert_batches(db, GeneratedContent, (
+            {
+                'content_type': rng.choice(CONTENT_TYPES),
+                'content': paragraph(rng, content_words),
+                'job_posting_id': rng.randint(first_posting_id, last_posting_id),
+                'user_profile_id': profile.id,
+                'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            }
+            for _ in range(contents)
+        ), batch_size)
+        print(f"Inserted {created} generated content rows in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed the benchmark database with synthetic data.')
+    parser.add_argument('--database-url', help='defaults to BENCHMARK_DATABASE_URL or sqlite:///benchmark.db')
+    parser.add_argument('--postings', type=int, default=10000)
+    parser.add_argument('--applications', type=int, default=10000)
+    parser.add_argument('--content', type=int, default=10000)
+    parser.add_argument('--description-words', type=int, default=250)
+    parser.add_argument('--content-words', type=int, default=400)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    import main  # noqa: F401 - configures logging, so quieten it afterwards
+    logging.getLogger().setLevel(logging.WARNING)
+    seed(args.postings, args.applications, args.content,
+         description_words=args.description_words,
+         content_words=args.content_words,
+         batch_size=args.batch_size,
+         reset=args.reset,
+         seed_value=args.seed)
+
+
+if __name__ == '__main__':
+    main()
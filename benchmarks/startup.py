@@ -0,0 +1,93 @@
+"""Measure cold start: how long a fresh interpreter takes to import the app.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --source /path/to/older/checkout
+
+Each target runs in a new Python process with ``-X importtime``. The report
+shows wall time (median of --runs), the packages that took longest to import
+(self time summed over each package's modules), and whether the optional heavy dependencies (Gemini SDK, PDF and
+Word parsers, numpy) were loaded. --source points at another checkout of the
+repository, e.g. a ``git worktree`` of an older commit, to compare the two.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a web worker, a CLI script building the app, and a bare model import each pay
+TARGETS = [
+    ('main (server)', 'import main'),
+    ('create_app()', 'from app import create_app; create_app()'),
+    ('models', 'import models'),
+]
+
+HEAVY_MODULES = ('google.genai', 'PyPDF2', 'docx', 'numpy')
+
+
+def parse_importtime(stderr):
+    """{top-level package: self microseconds} and the set of imported modules"""
+    packages = defaultdict(int)
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules.add(name)
+        packages[name.split('.')[0]] += int(self_us)
+    return packages, modules
+
+def run_target(source, statement, environment):
+    code = (f'import sys, time; sys.path.insert(0, {source!r}); started = time.perf_counter(); '
+            f'{statement}; print(time.perf_counter() - started)')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=source, env=environment,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f'{statement!r} failed: {errors[-1] if errors else result.returncode}')
+    seconds = float(result.stdout.strip().splitlines()[-1])
+    packages, modules = parse_importtime(result.stderr)
+    return seconds, packages, modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how long a fresh process takes to import the app.')
+    parser.add_argument('--source', default=REPO_ROOT, help='checkout to measure (default: this one)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='heaviest packages to list per target')
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.source)
+    with tempfile.TemporaryDirectory() as directory:
+        environment = dict(os.environ)
+        # A database that already exists, as on any start after the first
+        environment.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(directory, "startup.db")}')
+        environment.setdefault('LLM_BACKEND', 'stub')
+        run_target(source, 'import main', environment)
+
+        print(f"Source: {source}\n")
+        for label, statement in TARGETS:
+            timings = []
+            try:
+                for _ in range(args.runs):
+                    seconds, packages, modules = run_target(source, statement, environment)
+                    timings.append(seconds)
+            except RuntimeError as e:
+                # e.g. create_app() on a checkout from before the app factory
+                print(f"{label}: skipped ({e})\n")
+                continue
+            loaded = [name for name in HEAVY_MODULES if name in modules]
+            print(f"{label}: {statistics.median(timings) * 1000:.0f} ms median of {args.runs} "
+                  f"(min {min(timings) * 1000:.0f} ms)")
+            print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+            for name, microseconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"  {name:24s} {microseconds / 1000:8.1f} ms")
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import os
+import csv
+import json
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import insert, exists, and_
+from app import db
+from models import JobPosting, GeneratedContent, BulkImport
+from gemini_service import JobAssistantService
+from resilience import TokenBucket
+from dedup import fingerprint_missing
+
+# Accepted column names for each JobPosting field, in order of preference
+FIELD_ALIASES = {
+    'title': ('title', 'job_title', 'position'),
+    'company': ('company', 'company_name', 'employer'),
+    'description': ('description', 'job_description', 'body'),
+    'requirements': ('requirements', 'qualifications'),
+}
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def iter_records(path):
+    """Stream raw records from a CSV or JSONL file without loading it into memory"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            for row in csv.DictReader(f):
+                yield row
+        elif extension in ('.jsonl', '.ndjson'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported import format '{extension}'. Use .csv or .jsonl")
+
+def normalize_record(record):
+    """Map a raw record onto JobPosting columns, or return None if it is unusable"""
+    posting = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((record[alias] for alias in aliases if record.get(alias)), '')
+        posting[field] = str(value).strip()
+
+    if not posting['description']:
+        return None
+
+    posting['title'] = (posting['title'] or 'Untitled position')[:200]
+    posting['company'] = (posting['company'] or 'Unknown company')[:100]
+    posting['requirements'] = posting['requirements'] or None
+    return posting
+
+def import_file(path, batch_size=500, on_progress=None):
+    """Insert postings from a CSV/JSONL file in batches and return the BulkImport record.
+
+    Re-importing the same file resumes after the last committed batch instead of
+    inserting duplicates.
+    """
+    source_hash = file_hash(path)
+    bulk_import = BulkImport.query.filter_by(source_hash=source_hash).first()
+    if not bulk_import:
+        bulk_import = BulkImport(source_name=os.path.basename(path), source_hash=source_hash)
+        db.session.add(bulk_import)
+        db.session.commit()
+
+    if bulk_import.status != 'importing':
+        return bulk_import
+
+    already_read = bulk_import.rows_read
+    batch = []
+    skipped = 0
+    rows_seen = 0
+
+    def flush():
+        nonlocal batch, skipped
+        if batch:
+            db.session.execute(insert(JobPosting), batch)
+        # The checkpoint commits in the same transaction as the rows it covers
+        bulk_import.rows_read = rows_seen
+        bulk_import.rows_skipped += skipped
+        bulk_import.postings_created += len(batch)
+        db.session.commit()
+        batch = []
+        skipped = 0
+        if on_progress:
+            on_progress(bulk_import)
+
+    for rows_seen, record in enumerate(iter_records(path), start=1):
+        if rows_seen <= already_read:
+            continue
+
+        posting = normalize_record(record)
+        if posting is None:
+            skipped += 1
+            continue
+
+        posting['bulk_import_id'] = bulk_import.id
+        batch.append(posting)
+        if len(batch) >= batch_size:
+            flush()
+
+    if rows_seen > bulk_import.rows_read:
+        flush()
+
+    # Fingerprint the new postings so later pastes of the same role are recognized
+    fingerprint_missing(batch_size=batch_size)
+
+    bulk_import.status = 'analyzing'
+    db.session.commit()
+    return bulk_import
+
+def pending_analysis_query(bulk_import):
+    """Postings from an import that don't have a job analysis yet"""
+    has_analysis = exists().where(and_(
+        GeneratedContent.job_posting_id == JobPosting.id,
+        GeneratedContent.content_type == 'job_analysis'
+    ))
+    return JobPosting.query.filter(
+        JobPosting.bulk_import_id == bulk_import.id,
+        ~has_analysis
+    ).order_by(JobPosting.id)
+
+def analyze_import(bulk_import, concurrency=4, rate_per_minute=60, use_cache=True, on_progress=None):
+    """Run job analysis over every unanalyzed posting of an import.
+
+    Calls go through a bounded thread pool and a shared rate limiter. Each result
+    is committed as soon as it arrives, so an interrupted run only repeats the
+    calls that were in flight.
+    """
+    limiter = TokenBucket(rate_per_minute, per=60.0)
+    failed_ids = set()
+
+    def analyze(description):
+        limiter.acquire()
+        return JobAssistantService.analyze_job_posting(description, use_cache=use_cache)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-analysis') as executor:
+        while True:
+            query = pending_analysis_query(bulk_import)
+            if failed_ids:
+                query = query.filter(JobPosting.id.notin_(failed_ids))
+            pending = query.with_entities(JobPosting.id, JobPosting.description).limit(concurrency * 25).all()
+            if not pending:
+                break
+
+            in_flight = {}
+            for posting_id, description in pending:
+                in_flight[executor.submit(analyze, description)] = posting_id
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    posting_id = in_flight.pop(future)
+                    try:
+                        analysis = future.result()
+                    except Exception as e:
+                        logging.error(f"Error analyzing imported posting {posting_id}: {e}")
+                        failed_ids.add(posting_id)
+                        bulk_import.analysis_failures += 1
+                        db.session.commit()
+                        continue
+
+                    content = GeneratedContent()
+                    content.content_type = 'job_analysis'
+                    content.content = analysis
+                    content.job_posting_id = posting_id
+                    db.session.add(content)
+                    bulk_import.postings_analyzed += 1
+                    db.session.commit()
+
+                if on_progress:
+                    on_progress(bulk_import)
+
+    if not failed_ids:
+        bulk_import.status = 'finished'
+        db.session.commit()
+    return bulk_import
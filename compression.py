@@ -0,0 +1,148 @@
+import os
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.types import Text, TypeDecorator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressed values are stored as bytes starting with a NUL byte and a codec id.
+# Text never starts with NUL, so plain strings written before compression was
+# enabled (or values too short to be worth compressing) still read back as-is.
+ZLIB_HEADER = b'\x00z'
+ZSTD_HEADER = b'\x00s'
+
+TEXT_COMPRESSION = os.environ.get('TEXT_COMPRESSION', 'zlib').lower()  # zlib, zstd or none
+TEXT_COMPRESSION_LEVEL = os.environ.get('TEXT_COMPRESSION_LEVEL')
+TEXT_COMPRESSION_MIN_SIZE = int(os.environ.get('TEXT_COMPRESSION_MIN_SIZE', 256))
+
+if TEXT_COMPRESSION == 'zstd' and zstandard is None:
+    logging.warning("TEXT_COMPRESSION=zstd but the zstandard package is not installed; using zlib")
+    TEXT_COMPRESSION = 'zlib'
+
+_local = threading.local()
+
+
+def _zstd_compressor(level):
+    # zstandard contexts are not thread-safe, so each thread keeps its own
+    compressors = _local.__dict__.setdefault('zstd_compressors', {})
+    if level not in compressors:
+        compressors[level] = zstandard.ZstdCompressor(level=level)
+    return compressors[level]
+
+def _zstd_decompressor():
+    if not hasattr(_local, 'zstd_decompressor'):
+        _local.zstd_decompressor = zstandard.ZstdDecompressor()
+    return _local.zstd_decompressor
+
+def compress_text(value, codec=None, level=None, min_size=None):
+    """Encode a string for storage: compressed bytes, or the string itself when that is smaller"""
+    codec = codec or TEXT_COMPRESSION
+    min_size = TEXT_COMPRESSION_MIN_SIZE if min_size is None else min_size
+    if value is None or codec == 'none' or len(value) < min_size:
+        return value
+
+    level = level if level is not None else TEXT_COMPRESSION_LEVEL
+    raw = value.encode('utf-8')
+    if codec == 'zstd':
+        stored = ZSTD_HEADER + _zstd_compressor(int(level) if level is not None else 3).compress(raw)
+    elif codec == 'zlib':
+        stored = ZLIB_HEADER + zlib.compress(raw, int(level) if level is not None else 6)
+    else:
+        raise ValueError(f"Unknown text compression codec: {codec}")
+    return stored if len(stored) < len(raw) else value
+
+def decompress_text(value):
+    """Decode a stored value written by compress_text, or by any earlier version of the app"""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value.startswith(ZLIB_HEADER):
+        return zlib.decompress(value[2:]).decode('utf-8')
+    if value.startswith(ZSTD_HEADER):
+        if zstandard is None:
+            raise RuntimeError("A value was stored with zstd compression; install the zstandard package to read it")
+        return _zstd_decompressor().decompress(value[2:]).decode('utf-8')
+    return value.decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    """Text column compressed with zlib or zstd (TEXT_COMPRESSION) on write.
+
+    Only applies to SQLite, which stores the bytes as a BLOB in the existing
+    TEXT column. PostgreSQL already compresses large text values itself
+    (TOAST) and its full-text search columns are computed from the plain
+    text, so values are passed through unchanged there.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != 'sqlite':
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+def register_sqlite_functions(dbapi_connection, connection_record):
+    """Make decompress_text() callable from SQL, for the full-text index triggers and views"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('decompress_text', 1, decompress_text, deterministic=True)
+
+def connect_sqlite(path, **kwargs):
+    """sqlite3.connect() for scripts that use the app's SQLite database without SQLAlchemy.
+
+    The full-text index triggers on job_posting and generated_content call
+    decompress_text(), so a plain sqlite3 connection (or the sqlite3 shell)
+    can read those tables but fails with "no such function" when writing them.
+    """
+    connection = sqlite3.connect(path, **kwargs)
+    register_sqlite_functions(connection, None)
+    return connection
+
+def compressed_columns():
+    from models import JobPosting, GeneratedContent
+
+    return [JobPosting.__table__.c.description, GeneratedContent.__table__.c.content]
+
+def compress_existing_rows(connection, batch_size=500, pause=0.0):
+    """Compress rows written before compression was enabled, one short transaction per batch.
+
+    Safe to run while the app is serving requests and to interrupt: rows are
+    visited in id order and only plain-text values are rewritten, so a rerun
+    picks up where the last one stopped. Returns how many rows were rewritten.
+    """
+    if connection.dialect.name != 'sqlite' or TEXT_COMPRESSION == 'none':
+        return 0
+
+    rewritten = 0
+    for column in compressed_columns():
+        table = column.table
+        statement = update(table).where(table.c.id == bindparam('row_id')).values({column.name: bindparam('value')})
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                select(table.c.id, column)
+                .where(table.c.id > last_id, func.typeof(column) == 'text',
+                       func.length(column) >= TEXT_COMPRESSION_MIN_SIZE)
+                .order_by(table.c.id).limit(batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            connection.execute(statement, [{'row_id': row_id, 'value': value} for row_id, value in rows])
+            connection.commit()
+            last_id = rows[-1][0]
+            rewritten += len(rows)
+            logging.info(f"Compressed {rewritten} rows ({table.name} up to id {last_id})")
+            if pause:
+                time.sleep(pause)
+    return rewritten
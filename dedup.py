@@ -0,0 +1,132 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+import numpy as np
+from app import db
+from models import JobPosting, GeneratedContent, PostingFingerprint, PostingBand
+
+# MinHash signature of word 3-shingles, split into LSH bands. Two postings land
+# in the same bucket of at least one band with probability 1 - (1 - s^ROWS)^BANDS
+# for Jaccard similarity s: about 0.98 at s=0.9, 0.5 at s=0.77, 0.02 at s=0.5.
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+BANDS = 8
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes, with
+# coefficients small enough that the products never overflow uint64
+_PRIME = np.uint64(4294967311)
+_random = np.random.RandomState(20240601)
+_A = _random.randint(1, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_B = _random.randint(0, 2 ** 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', 0.85))
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the distinct word 3-grams in a text"""
+    words = re.findall(r'\w+', (text or '').lower())
+    if len(words) < SHINGLE_SIZE:
+        words = [' '.join(words)]
+        count = 1
+    else:
+        count = len(words) - SHINGLE_SIZE + 1
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(count)}
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                       dtype=np.uint64, count=len(shingles))
+
+def minhash(text):
+    """MinHash signature (NUM_PERMUTATIONS uint64 values) of a text"""
+    hashes = shingle_hashes(text)
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+def band_keys(signature):
+    """One bucket key per LSH band"""
+    return [
+        f'{band}:' + hashlib.blake2b(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(),
+                                     digest_size=8).hexdigest()
+        for band in range(BANDS)
+    ]
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.mean(signature == other))
+
+def fingerprint_posting(job_posting):
+    """Add the posting's signature and band rows to the session. The posting must have an id."""
+    signature = minhash(f'{job_posting.title}\n{job_posting.description}')
+    db.session.add(PostingFingerprint(job_posting_id=job_posting.id, signature=signature.tobytes()))
+    db.session.add_all([PostingBand(band_key=key, job_posting_id=job_posting.id) for key in band_keys(signature)])
+    return signature
+
+def fingerprint_missing(connection=None, batch_size=500):
+    """Fingerprint every posting that has no signature yet. Returns how many were added."""
+    from sqlalchemy import insert, select
+
+    bind = connection if connection is not None else db.session
+    added = 0
+    while True:
+        rows = bind.execute(
+            select(JobPosting.id, JobPosting.title, JobPosting.description)
+            .where(~JobPosting.id.in_(select(PostingFingerprint.job_posting_id)))
+            .order_by(JobPosting.id).limit(batch_size)
+        ).fetchall()
+        if not rows:
+            break
+
+        fingerprints, bands = [], []
+        for posting_id, title, description in rows:
+            signature = minhash(f'{title}\n{description}')
+            fingerprints.append({'job_posting_id': posting_id, 'signature': signature.tobytes()})
+            bands.extend({'band_key': key, 'job_posting_id': posting_id} for key in band_keys(signature))
+        bind.execute(insert(PostingFingerprint), fingerprints)
+        bind.execute(insert(PostingBand), bands)
+        if connection is None:
+            db.session.commit()
+        added += len(rows)
+        logging.info(f"Fingerprinted {added} job postings")
+    return added
+
+def find_duplicates(job_posting, threshold=None, limit=5):
+    """Earlier postings that look like the same role, as (posting, similarity), most similar first.
+
+    Candidates come from an indexed lookup of the posting's LSH bucket keys, so
+    the cost depends on the number of near matches, not the number of postings.
+    """
+    threshold = DUPLICATE_THRESHOLD if threshold is None else threshold
+    fingerprint = db.session.get(PostingFingerprint, job_posting.id)
+    if fingerprint is None:
+        signature = fingerprint_posting(job_posting)
+    else:
+        signature = np.frombuffer(fingerprint.signature, dtype=np.uint64)
+
+    candidates = db.session.query(PostingFingerprint).filter(
+        PostingFingerprint.job_posting_id.in_(
+            db.session.query(PostingBand.job_posting_id).filter(
+                PostingBand.band_key.in_(band_keys(signature)),
+                PostingBand.job_posting_id != job_posting.id
+            )
+        )
+    ).all()
+
+    scored = sorted(
+        ((similarity(signature, np.frombuffer(candidate.signature, dtype=np.uint64)), candidate.job_posting_id)
+         for candidate in candidates),
+        reverse=True
+    )
+    scored = [(score, posting_id) for score, posting_id in scored if score >= threshold][:limit]
+    postings = {posting.id: posting for posting in
+                JobPosting.query.filter(JobPosting.id.in_([posting_id for _, posting_id in scored]))}
+    return [(postings[posting_id], score) for score, posting_id in scored if posting_id in postings]
+
+def reusable_analysis(job_posting, threshold=None):
+    """The newest job analysis of the most similar earlier posting, as (content, posting, similarity)"""
+    for duplicate, score in find_duplicates(job_posting, threshold=threshold):
+        analysis = GeneratedContent.query.filter_by(
+            job_posting_id=duplicate.id, content_type='job_analysis'
+        ).order_by(GeneratedContent.created_at.desc()).first()
+        if analysis:
+            return analysis, duplicate, score
+    return None
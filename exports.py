@@ -0,0 +1,82 @@
+import re
+import zipfile
+from sqlalchemy import or_, select
+from app import db
+from models import JobPosting, GeneratedContent
+
+# The earliest timestamp a ZIP entry can hold
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+class ZipStream:
+    """Write-only file object that hands out whatever ZipFile has written so far.
+
+    ZipFile falls back to data descriptors when its output cannot seek, so an
+    archive can be sent while it is being built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def slugify(text, max_length=60):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', text or '').strip('-').lower()
+    return slug[:max_length].rstrip('-') or 'untitled'
+
+def archive_name(row):
+    """Path of an exported row inside the archive: one folder per job posting"""
+    if row.posting_id is not None:
+        folder = f'{row.posting_id}-{slugify(f"{row.title} {row.company}")}'
+    else:
+        folder = 'other'
+    return f'{folder}/{row.content_type}_{row.id}.txt'
+
+def entry_date_time(created_at):
+    """ZIP date_time for a row, ZIP_EPOCH when it has no timestamp or one the format can't store"""
+    if created_at is None:
+        return ZIP_EPOCH
+    return max(created_at.timetuple()[:6], ZIP_EPOCH)
+
+def content_export_query(job_posting_id=None, user_profile_id=None):
+    """Select GeneratedContent for one posting, or for a profile plus its job analyses, oldest first"""
+    statement = select(
+        GeneratedContent.id, GeneratedContent.content_type, GeneratedContent.content, GeneratedContent.created_at,
+        JobPosting.id.label('posting_id'), JobPosting.title, JobPosting.company
+    ).outerjoin(JobPosting, GeneratedContent.job_posting_id == JobPosting.id)
+    if job_posting_id is not None:
+        statement = statement.where(GeneratedContent.job_posting_id == job_posting_id)
+    if user_profile_id is not None:
+        # Job analyses are not tied to a profile
+        statement = statement.where(or_(GeneratedContent.user_profile_id == user_profile_id,
+                                        GeneratedContent.user_profile_id.is_(None)))
+    return statement.order_by(GeneratedContent.id)
+
+def stream_zip(statement, batch_size=100):
+    """Yield a ZIP archive of the selected GeneratedContent rows, one entry at a time.
+
+    Rows are fetched ``batch_size`` at a time with ``yield_per`` as plain
+    tuples (no ORM objects) and each entry is compressed and sent before the
+    next row is read, so memory use does not grow with the size of the archive
+    (only the small per-entry central directory records are kept to the end).
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for row in db.session.execute(statement.execution_options(yield_per=batch_size)):
+            info = zipfile.ZipInfo(archive_name(row), date_time=entry_date_time(row.created_at))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as entry:
+                entry.write(row.content.encode('utf-8'))
+            yield stream.drain()
+    yield stream.drain()
@@ -1,48 +1,407 @@
 import os
+import time
+import asyncio
 import logging
-from google import genai
-from google.genai import types
 from dotenv import load_dotenv
+from llm_backends import backend_from_env
+from llm_cache import cache_from_env
+from resilience import TokenBucket, RetryPolicy, CircuitBreaker, CircuitOpenError
+from metrics import (registry, record_llm_call, record_llm_cache_hit, record_llm_json_response,
+                     record_prompt_digest_savings)
+import prompt_digest
+from json_stream import JSONFieldStream
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Gemini client
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    logging.error("GEMINI_API_KEY not found in environment variables.")
-    raise ValueError("GEMINI_API_KEY is required but not set in environment variables")
+# LLM backend: Gemini by default, or an offline stub with LLM_BACKEND=stub.
+# The Gemini client is only created (and GEMINI_API_KEY required) on first use.
+backend = backend_from_env()
 
-# Create client instance
-client = genai.Client(api_key=api_key)
+def set_backend(new_backend):
+    """Swap the LLM backend, e.g. for a StubBackend in benchmarks"""
+    global backend
+    backend = new_backend
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+# Responses are cached by model + prompt so unchanged postings and profiles skip the round trip
+response_cache = cache_from_env()
+
+# Resilience: one rate limiter, retry policy and circuit breaker shared by every thread in the process
+rate_limiter = TokenBucket(rate=float(os.getenv("GEMINI_RATE_LIMIT", 60)), per=60.0)
+retry_policy = RetryPolicy(
+    max_attempts=int(os.getenv("GEMINI_MAX_ATTEMPTS", 3)),
+    base_delay=float(os.getenv("GEMINI_RETRY_BASE_DELAY", 1.0)),
+    max_delay=float(os.getenv("GEMINI_RETRY_MAX_DELAY", 30.0))
+)
+circuit_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5)),
+    recovery_timeout=float(os.getenv("GEMINI_BREAKER_RESET", 30.0))
+)
+
+# Profile fields included in generation prompts, as (label, attribute)
+PROMPT_FIELDS = (
+    ('Name', 'name'),
+    ('Summary', 'summary'),
+    ('Experience', 'experience'),
+    ('Education', 'education'),
+    ('Skills', 'skills'),
+    ('Projects', 'projects'),
+    ('Certifications', 'certifications'),
+)
+INTERVIEW_PROMPT_FIELDS = PROMPT_FIELDS[2:3] + PROMPT_FIELDS[4:]
+
+# Profile fields parse_resume extracts, as (field, description for the model)
+RESUME_FIELDS = (
+    ('name', 'Full name as plain text'),
+    ('email', 'Email address as plain text'),
+    ('phone', 'Phone number as plain text'),
+    ('summary', 'Professional summary as plain text paragraph'),
+    ('experience', 'All work experience formatted as plain text with line breaks. Include job titles, companies, dates, and responsibilities'),
+    ('education', 'All education details formatted as plain text with line breaks. Include degrees, institutions, dates, GPA, coursework'),
+    ('skills', 'All skills formatted as plain text with categories and bullet points or comma-separated'),
+    ('projects', 'All projects formatted as plain text with line breaks. For each project include: name, description, technologies, role, achievements'),
+    ('certifications', 'All certifications formatted as plain text with line breaks. For each include: name, organization, date obtained, expiration'),
+)
+
+def resume_schema(fields=None):
+    """Response schema for parse_resume: a string for each of ``fields`` (default: all of RESUME_FIELDS)"""
+    names = [field for field, _ in RESUME_FIELDS if fields is None or field in fields]
+    return {
+        'type': 'OBJECT',
+        'properties': {field: {'type': 'STRING', 'description': description}
+                       for field, description in RESUME_FIELDS if field in names},
+        'required': names,
+        # Fields stream in this order, so parse_resume can report each one as it completes
+        'property_ordering': names,
+    }
+
+def format_prompt_block(profile, fields=PROMPT_FIELDS, indent='', tokens=None):
+    """'Label: value' lines for a profile, joined for embedding in a prompt at ``indent``.
+
+    With ``tokens``, long values are shortened to share that budget (the profile digest),
+    and the block is a Digest that remembers how many tokens that saved.
+    """
+    if tokens is None:
+        values = [(label, getattr(profile, attribute)) for label, attribute in fields]
+        return ('\n' + indent).join(f'{label}: {value}' for label, value in values)
+
+    values = prompt_digest.profile_values(profile, fields, tokens)
+    saved = (sum(prompt_digest.estimate_tokens(getattr(profile, attribute)) for _, attribute in fields)
+             - sum(prompt_digest.estimate_tokens(value) for _, value in values))
+    return prompt_digest.Digest(('\n' + indent).join(f'{label}: {value}' for label, value in values), saved)
+
+def profile_digest_tokens():
+    """Token budget for the profile in generation prompts, or None when digests are turned off"""
+    return prompt_digest.PROFILE_DIGEST_TOKENS if prompt_digest.PROMPT_DIGESTS_ENABLED else None
+
+class GenerationError(Exception):
+    """Raised when the AI service could not produce content"""
+
+def failure_reason(error):
+    """Short, low-cardinality label for why an LLM call failed"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return f'http_{code}'
+    return type(error).__name__
+
+@registry.collector
+def service_metrics():
+    """Response cache and resilience counters, read when /metrics is scraped"""
+    cache = response_cache.stats()
+    limiter = rate_limiter.stats()
+    retries = retry_policy.stats()
+    breaker = circuit_breaker.stats()
+    return [
+        ('llm_cache_lookups_total', 'counter', 'Response cache lookups, by result',
+         [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])]),
+        ('llm_cache_stores_total', 'counter', 'Responses written to the response cache', [({}, cache['stores'])]),
+        ('llm_cache_evictions_total', 'counter', 'Responses evicted from the response cache',
+         [({}, cache['evictions'])]),
+        ('llm_rate_limiter_throttled_total', 'counter', 'Calls that waited for a rate limiter token',
+         [({}, limiter['throttled'])]),
+        ('llm_rate_limiter_wait_seconds_total', 'counter', 'Time spent waiting for rate limiter tokens',
+         [({}, float(limiter['wait_seconds']))]),
+        ('llm_retries_total', 'counter', 'Retried LLM calls', [({}, retries['retries'])]),
+        ('llm_retries_exhausted_total', 'counter', 'LLM calls that failed after every retry',
+         [({}, retries['exhausted'])]),
+        ('llm_circuit_breaker_state', 'gauge', 'Circuit breaker state (1 for the current one)',
+         [({'state': state}, int(breaker['state'] == state))
+          for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)]),
+        ('llm_circuit_breaker_rejected_total', 'counter', 'Calls rejected by the open circuit breaker',
+         [({}, breaker['rejected'])]),
+    ]
+
+def is_retryable(error):
+    """Whether an error is transient and worth retrying"""
+    return backend.is_retryable(error)
+
+def cache_model_name(schema=None):
+    """Model identifier used in response cache keys; JSON-mode responses are kept apart from free text"""
+    return backend.cache_prefix + MODEL_NAME + (':json' if schema is not None else '')
+
+def call_with_resilience(func):
+    """Call the Gemini API through the circuit breaker, rate limiter and retry policy"""
+    circuit_breaker.before_call()
+
+    def attempt():
+        rate_limiter.acquire()
+        return func()
+
+    try:
+        result = retry_policy.call(attempt, is_retryable)
+    except Exception as e:
+        # Only transient failures say anything about upstream health
+        if is_retryable(e):
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.release()
+        raise
+
+    circuit_breaker.record_success()
+    return result
+
+async def call_with_resilience_async(func):
+    """call_with_resilience() for a coroutine function; waits for tokens and retries on the event loop"""
+    circuit_breaker.before_call()
+
+    async def attempt():
+        await rate_limiter.acquire_async()
+        return await func()
+
+    try:
+        result = await retry_policy.call_async(attempt, is_retryable)
+    except Exception as e:
+        if is_retryable(e):
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.release()
+        raise
+
+    circuit_breaker.record_success()
+    return result
+
+async def _cache_get_async(prompt):
+    # The response cache is a SQLite file, so its lookups stay off the event loop
+    if not response_cache.enabled:
+        return None
+    return await asyncio.to_thread(response_cache.get, cache_model_name(), prompt)
+
+async def _cache_set_async(prompt, text):
+    if response_cache.enabled:
+        await asyncio.to_thread(response_cache.set, cache_model_name(), prompt, text)
 
 class JobAssistantService:
 
     @staticmethod
-    def _generate_content(prompt):
-        """Helper function to generate content with error handling"""
+    def _profile_block(user_profile, fields, indent, tokens=None):
+        """The profile section of a prompt, prebuilt when the profile comes from the profile cache"""
+        if hasattr(user_profile, 'prompt_block'):
+            return user_profile.prompt_block(fields, indent, tokens)
+        return format_prompt_block(user_profile, fields, indent, tokens)
+
+    @staticmethod
+    def _digest_prompt(prompt, *parts):
+        """The prompt as a Digest carrying the tokens its job and profile digests kept out of it"""
+        return prompt_digest.Digest(prompt, sum(getattr(part, 'tokens_saved', 0) for part in parts))
+
+    @staticmethod
+    def _generate_content(prompt, use_cache=True, operation='generate', schema=None):
+        """Helper function to generate content with error handling.
+
+        Set use_cache=False to bypass the response cache and force a fresh generation.
+        Raises GenerationError if no content could be generated. ``operation``
+        labels the call in the /metrics LLM series, which also count the
+        tokens a Digest prompt saved once the backend has answered it. With a
+        ``schema`` the response is JSON matching it (the backend's structured
+        output mode).
+        """
+        if use_cache:
+            cached = response_cache.get(cache_model_name(schema), prompt)
+            if cached is not None:
+                logging.debug("Serving generated content from the response cache.")
+                record_llm_cache_hit(operation)
+                return cached
+
+        started = time.perf_counter()
         try:
-            response = client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=prompt
-            )
+            text = call_with_resilience(lambda: backend.generate(MODEL_NAME, prompt, schema))
+        except CircuitOpenError as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='circuit_open')
+            raise GenerationError(str(e)) from e
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure=failure_reason(e))
+            logging.error(f"Error during content generation: {e}")
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
 
-            if not response.text:
-                logging.warning("Content generation resulted in an empty response.")
-                return "Analysis failed: No content generated."
+        if not text:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='empty_response')
+            logging.warning("Content generation resulted in an empty response.")
+            raise GenerationError("No content was generated. Please try again.")
 
-            return response.text
+        record_llm_call(operation, time.perf_counter() - started, prompt, text, backend.last_usage())
+        record_prompt_digest_savings(operation, getattr(prompt, 'tokens_saved', 0))
 
+        # Only successful generations are cached; a fresh result always refreshes the entry
+        response_cache.set(cache_model_name(schema), prompt, text)
+        return text
+
+    @staticmethod
+    def _stream_content(prompt, use_cache=True, operation='generate', schema=None):
+        """Yield generated text chunks as they arrive from the streaming API.
+
+        Cached responses are yielded in a single chunk. Only opening the stream is
+        retried; an error once chunks have been sent raises GenerationError, since
+        a partially sent response can't be replaced. The full text is cached once
+        the stream completes.
+        """
+        if use_cache:
+            cached = response_cache.get(cache_model_name(schema), prompt)
+            if cached is not None:
+                logging.debug("Serving streamed content from the response cache.")
+                record_llm_cache_hit(operation)
+                yield cached
+                return
+
+        def open_stream():
+            # The request is only sent when the first chunk is pulled, so that is what gets retried
+            stream = iter(backend.generate_stream(MODEL_NAME, prompt, schema))
+            return next(stream, None), stream
+
+        started = time.perf_counter()
+        try:
+            first_chunk, stream = call_with_resilience(open_stream)
+        except CircuitOpenError as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='circuit_open')
+            raise GenerationError(str(e)) from e
         except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure=failure_reason(e))
+            logging.error(f"Error starting content stream: {e}")
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
+
+        chunks = []
+        try:
+            if first_chunk:
+                chunks.append(first_chunk)
+                yield first_chunk
+            for chunk in stream:
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, ''.join(chunks),
+                            failure=failure_reason(e))
+            logging.error(f"Error while streaming content: {e}")
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
+
+        if not chunks:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='empty_response')
+            logging.warning("Streamed content generation resulted in an empty response.")
+            raise GenerationError("No content was generated. Please try again.")
+
+        text = ''.join(chunks)
+        record_llm_call(operation, time.perf_counter() - started, prompt, text, backend.last_usage())
+        record_prompt_digest_savings(operation, getattr(prompt, 'tokens_saved', 0))
+        response_cache.set(cache_model_name(schema), prompt, text)
+
+    @staticmethod
+    async def _generate_content_async(prompt, use_cache=True, operation='generate'):
+        """_generate_content() as a coroutine, using the backend's async client.
+
+        Waiting on the API holds no thread, so one event loop can keep many
+        generations in flight at once.
+        """
+        if use_cache:
+            cached = await _cache_get_async(prompt)
+            if cached is not None:
+                logging.debug("Serving generated content from the response cache.")
+                record_llm_cache_hit(operation)
+                return cached
+
+        started = time.perf_counter()
+        try:
+            text = await call_with_resilience_async(lambda: backend.agenerate(MODEL_NAME, prompt))
+        except CircuitOpenError as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='circuit_open')
+            raise GenerationError(str(e)) from e
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure=failure_reason(e))
             logging.error(f"Error during content generation: {e}")
-            return f"Error during content generation: {str(e)}"
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
+
+        if not text:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='empty_response')
+            logging.warning("Content generation resulted in an empty response.")
+            raise GenerationError("No content was generated. Please try again.")
+
+        record_llm_call(operation, time.perf_counter() - started, prompt, text, backend.last_usage())
+        record_prompt_digest_savings(operation, getattr(prompt, 'tokens_saved', 0))
+        await _cache_set_async(prompt, text)
+        return text
 
     @staticmethod
-    def parse_resume(resume_text):
-        """Parse resume and extract structured information including projects and certifications"""
+    async def _stream_content_async(prompt, use_cache=True, operation='generate'):
+        """_stream_content() as an async generator, using the backend's async client"""
+        if use_cache:
+            cached = await _cache_get_async(prompt)
+            if cached is not None:
+                logging.debug("Serving streamed content from the response cache.")
+                record_llm_cache_hit(operation)
+                yield cached
+                return
+
+        async def open_stream():
+            stream = backend.agenerate_stream(MODEL_NAME, prompt)
+            try:
+                return await anext(stream), stream
+            except StopAsyncIteration:
+                return None, stream
+
+        started = time.perf_counter()
+        try:
+            first_chunk, stream = await call_with_resilience_async(open_stream)
+        except CircuitOpenError as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='circuit_open')
+            raise GenerationError(str(e)) from e
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure=failure_reason(e))
+            logging.error(f"Error starting content stream: {e}")
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
+
+        chunks = []
         try:
-            prompt = f"""
+            if first_chunk:
+                chunks.append(first_chunk)
+                yield first_chunk
+            async for chunk in stream:
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception as e:
+            record_llm_call(operation, time.perf_counter() - started, prompt, ''.join(chunks),
+                            failure=failure_reason(e))
+            logging.error(f"Error while streaming content: {e}")
+            raise GenerationError(f"Error during content generation: {str(e)}") from e
+
+        if not chunks:
+            record_llm_call(operation, time.perf_counter() - started, prompt, failure='empty_response')
+            logging.warning("Streamed content generation resulted in an empty response.")
+            raise GenerationError("No content was generated. Please try again.")
+
+        text = ''.join(chunks)
+        record_llm_call(operation, time.perf_counter() - started, prompt, text, backend.last_usage())
+        record_prompt_digest_savings(operation, getattr(prompt, 'tokens_saved', 0))
+        await _cache_set_async(prompt, text)
+
+    @staticmethod
+    def _parse_resume_prompt(resume_text, fields=None):
+        """Build the resume parsing prompt, asking for ``fields`` (default: all of RESUME_FIELDS)"""
+        template = ',\n'.join(f'                "{field}": "{description}"'
+                              for field, description in RESUME_FIELDS if fields is None or field in fields)
+        prompt = f"""
             Parse the following resume text and extract the information in a structured JSON format.
             
             Resume Text:
@@ -53,15 +412,7 @@ class JobAssistantService:
             Format lists as bullet points or comma-separated text.
             
             {{
-                "name": "Full name as plain text",
-                "email": "Email address as plain text",
-                "phone": "Phone number as plain text",
-                "summary": "Professional summary as plain text paragraph",
-                "experience": "All work experience formatted as plain text with line breaks. Include job titles, companies, dates, and responsibilities",
-                "education": "All education details formatted as plain text with line breaks. Include degrees, institutions, dates, GPA, coursework",
-                "skills": "All skills formatted as plain text with categories and bullet points or comma-separated",
-                "projects": "All projects formatted as plain text with line breaks. For each project include: name, description, technologies, role, achievements",
-                "certifications": "All certifications formatted as plain text with line breaks. For each include: name, organization, date obtained, expiration"
+{template}
             }}
             
             IMPORTANT: Return everything as plain text strings, not as nested JSON objects or arrays.
@@ -70,61 +421,56 @@ class JobAssistantService:
             If any field is not found in the resume, set it to an empty string.
             Return ONLY the JSON object, no additional text.
             """
-            
-            response = JobAssistantService._generate_content(prompt)
-            
-            # Try to parse JSON response
-            try:
-                # Clean the response if it has markdown code blocks
-                cleaned_response = response.strip()
-                if cleaned_response.startswith('```json'):
-                    cleaned_response = cleaned_response[7:]
-                if cleaned_response.startswith('```'):
-                    cleaned_response = cleaned_response[3:]
-                if cleaned_response.endswith('```'):
-                    cleaned_response = cleaned_response[:-3]
-                cleaned_response = cleaned_response.strip()
-                
-                parsed_data = json.loads(cleaned_response)
-                
+        return prompt
+
+    @staticmethod
+    def parse_resume(resume_text, use_cache=True, fields=None, on_field=None):
+        """Parse resume and extract structured information including projects and certifications.
+
+        The model is held to resume_schema(), and the JSON is parsed as it
+        streams: on_field(field, value) is called as each field completes.
+        ``fields`` limits the extraction to some profile fields, e.g. when only
+        some sections of a resume changed. Returns the fields that arrived
+        complete; a response cut off part way keeps the fields before the cut.
+        Raises GenerationError when no field could be read.
+        """
+        try:
+            prompt = JobAssistantService._parse_resume_prompt(resume_text, fields)
+            schema = resume_schema(fields)
+            parser = JSONFieldStream()
+            for chunk in JobAssistantService._stream_content(prompt, use_cache=use_cache, operation='parse_resume',
+                                                              schema=schema):
+                for field, value in parser.feed(chunk):
+                    if on_field:
+                        on_field(field, value)
+
+            if parser.complete:
+                record_llm_json_response('parse_resume', 'complete')
+            else:
+                # Don't serve the broken response again; the next upload asks afresh
+                response_cache.delete(cache_model_name(schema), prompt)
+                record_llm_json_response('parse_resume', 'partial' if parser.fields else 'failed')
+                logging.error(f"Resume parse response was not complete JSON ({parser.error or 'truncated'}); "
+                              f"kept {len(parser.fields)} fields")
+                if not parser.fields:
+                    raise GenerationError("The resume could not be read. Please try again.")
+
+            parsed_data = {}
+            for key, value in parser.fields.items():
+                if fields is not None and key not in fields:
+                    continue
                 # Ensure all values are strings
-                for key, value in parsed_data.items():
-                    if isinstance(value, (dict, list)):
-                        parsed_data[key] = json.dumps(value, indent=2)
-                
-                return parsed_data
-            except json.JSONDecodeError as e:
-                logging.error(f"Failed to parse JSON response: {e}")
-                # Return a fallback structure with the raw text
-                return {
-                    "name": "",
-                    "email": "",
-                    "phone": "",
-                    "summary": response[:500],
-                    "experience": "",
-                    "education": "",
-                    "skills": "",
-                    "projects": "",
-                    "certifications": ""
-                }
-                
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, indent=2)
+                parsed_data[key] = '' if value is None else str(value)
+            return parsed_data
         except Exception as e:
             logging.error(f"Error parsing resume: {e}")
-            return {
-                "name": "",
-                "email": "",
-                "phone": "",
-                "summary": f"Error parsing resume: {str(e)}",
-                "experience": "",
-                "education": "",
-                "skills": "",
-                "projects": "",
-                "certifications": ""
-            }
-
-    @staticmethod
-    def analyze_job_posting(job_description):
-        """Analyze job posting and extract key requirements and skills"""
+            raise
+
+    @staticmethod
+    def _job_analysis_prompt(job_description):
+        """Build the job analysis prompt"""
         prompt = f"""
         Analyze the following job posting and provide a detailed breakdown:
         
@@ -143,113 +489,311 @@ class JobAssistantService:
         
         Format your response in clear sections with bullet points.
         """
-        return JobAssistantService._generate_content(prompt)
+        return prompt
+
+    @staticmethod
+    def analyze_job_posting(job_description, use_cache=True):
+        """Analyze job posting and extract key requirements and skills"""
+        prompt = JobAssistantService._job_analysis_prompt(job_description)
+        return JobAssistantService._generate_content(prompt, use_cache=use_cache, operation='job_analysis')
+
+    @staticmethod
+    async def analyze_job_posting_async(job_description, use_cache=True):
+        """analyze_job_posting() on the async client"""
+        prompt = JobAssistantService._job_analysis_prompt(job_description)
+        return await JobAssistantService._generate_content_async(prompt, use_cache=use_cache, operation='job_analysis')
 
     @staticmethod
-    def customize_resume(job_description, user_profile):
+    def _resume_customization_prompt(job_description, user_profile):
+        """Build the resume customization prompt"""
+        profile_block = JobAssistantService._profile_block(
+            user_profile, PROMPT_FIELDS, ' ' * 8, profile_digest_tokens())
+        prompt = f"""
+        Based on the job posting and user profile below, provide specific suggestions to customize the resume:
+        
+        Job Posting:
+        {job_description}
+        
+        User Profile:
+        {profile_block}
+        
+        Please provide:
+        1. Suggested changes to the professional summary
+        2. Skills to highlight or add
+        3. Experience points to emphasize
+        4. Which projects to highlight and how to describe them
+        5. Which certifications to emphasize
+        6. Keywords to include for ATS optimization
+        7. Sections to reorganize or prioritize
+        8. Any gaps to address or downplay
+        
+        Make the suggestions specific and actionable.
+        """
+        return JobAssistantService._digest_prompt(prompt, job_description, profile_block)
+
+    @staticmethod
+    def customize_resume(job_description, user_profile, use_cache=True):
         """Generate customized resume suggestions based on job requirements"""
         try:
-            prompt = f"""
-            Based on the job posting and user profile below, provide specific suggestions to customize the resume:
-            
-            Job Posting:
-            {job_description}
+            prompt = JobAssistantService._resume_customization_prompt(job_description, user_profile)
             
-            User Profile:
-            Name: {user_profile.name}
-            Summary: {user_profile.summary}
-            Experience: {user_profile.experience}
-            Education: {user_profile.education}
-            Skills: {user_profile.skills}
-            Projects: {user_profile.projects}
-            Certifications: {user_profile.certifications}
-            
-            Please provide:
-            1. Suggested changes to the professional summary
-            2. Skills to highlight or add
-            3. Experience points to emphasize
-            4. Which projects to highlight and how to describe them
-            5. Which certifications to emphasize
-            6. Keywords to include for ATS optimization
-            7. Sections to reorganize or prioritize
-            8. Any gaps to address or downplay
-            
-            Make the suggestions specific and actionable.
-            """
-            
-            return JobAssistantService._generate_content(prompt)
+            return JobAssistantService._generate_content(prompt, use_cache=use_cache, operation='resume_customization')
             
         except Exception as e:
             logging.error(f"Error customizing resume: {e}")
-            return f"Error customizing resume: {str(e)}"
+            raise
 
     @staticmethod
-    def generate_cover_letter(job_description, user_profile, company_name, position_title):
+    async def customize_resume_async(job_description, user_profile, use_cache=True):
+        """customize_resume() on the async client"""
+        try:
+            prompt = JobAssistantService._resume_customization_prompt(job_description, user_profile)
+            return await JobAssistantService._generate_content_async(
+                prompt, use_cache=use_cache, operation='resume_customization')
+        except Exception as e:
+            logging.error(f"Error customizing resume: {e}")
+            raise
+
+    @staticmethod
+    def _cover_letter_prompt(job_description, user_profile, company_name, position_title):
+        """Build the cover letter prompt"""
+        profile_block = JobAssistantService._profile_block(
+            user_profile, PROMPT_FIELDS, ' ' * 8, profile_digest_tokens())
+        prompt = f"""
+        Generate a professional cover letter for the following job application:
+        
+        Position: {position_title}
+        Company: {company_name}
+        
+        Job Description:
+        {job_description}
+        
+        Candidate Profile:
+        {profile_block}
+        
+        Please write a compelling cover letter that:
+        1. Opens with a strong introduction
+        2. Highlights relevant experience and projects
+        3. Mentions relevant certifications if applicable
+        4. Demonstrates knowledge of the company
+        5. Shows enthusiasm for the role
+        6. Closes with a call to action
+        
+        Keep it professional, concise (3-4 paragraphs), and tailored to this specific position.
+        """
+        return JobAssistantService._digest_prompt(prompt, job_description, profile_block)
+
+    @staticmethod
+    def generate_cover_letter(job_description, user_profile, company_name, position_title, use_cache=True):
         """Generate a personalized cover letter"""
         try:
-            prompt = f"""
-            Generate a professional cover letter for the following job application:
-            
-            Position: {position_title}
-            Company: {company_name}
-            
-            Job Description:
-            {job_description}
-            
-            Candidate Profile:
-            Name: {user_profile.name}
-            Summary: {user_profile.summary}
-            Experience: {user_profile.experience}
-            Education: {user_profile.education}
-            Skills: {user_profile.skills}
-            Projects: {user_profile.projects}
-            Certifications: {user_profile.certifications}
-            
-            Please write a compelling cover letter that:
-            1. Opens with a strong introduction
-            2. Highlights relevant experience and projects
-            3. Mentions relevant certifications if applicable
-            4. Demonstrates knowledge of the company
-            5. Shows enthusiasm for the role
-            6. Closes with a call to action
-            
-            Keep it professional, concise (3-4 paragraphs), and tailored to this specific position.
-            """
+            prompt = JobAssistantService._cover_letter_prompt(
+                job_description, user_profile, company_name, position_title
+            )
             
-            return JobAssistantService._generate_content(prompt)
+            return JobAssistantService._generate_content(prompt, use_cache=use_cache, operation='cover_letter')
             
         except Exception as e:
             logging.error(f"Error generating cover letter: {e}")
-            return f"Error generating cover letter: {str(e)}"
+            raise
+
+    @staticmethod
+    def stream_cover_letter(job_description, user_profile, company_name, position_title, use_cache=True):
+        """Stream a personalized cover letter as it is generated"""
+        prompt = JobAssistantService._cover_letter_prompt(
+            job_description, user_profile, company_name, position_title
+        )
+        return JobAssistantService._stream_content(prompt, use_cache=use_cache, operation='cover_letter')
+
+    @staticmethod
+    async def generate_cover_letter_async(job_description, user_profile, company_name, position_title,
+                                          use_cache=True):
+        """generate_cover_letter() on the async client"""
+        try:
+            prompt = JobAssistantService._cover_letter_prompt(
+                job_description, user_profile, company_name, position_title
+            )
+            return await JobAssistantService._generate_content_async(
+                prompt, use_cache=use_cache, operation='cover_letter')
+        except Exception as e:
+            logging.error(f"Error generating cover letter: {e}")
+            raise
+
+    @staticmethod
+    def stream_cover_letter_async(job_description, user_profile, company_name, position_title, use_cache=True):
+        """stream_cover_letter() as an async generator"""
+        prompt = JobAssistantService._cover_letter_prompt(
+            job_description, user_profile, company_name, position_title
+        )
+        return JobAssistantService._stream_content_async(prompt, use_cache=use_cache, operation='cover_letter')
+
+    @staticmethod
+    def _interview_questions_prompt(job_description, user_profile):
+        """Build the interview preparation prompt"""
+        profile_block = JobAssistantService._profile_block(
+            user_profile, INTERVIEW_PROMPT_FIELDS, ' ' * 8, profile_digest_tokens())
+        prompt = f"""
+        Based on the job posting and candidate profile, generate likely interview questions and suggested answers:
+        
+        Job Description:
+        {job_description}
+        
+        Candidate Profile:
+        {profile_block}
+        
+        Please provide:
+        1. 5-7 technical questions based on required skills
+        2. 3-5 behavioral questions
+        3. 2-3 questions about specific projects or certifications
+        4. Suggested answers tailored to the candidate's background
+        5. Tips for showcasing relevant project experience
+        
+        Format each question with a suggested answer below it.
+        """
+        return JobAssistantService._digest_prompt(prompt, job_description, profile_block)
 
     @staticmethod
-    def generate_interview_questions(job_description, user_profile):
+    def generate_interview_questions(job_description, user_profile, use_cache=True):
         """Generate potential interview questions and suggested answers"""
         try:
-            prompt = f"""
-            Based on the job posting and candidate profile, generate likely interview questions and suggested answers:
+            prompt = JobAssistantService._interview_questions_prompt(job_description, user_profile)
             
-            Job Description:
-            {job_description}
-            
-            Candidate Profile:
-            Experience: {user_profile.experience}
-            Skills: {user_profile.skills}
-            Projects: {user_profile.projects}
-            Certifications: {user_profile.certifications}
-            
-            Please provide:
-            1. 5-7 technical questions based on required skills
-            2. 3-5 behavioral questions
-            3. 2-3 questions about specific projects or certifications
-            4. Suggested answers tailored to the candidate's background
-            5. Tips for showcasing relevant project experience
-            
-            Format each question with a suggested answer below it.
-            """
-            
-            return JobAssistantService._generate_content(prompt)
+            return JobAssistantService._generate_content(prompt, use_cache=use_cache, operation='interview_questions')
             
         except Exception as e:
             logging.error(f"Error generating interview questions: {e}")
-            return f"Error generating interview questions: {str(e)}"
+            raise
+
+    @staticmethod
+    def stream_interview_questions(job_description, user_profile, use_cache=True):
+        """Stream interview questions and suggested answers as they are generated"""
+        prompt = JobAssistantService._interview_questions_prompt(job_description, user_profile)
+        return JobAssistantService._stream_content(prompt, use_cache=use_cache, operation='interview_questions')
+
+    @staticmethod
+    async def generate_interview_questions_async(job_description, user_profile, use_cache=True):
+        """generate_interview_questions() on the async client"""
+        try:
+            prompt = JobAssistantService._interview_questions_prompt(job_description, user_profile)
+            return await JobAssistantService._generate_content_async(
+                prompt, use_cache=use_cache, operation='interview_questions')
+        except Exception as e:
+            logging.error(f"Error generating interview questions: {e}")
+            raise
+
+    @staticmethod
+    def stream_interview_questions_async(job_description, user_profile, use_cache=True):
+        """stream_interview_questions() as an async generator"""
+        prompt = JobAssistantService._interview_questions_prompt(job_description, user_profile)
+        return JobAssistantService._stream_content_async(prompt, use_cache=use_cache, operation='interview_questions')
+
+    # Artifacts produced by generate_application_kit, keyed by GeneratedContent.content_type
+    APPLICATION_KIT = ('job_analysis', 'resume_customization', 'cover_letter', 'interview_questions')
+
+    @staticmethod
+    def generate_application_kit(job_description, user_profile, company_name, position_title,
+                                 use_cache=True, max_workers=4, on_progress=None, job_digest=None):
+        """Run the analysis, resume, cover letter and interview prompts concurrently.
+
+        Returns (results, errors), both dicts keyed by content type. on_progress is
+        called from the calling thread as on_progress(content_type, state) with
+        state 'running', 'done' or 'failed', so callers can safely persist it.
+        The analysis reads the full description; the other prompts get
+        ``job_digest`` instead when one is given.
+        """
+        job_digest = job_digest or job_description
+        generators = {
+            'job_analysis': lambda: JobAssistantService.analyze_job_posting(
+                job_description, use_cache=use_cache),
+            'resume_customization': lambda: JobAssistantService.customize_resume(
+                job_digest, user_profile, use_cache=use_cache),
+            'cover_letter': lambda: JobAssistantService.generate_cover_letter(
+                job_digest, user_profile, company_name, position_title, use_cache=use_cache),
+            'interview_questions': lambda: JobAssistantService.generate_interview_questions(
+                job_digest, user_profile, use_cache=use_cache),
+        }
+
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='application-kit') as executor:
+            futures = {}
+            for content_type in JobAssistantService.APPLICATION_KIT:
+                futures[executor.submit(generators[content_type])] = content_type
+                if on_progress:
+                    on_progress(content_type, 'running')
+
+            for future in as_completed(futures):
+                content_type = futures[future]
+                try:
+                    results[content_type] = future.result()
+                    state = 'done'
+                except Exception as e:
+                    logging.error(f"Error generating {content_type} for application kit: {e}")
+                    errors[content_type] = str(e)
+                    state = 'failed'
+                if on_progress:
+                    on_progress(content_type, state)
+
+        return results, errors
+
+    @staticmethod
+    async def generate_application_kit_async(job_description, user_profile, company_name, position_title,
+                                             use_cache=True, on_progress=None, job_digest=None):
+        """generate_application_kit() on the async client: the four prompts run as concurrent tasks.
+
+        on_progress may be a coroutine function; it is awaited from the calling task.
+        """
+        job_digest = job_digest or job_description
+        generators = {
+            'job_analysis': JobAssistantService.analyze_job_posting_async(
+                job_description, use_cache=use_cache),
+            'resume_customization': JobAssistantService.customize_resume_async(
+                job_digest, user_profile, use_cache=use_cache),
+            'cover_letter': JobAssistantService.generate_cover_letter_async(
+                job_digest, user_profile, company_name, position_title, use_cache=use_cache),
+            'interview_questions': JobAssistantService.generate_interview_questions_async(
+                job_digest, user_profile, use_cache=use_cache),
+        }
+
+        async def report(content_type, state):
+            if on_progress:
+                await on_progress(content_type, state)
+
+        async def run(content_type):
+            try:
+                return content_type, await generators[content_type], None
+            except Exception as e:
+                logging.error(f"Error generating {content_type} for application kit: {e}")
+                return content_type, None, str(e)
+
+        results = {}
+        errors = {}
+        tasks = []
+        for content_type in JobAssistantService.APPLICATION_KIT:
+            tasks.append(asyncio.ensure_future(run(content_type)))
+            await report(content_type, 'running')
+
+        for finished in asyncio.as_completed(tasks):
+            content_type, text, error = await finished
+            if error is None:
+                results[content_type] = text
+                await report(content_type, 'done')
+            else:
+                errors[content_type] = error
+                await report(content_type, 'failed')
+
+        return results, errors
+
+    @staticmethod
+    def cache_stats():
+        """Return hit/miss counters for the response cache"""
+        return response_cache.stats()
+
+    @staticmethod
+    def resilience_stats():
+        """Return counters for the rate limiter, retry policy and circuit breaker"""
+        return {
+            'rate_limiter': rate_limiter.stats(),
+            'retries': retry_policy.stats(),
+            'circuit_breaker': circuit_breaker.stats(),
+        }
@@ -0,0 +1,31 @@
+import argparse
+from app import create_app
+from bulk_import import import_file, analyze_import
+
+parser = argparse.ArgumentParser(description='Bulk import job postings from a CSV or JSONL file and analyze them.')
+parser.add_argument('path', help='CSV or JSONL file with title, company and description columns')
+parser.add_argument('--batch-size', type=int, default=500, help='postings inserted per transaction (default: 500)')
+parser.add_argument('--concurrency', type=int, default=4, help='parallel Gemini analysis calls (default: 4)')
+parser.add_argument('--rate', type=float, default=60, help='maximum analysis calls per minute (default: 60)')
+parser.add_argument('--skip-analysis', action='store_true', help='only import postings, do not analyze them')
+parser.add_argument('--no-cache', action='store_true', help='bypass the Gemini response cache')
+args = parser.parse_args()
+
+app = create_app()
+with app.app_context():
+    bulk_import = import_file(
+        args.path,
+        batch_size=args.batch_size,
+        on_progress=lambda b: print(f"Imported {b.postings_created} postings ({b.rows_read} rows read, {b.rows_skipped} skipped)")
+    )
+    print(f"Import #{bulk_import.id} of {bulk_import.source_name}: {bulk_import.postings_created} postings")
+
+    if not args.skip_analysis:
+        bulk_import = analyze_import(
+            bulk_import,
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate,
+            use_cache=not args.no_cache,
+            on_progress=lambda b: print(f"Analyzed {b.postings_analyzed}/{b.postings_created} postings ({b.analysis_failures} failed)")
+        )
+        print(f"Analysis {bulk_import.status}: {bulk_import.postings_analyzed} analyzed, {bulk_import.analysis_failures} failed")
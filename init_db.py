@@ -1,8 +1,13 @@
-from app import app, db
-from models import JobPosting, UserProfile, GeneratedContent
+import sys
+from app import create_app, db, init_db
+from migrations import reset_database
 
-with app.app_context():
+app = create_app()
+
+if '--reset' in sys.argv:
     # Drop all tables and recreate (WARNING: This will delete all data)
-    db.drop_all()
-    db.create_all()
-    print("Database tables created successfully!")
\ No newline at end of file
+    with app.app_context():
+        reset_database(db.engine)
+else:
+    init_db(app)
+print("Database tables created successfully!")
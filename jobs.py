@@ -0,0 +1,283 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from app import db
+from models import BackgroundJob
+
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already waiting for a worker"""
+
+
+class JobQueue:
+    """Runs long Gemini-backed tasks off the request thread.
+
+    Job state lives in the ``background_job`` table so any worker process can
+    report on a job, including jobs whose worker was restarted mid-flight:
+    each process refreshes ``updated_at`` on the jobs it is running every
+    JOB_HEARTBEAT_INTERVAL seconds, and a running job whose heartbeat is
+    older than JOB_STALE_AFTER is reported as failed.
+    Work runs on a bounded in-process thread pool by default; set
+    ``JOB_BACKEND = 'inline'`` to run jobs synchronously (useful for CLI runs).
+    With ``JOB_BACKEND = 'async'``, job types that have a coroutine handler
+    run as tasks on one event loop thread, so a generation waiting on Gemini
+    holds no worker thread; their database work runs via ``run_sync``.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self.async_handlers = {}
+        self._executor = None
+        self._loop = None
+        self._pending = 0
+        self._running = set()
+        self._heartbeat = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_BACKEND', 'thread')
+        app.config.setdefault('JOB_WORKERS', 4)
+        app.config.setdefault('JOB_MAX_PENDING', 100)
+        app.config.setdefault('JOB_STALE_AFTER', 900)
+        app.config.setdefault('JOB_HEARTBEAT_INTERVAL', 60)
+        self.app = app
+        app.extensions['job_queue'] = self
+
+    def task(self, job_type):
+        """Register a handler function for a job type"""
+        def decorator(func):
+            self.handlers[job_type] = func
+            return func
+        return decorator
+
+    def async_task(self, job_type):
+        """Register a coroutine handler for a job type, used by the async backend.
+
+        It is called as ``await handler(job_id, **payload)`` and must do its
+        database work through ``run_sync``.
+        """
+        def decorator(func):
+            self.async_handlers[job_type] = func
+            return func
+        return decorator
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.app.config['JOB_WORKERS'],
+                        thread_name_prefix='job-worker'
+                    )
+        return self._executor
+
+    def _get_loop(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='job-event-loop', daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, job_type, **payload):
+        """Persist a new job and hand it to the worker pool, returning its id"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        with self._lock:
+            if self._pending >= self.app.config['JOB_MAX_PENDING']:
+                raise QueueFullError('Too many requests are being processed. Please try again shortly.')
+            self._pending += 1
+
+        try:
+            job = BackgroundJob(
+                id=uuid.uuid4().hex,
+                job_type=job_type,
+                status='queued',
+                payload=json.dumps(payload)
+            )
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        if self.app.config['JOB_BACKEND'] == 'inline':
+            self._run(job_id)
+        elif self.app.config['JOB_BACKEND'] == 'async' and job_type in self.async_handlers:
+            asyncio.run_coroutine_threadsafe(self._run_async(job_id), self._get_loop())
+        else:
+            self._get_executor().submit(self._run, job_id)
+
+        return job_id
+
+    def _run(self, job_id):
+        """Execute a job inside its own app context and record the outcome"""
+        try:
+            with self.app.app_context():
+                job = db.session.get(BackgroundJob, job_id)
+                if job is None:
+                    logging.error(f"Background job {job_id} disappeared before it could run")
+                    return
+
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                self._beat(job_id)
+
+                job_type = job.job_type
+                try:
+                    handler = self.handlers[job_type]
+                    result = handler(job, **json.loads(job.payload or '{}'))
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Background job {job_id} ({job_type}) failed: {e}")
+                    self._finish(job_id, error=str(e))
+                else:
+                    self._finish(job_id, result=result)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._running.discard(job_id)
+
+    async def run_sync(self, func, *args, **kwargs):
+        """Run blocking work (database access) in a worker thread inside its own app context"""
+        def call():
+            with self.app.app_context():
+                return func(*args, **kwargs)
+        return await asyncio.to_thread(call)
+
+    def _start(self, job_id):
+        """Mark a job running and return (job_type, payload), or None if it is gone"""
+        job = db.session.get(BackgroundJob, job_id)
+        if job is None:
+            logging.error(f"Background job {job_id} disappeared before it could run")
+            return None
+
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        self._beat(job_id)
+        return job.job_type, json.loads(job.payload or '{}')
+
+    def _finish(self, job_id, result=None, error=None):
+        """Record a running job's outcome, unless it was already reported as failed"""
+        now = datetime.utcnow()
+        values = {'finished_at': now, 'updated_at': now}
+        if error is None:
+            values.update(result=json.dumps(result or {}), status='finished')
+        else:
+            values.update(error=error, status='failed')
+
+        updated = BackgroundJob.query.filter_by(id=job_id, status='running').update(
+            values, synchronize_session=False)
+        db.session.commit()
+        db.session.expire_all()
+        if not updated:
+            logging.warning(f"Background job {job_id} finished after it was reported as failed; outcome dropped")
+
+    def _beat(self, job_id):
+        """Track a job this process is running, for the heartbeat thread"""
+        with self._lock:
+            self._running.add(job_id)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        """Refresh updated_at on this process's running jobs so get() knows their worker is alive"""
+        interval = self.app.config['JOB_HEARTBEAT_INTERVAL']
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with self.app.app_context():
+                    BackgroundJob.query.filter(
+                        BackgroundJob.id.in_(running), BackgroundJob.status == 'running'
+                    ).update({'updated_at': datetime.utcnow()}, synchronize_session=False)
+                    db.session.commit()
+            except Exception as e:
+                logging.error(f"Error recording background job heartbeat: {e}")
+
+    async def _run_async(self, job_id):
+        """Execute a job with its coroutine handler on the event loop and record the outcome"""
+        try:
+            started = await self.run_sync(self._start, job_id)
+            if started is None:
+                return
+            job_type, payload = started
+
+            try:
+                result = await self.async_handlers[job_type](job_id, **payload)
+            except Exception as e:
+                logging.error(f"Background job {job_id} ({job_type}) failed: {e}")
+                await self.run_sync(self._finish, job_id, error=str(e))
+            else:
+                await self.run_sync(self._finish, job_id, result=result)
+        except Exception as e:
+            logging.error(f"Error running background job {job_id}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._running.discard(job_id)
+
+    def update_progress(self, job, **steps):
+        """Merge per-step progress into a running job and persist it"""
+        progress = json.loads(job.progress or '{}')
+        progress.update(steps)
+        job.progress = json.dumps(progress)
+        db.session.commit()
+
+    async def update_progress_async(self, job_id, **steps):
+        """update_progress() for coroutine handlers, which only hold the job's id"""
+        def update():
+            self.update_progress(db.session.get(BackgroundJob, job_id), **steps)
+        await self.run_sync(update)
+
+    def get(self, job_id):
+        """Load a job, marking it failed if its worker stopped reporting"""
+        job = db.session.get(BackgroundJob, job_id)
+        # Queued jobs may wait behind a full pool for any length of time, so
+        # only running jobs, whose worker keeps a heartbeat, can go stale
+        if job is None or job.status != 'running':
+            return job
+
+        # A running job whose heartbeat stopped lost its worker (e.g. a restart)
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.app.config['JOB_STALE_AFTER'])
+        last_seen = job.updated_at or job.started_at or job.created_at
+        if last_seen and last_seen < cutoff:
+            BackgroundJob.query.filter(
+                BackgroundJob.id == job_id, BackgroundJob.status == 'running', BackgroundJob.updated_at < cutoff
+            ).update({'status': 'failed', 'finished_at': now,
+                      'error': 'The worker processing this request was restarted. Please try again.'},
+                     synchronize_session=False)
+            db.session.commit()
+            db.session.refresh(job)
+
+        return job
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+job_queue = JobQueue()
@@ -0,0 +1,142 @@
+import json
+
+_WHITESPACE = ' \t\r\n'
+_DELIMITERS = ',}' + _WHITESPACE
+_decoder = json.JSONDecoder()
+
+
+class JSONFieldStream:
+    """Incremental parser for a JSON object that arrives in chunks.
+
+    ``feed()`` returns the (key, value) pairs of the top-level members that the
+    chunk completed, so each field can be used as soon as it has streamed in
+    instead of after the closing brace. Anything before the opening brace (a
+    Markdown code fence, say) is skipped. Text that has been parsed is dropped,
+    and a long string value is scanned only once however many chunks it spans.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.complete = False
+        self.error = None
+        self._buffer = ''
+        self._state = 'start'  # start, key, colon, value, comma, done
+        self._key = None
+        self._scanned = 0  # how far into an unfinished string value no closing quote was found
+
+    def feed(self, chunk):
+        """Add a chunk of text; returns the [(key, value)] completed by it"""
+        if self._state == 'done' or self.error:
+            return []
+        self._buffer += chunk
+        completed = []
+        while self._step(completed):
+            pass
+        return completed
+
+    def _skip_whitespace(self):
+        position = 0
+        while position < len(self._buffer) and self._buffer[position] in _WHITESPACE:
+            position += 1
+        self._buffer = self._buffer[position:]
+        return self._buffer[:1]
+
+    def _fail(self, message):
+        self.error = message
+        return False
+
+    def _step(self, completed):
+        """Advance by one token; False when more text is needed (or the object is finished)"""
+        if self._state == 'start':
+            position = self._buffer.find('{')
+            if position < 0:
+                return False
+            self._buffer = self._buffer[position + 1:]
+            self._state = 'key'
+            return True
+
+        char = self._skip_whitespace()
+        if not char:
+            return False
+
+        if self._state == 'key':
+            if char == '}' and not self.fields:
+                return self._finish()
+            if char != '"':
+                return self._fail(f'expected a key, got {char!r}')
+            end = self._string_end(self._buffer)
+            if end < 0:
+                return False
+            try:
+                self._key = json.loads(self._buffer[:end + 1])
+            except json.JSONDecodeError as e:
+                return self._fail(f'invalid key: {e}')
+            self._buffer = self._buffer[end + 1:]
+            self._state = 'colon'
+        elif self._state == 'colon':
+            if char != ':':
+                return self._fail(f'expected ":", got {char!r}')
+            self._buffer = self._buffer[1:]
+            self._state = 'value'
+            self._scanned = 0
+        elif self._state == 'value':
+            end = self._value_end(char)
+            if end < 0:
+                return False
+            try:
+                value = json.loads(self._buffer[:end])
+            except json.JSONDecodeError as e:
+                return self._fail(f'invalid value for {self._key!r}: {e}')
+            self._buffer = self._buffer[end:]
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+            self._state = 'comma'
+        elif self._state == 'comma':
+            if char == '}':
+                return self._finish()
+            if char != ',':
+                return self._fail(f'expected "," or "}}", got {char!r}')
+            self._buffer = self._buffer[1:]
+            self._state = 'key'
+        return True
+
+    def _finish(self):
+        self._buffer = ''
+        self._state = 'done'
+        self.complete = True
+        return False
+
+    def _string_end(self, text, start=1):
+        """Index of the quote closing the string that opens text, or -1 if it has not arrived"""
+        position = start
+        while True:
+            position = text.find('"', position)
+            if position < 0:
+                return -1
+            backslashes = 0
+            while text[position - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return position
+            position += 1
+
+    def _value_end(self, char):
+        """Length of the complete value at the start of the buffer, or -1 if it has not all arrived"""
+        if char == '"':
+            end = self._string_end(self._buffer, max(1, self._scanned))
+            if end < 0:
+                self._scanned = len(self._buffer)
+                return -1
+            return end + 1
+
+        if char in '{[':
+            try:
+                return _decoder.raw_decode(self._buffer)[1]
+            except json.JSONDecodeError:
+                return -1
+
+        # A number or literal runs to the next delimiter; until one arrives it may continue
+        for position, next_char in enumerate(self._buffer):
+            if next_char in _DELIMITERS:
+                return position
+        return -1
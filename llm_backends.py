@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+import contextvars
+
+
+class LLMBackend:
+    """Text generation backend used by JobAssistantService.
+
+    Implementations return plain text from ``generate`` and yield text chunks
+    from ``generate_stream``. Given a ``schema`` (an OpenAPI-style dict, as
+    Gemini's response_schema takes), they return JSON matching it instead of
+    free text. ``is_retryable`` tells the resilience layer which
+    of the backend's errors are transient. ``agenerate`` and
+    ``agenerate_stream`` are the coroutine versions; backends without a native
+    async client run the blocking calls in a worker thread.
+    """
+
+    name = 'base'
+    # Prepended to the model name in response cache keys so backends never share entries
+    cache_prefix = ''
+    # Token counts of the last call made by each thread or asyncio task
+    _usage = contextvars.ContextVar('llm_usage', default=None)
+
+    def generate(self, model, prompt, schema=None):
+        raise NotImplementedError
+
+    def generate_stream(self, model, prompt, schema=None):
+        raise NotImplementedError
+
+    async def agenerate(self, model, prompt, schema=None):
+        def generate():
+            text = self.generate(model, prompt, schema)
+            return text, self.last_usage()
+
+        # The worker thread runs in a copy of this context, so carry its usage back
+        text, usage = await asyncio.to_thread(generate)
+        self._usage.set(usage)
+        return text
+
+    async def agenerate_stream(self, model, prompt, schema=None):
+        yield await self.agenerate(model, prompt, schema)
+
+    def is_retryable(self, error):
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    def last_usage(self):
+        """(prompt tokens, response tokens) of the caller's last call, if the backend reports them"""
+        return self._usage.get()
+
+    def _set_usage(self, prompt_tokens, response_tokens):
+        self._usage.set((prompt_tokens, response_tokens))
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via the google-genai SDK. The client is created on first use."""
+
+    name = 'gemini'
+
+    # HTTP status codes worth retrying: timeouts, rate limiting and transient server errors
+    RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key=None, timeout=60.0):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.api_key:
+                        logging.error("GEMINI_API_KEY not found in environment variables.")
+                        raise ValueError("GEMINI_API_KEY is required but not set in environment variables")
+
+                    from google import genai
+                    from google.genai import types
+                    self._client = genai.Client(
+                        api_key=self.api_key,
+                        http_options=types.HttpOptions(timeout=int(self.timeout * 1000))
+                    )
+        return self._client
+
+    def _record_usage(self, usage):
+        if usage is not None:
+            self._set_usage(usage.prompt_token_count, usage.candidates_token_count)
+
+    @staticmethod
+    def _config(schema):
+        """Request options: JSON output constrained to ``schema``, if there is one"""
+        if schema is None:
+            return None
+        from google.genai import types
+        return types.GenerateContentConfig(response_mime_type='application/json', response_schema=schema)
+
+    def generate(self, model, prompt, schema=None):
+        self._set_usage(None, None)
+        response = self.client.models.generate_content(model=model, contents=prompt, config=self._config(schema))
+        self._record_usage(response.usage_metadata)
+        return response.text
+
+    def generate_stream(self, model, prompt, schema=None):
+        self._set_usage(None, None)
+        for chunk in self.client.models.generate_content_stream(model=model, contents=prompt,
+                                                                config=self._config(schema)):
+            # Every chunk carries the running totals; the last one has the final counts
+            self._record_usage(chunk.usage_metadata)
+            if chunk.text:
+                yield chunk.text
+
+    async def agenerate(self, model, prompt, schema=None):
+        self._set_usage(None, None)
+        response = await self.client.aio.models.generate_content(model=model, contents=prompt,
+                                                                 config=self._config(schema))
+        self._record_usage(response.usage_metadata)
+        return response.text
+
+    async def agenerate_stream(self, model, prompt, schema=None):
+        self._set_usage(None, None)
+        async for chunk in await self.client.aio.models.generate_content_stream(model=model, contents=prompt,
+                                                                                config=self._config(schema)):
+            self._record_usage(chunk.usage_metadata)
+            if chunk.text:
+                yield chunk.text
+
+    def is_retryable(self, error):
+        if getattr(error, 'code', None) in self.RETRYABLE_STATUS_CODES:
+            return True
+
+        import httpx
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError, ConnectionError, TimeoutError))
+
+
+class StubBackendError(Exception):
+    """Simulated transient upstream failure raised by StubBackend"""
+
+    code = 503
+
+
+class StubBackend(LLMBackend):
+    """Offline backend returning deterministic templated output.
+
+    Output depends only on the prompt, so the response cache behaves as it would
+    with Gemini. Latency is drawn from a configurable distribution ('fixed',
+    'uniform', 'normal' or 'lognormal' around ``latency_ms`` with ``jitter_ms``
+    spread) and ``error_rate`` of calls raise a retryable StubBackendError. This
+    makes it possible to load-test the Flask and database layers on their own.
+    """
+
+    name = 'stub'
+    cache_prefix = 'stub:'
+
+    # parse_resume asks for JSON with (some of) these keys
+    PROFILE_FIELDS = ('name', 'email', 'phone', 'summary', 'experience',
+                      'education', 'skills', 'projects', 'certifications')
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, distribution='fixed',
+                 error_rate=0.0, words=300, chunk_words=20, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.words = words
+        self.chunk_words = max(1, chunk_words)
+        self.calls = 0
+        self.errors = 0
+        # Calls currently waiting on the simulated latency, and the most seen at once
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample_latency(self):
+        """Seconds to sleep for one call, drawn from the configured distribution"""
+        with self._lock:
+            if self.distribution == 'uniform':
+                value = self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.distribution == 'normal':
+                value = self._random.gauss(self.latency_ms, self.jitter_ms)
+            elif self.distribution == 'lognormal' and self.latency_ms > 0:
+                # Parameterized so the median is latency_ms; jitter widens the tail
+                sigma = self.jitter_ms / self.latency_ms if self.jitter_ms else 0.0
+                value = self.latency_ms * self._random.lognormvariate(0, sigma)
+            else:
+                value = self.latency_ms
+        return max(0.0, value) / 1000.0
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _wait(self):
+        self._enter()
+        try:
+            time.sleep(self._sample_latency())
+        finally:
+            self._exit()
+
+    async def _wait_async(self):
+        self._enter()
+        try:
+            await asyncio.sleep(self._sample_latency())
+        finally:
+            self._exit()
+
+    def _maybe_fail(self):
+        with self._lock:
+            self.calls += 1
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if failed:
+            raise StubBackendError('Simulated upstream error from the stub LLM backend')
+
+    def render(self, prompt, schema=None):
+        """Deterministic response text for a prompt"""
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+        if schema is not None:
+            return json.dumps({
+                field: '' if field == 'phone' else f'Stub {field} {digest[:8]}'
+                for field in schema['properties']
+            })
+
+        # parse_resume may ask for only some of the fields
+        fields = [field for field in self.PROFILE_FIELDS if f'"{field}":' in prompt]
+        if 'JSON' in prompt and fields:
+            return json.dumps({
+                field: '' if field == 'phone' else f'Stub {field} {digest[:8]}'
+                for field in fields
+            })
+
+        # Seed word choice from the prompt so identical prompts produce identical output
+        generator = random.Random(digest)
+        vocabulary = ('experience', 'skills', 'project', 'team', 'delivered', 'python', 'impact',
+                      'design', 'role', 'company', 'growth', 'results', 'lead', 'build', 'customer')
+        lines = [f'Stub response {digest[:12]}', '']
+        for section in range(1, 5):
+            lines.append(f'{section}. Section {section}')
+            words = [generator.choice(vocabulary) for _ in range(self.words // 4)]
+            lines.append('- ' + ' '.join(words))
+            lines.append('')
+        return '\n'.join(lines)
+
+    def generate(self, model, prompt, schema=None):
+        self._wait()
+        self._maybe_fail()
+        text = self.render(prompt, schema)
+        self._estimate_usage(prompt, text)
+        return text
+
+    def _estimate_usage(self, prompt, text):
+        # Roughly four characters per token, like Gemini on English text
+        self._set_usage(len(prompt) // 4, len(text) // 4)
+
+    def _chunks(self, text):
+        words = text.split(' ')
+        for start in range(0, len(words), self.chunk_words):
+            chunk = ' '.join(words[start:start + self.chunk_words])
+            yield chunk if start + self.chunk_words >= len(words) else chunk + ' '
+
+    def generate_stream(self, model, prompt, schema=None):
+        # Time to first chunk follows the latency distribution; later chunks arrive quickly
+        self._wait()
+        self._maybe_fail()
+        text = self.render(prompt, schema)
+        self._estimate_usage(prompt, text)
+        yield from self._chunks(text)
+
+    async def agenerate(self, model, prompt, schema=None):
+        await self._wait_async()
+        self._maybe_fail()
+        text = self.render(prompt, schema)
+        self._estimate_usage(prompt, text)
+        return text
+
+    async def agenerate_stream(self, model, prompt, schema=None):
+        await self._wait_async()
+        self._maybe_fail()
+        text = self.render(prompt, schema)
+        self._estimate_usage(prompt, text)
+        for chunk in self._chunks(text):
+            yield chunk
+
+    def is_retryable(self, error):
+        return isinstance(error, StubBackendError) or super().is_retryable(error)
+
+
+def backend_from_env():
+    """Build the LLM backend selected by LLM_BACKEND (gemini or stub)"""
+    backend = os.getenv('LLM_BACKEND', 'gemini').lower()
+
+    if backend == 'stub':
+        seed = os.getenv('LLM_STUB_SEED')
+        return StubBackend(
+            latency_ms=float(os.getenv('LLM_STUB_LATENCY_MS', 0)),
+            jitter_ms=float(os.getenv('LLM_STUB_JITTER_MS', 0)),
+            distribution=os.getenv('LLM_STUB_DISTRIBUTION', 'fixed'),
+            error_rate=float(os.getenv('LLM_STUB_ERROR_RATE', 0)),
+            words=int(os.getenv('LLM_STUB_WORDS', 300)),
+            seed=int(seed) if seed is not None else None,
+        )
+
+    if backend == 'gemini':
+        return GeminiBackend(
+            api_key=os.getenv('GEMINI_API_KEY'),
+            timeout=float(os.getenv('GEMINI_TIMEOUT', 60)),
+        )
+
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'. Use 'gemini' or 'stub'")
@@ -0,0 +1,194 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Default location sits next to the application database in the Flask instance folder
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'llm_cache.db')
+
+
+class ResponseCache:
+    """Persistent, content-addressed cache for LLM responses.
+
+    Entries are keyed by a SHA-256 of the model name and the full prompt and are
+    stored in a small SQLite file so they survive restarts and are shared between
+    worker processes. Entries expire after ``ttl_seconds`` and the least recently
+    used entries are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=7 * 24 * 3600, max_entries=5000, enabled=True):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @staticmethod
+    def make_key(model, prompt):
+        """Build the cache key for a model/prompt pair"""
+        digest = hashlib.sha256()
+        digest.update(model.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    connection.execute('PRAGMA journal_mode=WAL')
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS llm_cache (
+                            key TEXT PRIMARY KEY,
+                            model TEXT NOT NULL,
+                            response TEXT NOT NULL,
+                            created_at REAL NOT NULL,
+                            last_accessed REAL NOT NULL
+                        )
+                    """)
+                    connection.execute(
+                        'CREATE INDEX IF NOT EXISTS ix_llm_cache_last_accessed ON llm_cache (last_accessed)'
+                    )
+                    connection.commit()
+                    self._initialized = True
+        return connection
+
+    def get(self, model, prompt):
+        """Return the cached response for this prompt, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(model, prompt)
+        now = time.time()
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    'SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)
+                ).fetchone()
+
+                if row and now - row[1] <= self.ttl_seconds:
+                    connection.execute('UPDATE llm_cache SET last_accessed = ? WHERE key = ?', (now, key))
+                    connection.commit()
+                    with self._lock:
+                        self.hits += 1
+                    return row[0]
+
+                if row:
+                    # Expired entries are dropped eagerly so they don't count against the size limit
+                    connection.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                    connection.commit()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading LLM response cache: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, model, prompt, response):
+        """Store a response and evict the least recently used entries if the cache is full"""
+        if not self.enabled:
+            return
+
+        key = self.make_key(model, prompt)
+        now = time.time()
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_accessed) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, model, response, now, now)
+                )
+                evicted = self._evict(connection, now)
+                connection.commit()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logging.error(f"Error writing LLM response cache: {e}")
+            return
+
+        with self._lock:
+            self.stores += 1
+            self.evictions += evicted
+
+    def delete(self, model, prompt):
+        """Drop the response stored for this prompt, e.g. one that turned out to be unusable"""
+        if not self.enabled:
+            return
+
+        try:
+            connection = self._connect()
+            try:
+                connection.execute('DELETE FROM llm_cache WHERE key = ?', (self.make_key(model, prompt),))
+                connection.commit()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting from LLM response cache: {e}")
+
+    def _evict(self, connection, now):
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        evicted = connection.execute(
+            'DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl_seconds,)
+        ).rowcount
+
+        count = connection.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            evicted += connection.execute(
+                'DELETE FROM llm_cache WHERE key IN '
+                '(SELECT key FROM llm_cache ORDER BY last_accessed ASC LIMIT ?)',
+                (overflow,)
+            ).rowcount
+        return evicted
+
+    def clear(self):
+        """Remove every cached response"""
+        try:
+            connection = self._connect()
+            try:
+                connection.execute('DELETE FROM llm_cache')
+                connection.commit()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logging.error(f"Error clearing LLM response cache: {e}")
+
+    def stats(self):
+        """Return hit/miss counters for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+def cache_from_env():
+    """Build the response cache from LLM_CACHE_* environment variables"""
+    path = os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    return ResponseCache(
+        path=path,
+        ttl_seconds=int(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600)),
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 5000)),
+        enabled=os.getenv('LLM_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no'),
+    )
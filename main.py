@@ -1,4 +1,12 @@
-from app import app
+from app import create_app, init_db, auto_migrate_enabled
+
+app = create_app()
+
+# Servers start here (gunicorn main:app, uvicorn asgi:application), so this is
+# where the schema is brought up to date; set AUTO_MIGRATE=false to run
+# init_db.py or migrate.py as a separate deploy step instead
+if auto_migrate_enabled():
+    init_db(app)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
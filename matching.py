@@ -0,0 +1,195 @@
+import re
+import math
+import logging
+import threading
+from collections import Counter
+import numpy as np
+from app import db
+from models import JobPosting
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+doing for from had has have having he her here him his how i if in into is it its itself just me
+more most my no nor not of off on once only or other our ours out over own same she should so some
+such than that the their them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours
+ability able across experience including job looking must new role strong team using work working
+""".split())
+
+# Profile fields compared against postings, with how many times each one counts
+PROFILE_FIELDS = (('skills', 2), ('experience', 1), ('projects', 1))
+
+
+def tokenize(text):
+    """Lowercased terms of a text, without stopwords. Keeps tokens like c++, c# and node.js."""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+def profile_text(profile):
+    """The profile fields that describe what a candidate can do, weighted by repetition"""
+    parts = []
+    for field, weight in PROFILE_FIELDS:
+        value = getattr(profile, field, None)
+        if value:
+            parts.extend([value] * weight)
+    return '\n'.join(parts)
+
+
+class MatchIndex:
+    """TF-IDF vectors for every JobPosting, scored against a profile with NumPy.
+
+    Term counts are kept in CSR layout (``indptr``/``indices``/``counts``) with
+    one row per posting. ``refresh`` only tokenizes postings added since the
+    last call, then recomputes IDF, the weighted nonzeros and the row norms in
+    a few vectorized passes, since new documents shift every IDF. Ranking is
+    then a single gather, multiply and segmented sum over the nonzeros.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # New objects rather than cleared ones: rank() and matched_terms() keep
+        # using the ones they took under the lock after releasing it. Between
+        # resets the vocabulary only grows, so ids they already hold stay valid.
+        self.vocabulary = {}
+        self.terms = []
+        self.posting_ids = np.zeros(0, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.float32)
+        self.rows = np.zeros(0, dtype=np.int32)
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.idf = np.zeros(0)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.norms = np.zeros(0)
+        self.max_id = 0
+        self.max_created_at = None
+
+    def _term_ids(self, tokens):
+        counts = Counter(tokens)
+        ids = []
+        for term in counts:
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                term_id = self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+            ids.append(term_id)
+        return ids, list(counts.values())
+
+    def refresh(self, batch_size=2000):
+        """Add postings created since the last refresh; rebuild if any indexed ones were deleted"""
+        with self._lock:
+            if self.max_id:
+                # Fewer postings up to the last indexed id means some were deleted, even
+                # if newer ones were added since. SQLite can hand a deleted highest id
+                # to the next posting, so that row must also still be the one indexed.
+                indexed, max_created_at = db.session.query(
+                    db.func.count(JobPosting.id),
+                    db.func.max(db.case((JobPosting.id == self.max_id, JobPosting.created_at)))
+                ).filter(JobPosting.id <= self.max_id).one()
+                if indexed < len(self.posting_ids) or max_created_at != self.max_created_at:
+                    logging.info("Job postings were removed; rebuilding the match index")
+                    self._reset()
+
+            max_id = db.session.query(db.func.max(JobPosting.id)).scalar() or 0
+            if max_id == self.max_id:
+                return 0
+
+            new_ids, new_lengths, new_indices, new_counts = [], [], [], []
+            query = db.session.query(JobPosting.id, JobPosting.title, JobPosting.description,
+                                     JobPosting.created_at).filter(
+                JobPosting.id > self.max_id).order_by(JobPosting.id).execution_options(yield_per=batch_size)
+            for posting_id, title, description, created_at in query:
+                ids, counts = self._term_ids(tokenize(title) + tokenize(description))
+                new_ids.append(posting_id)
+                max_created_at = created_at
+                new_lengths.append(len(ids))
+                new_indices.extend(ids)
+                new_counts.extend(counts)
+
+            if not new_ids:
+                return 0
+
+            lengths = np.asarray(new_lengths, dtype=np.int64)
+            first_row = len(self.posting_ids)
+            self.posting_ids = np.concatenate([self.posting_ids, np.asarray(new_ids, dtype=np.int64)])
+            self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(lengths)])
+            self.indices = np.concatenate([self.indices, np.asarray(new_indices, dtype=np.int32)])
+            self.counts = np.concatenate([self.counts, np.asarray(new_counts, dtype=np.float32)])
+            self.rows = np.concatenate([self.rows, np.repeat(
+                np.arange(first_row, first_row + len(new_ids), dtype=np.int32), lengths)])
+            self._reweight()
+            self.max_id = int(self.posting_ids[-1])
+            self.max_created_at = max_created_at
+            return len(new_ids)
+
+    def _reweight(self):
+        # Smoothed IDF, with sublinear term frequency on both sides
+        self.document_frequency = np.bincount(self.indices, minlength=len(self.terms))
+        self.idf = np.log((1.0 + len(self.posting_ids)) / (1.0 + self.document_frequency)) + 1.0
+        self.weights = ((1.0 + np.log(self.counts)) * self.idf[self.indices]).astype(np.float32)
+        self.norms = np.sqrt(np.bincount(self.rows, weights=self.weights * self.weights,
+                                         minlength=len(self.posting_ids)))
+
+    def rank(self, text, limit=None):
+        """(posting_id, cosine similarity) for every posting, best first"""
+        with self._lock:
+            posting_ids, indices, rows = self.posting_ids, self.indices, self.rows
+            idf, weights, norms = self.idf, self.weights, self.norms
+            vocabulary = self.vocabulary
+            vocabulary_size = len(idf)
+
+        query_terms = Counter(term for term in tokenize(text)
+                              if vocabulary.get(term, vocabulary_size) < vocabulary_size)
+        if not len(posting_ids) or not query_terms:
+            return []
+
+        query = np.zeros(vocabulary_size, dtype=np.float32)
+        for term, count in query_terms.items():
+            term_id = vocabulary[term]
+            query[term_id] = (1.0 + math.log(count)) * idf[term_id]
+        query_norm = np.linalg.norm(query)
+
+        dots = np.bincount(rows, weights=weights * query[indices], minlength=len(posting_ids))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+
+        if limit is not None and limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(posting_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def matched_terms(self, text, posting_id, limit=6):
+        """Profile terms that also appear in a posting, rarest first"""
+        with self._lock:
+            posting_ids, indptr, indices = self.posting_ids, self.indptr, self.indices
+            document_frequency = self.document_frequency
+            vocabulary, terms = self.vocabulary, self.terms
+            total = len(posting_ids)
+
+        row = np.searchsorted(posting_ids, posting_id)
+        if row >= total or posting_ids[row] != posting_id:
+            return []
+
+        posting_terms = set(indices[indptr[row]:indptr[row + 1]].tolist())
+        shared = {vocabulary[term] for term in tokenize(text)
+                  if term in vocabulary and vocabulary[term] in posting_terms}
+        return [terms[term_id] for term_id in sorted(shared, key=lambda term_id: document_frequency[term_id])[:limit]]
+
+
+match_index = MatchIndex()
+
+
+def rank_postings(profile, limit=20):
+    """Best matching postings for a profile as (posting_id, score, matched terms), best first"""
+    text = profile_text(profile)
+    match_index.refresh()
+    return [
+        (posting_id, score, match_index.matched_terms(text, posting_id))
+        for posting_id, score in match_index.rank(text, limit=limit)
+    ]
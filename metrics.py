@@ -0,0 +1,287 @@
+import os
+import time
+import bisect
+import logging
+import threading
+
+# Request, SQL and LLM metrics in the Prometheus text exposition format. Values
+# are per process: with several gunicorn workers, each scrape of /metrics sees
+# the worker that served it, so scrape workers individually or sum over them.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+# Seconds; Gemini calls take seconds, pages and queries milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{format_labels(self.labels, key)} {format_value(value)}' for key, value in values]
+
+
+class Histogram:
+    """Bucketed observations per label combination, with their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, labels=()):
+        with self._lock:
+            state = self._values.get(labels)
+            return state[2] if state else 0
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                bucket = 'le="' + format_value(float(bound)) + '"'
+                lines.append(f'{self.name}_bucket{format_labels(self.labels, key, bucket)} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}')
+            lines.append(f'{self.name}_count{format_labels(self.labels, key)} {count}')
+        return lines
+
+
+class Registry:
+    """The metrics of this process, plus callbacks that report other components' stats at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Register func() -> [(name, kind, help, [(labels dict, value), ...]), ...]"""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                logging.error(f"Error collecting metrics from {collect.__name__}: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{format_labels(labels.keys(), labels.values())} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Flask endpoints
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, by Flask endpoint; for streamed '
+    'responses, the time until the response started', labels=('endpoint', 'method', 'status'))
+STREAM_DURATION = registry.histogram(
+    'http_stream_duration_seconds', 'Time from the start of a request with a streamed response '
+    '(SSE, ZIP export) until the stream was closed, by Flask endpoint', labels=('endpoint', 'method', 'status'))
+REQUEST_ERRORS = registry.counter(
+    'http_request_errors_total', 'Requests that raised or returned a 5xx status, by Flask endpoint',
+    labels=('endpoint', 'status'))
+REQUEST_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL statements executed per request, by Flask endpoint',
+    labels=('endpoint',), buckets=COUNT_BUCKETS)
+REQUEST_DB_TIME = registry.histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request, by Flask endpoint',
+    labels=('endpoint',), buckets=QUERY_BUCKETS)
+
+# SQL statements from any thread (requests and background jobs)
+DB_QUERY_LATENCY = registry.histogram(
+    'db_query_duration_seconds', 'Time spent executing each SQL statement', buckets=QUERY_BUCKETS)
+
+# JobAssistantService generations
+LLM_LATENCY = registry.histogram(
+    'llm_request_duration_seconds', 'Time spent waiting for the LLM backend, including retries',
+    labels=('operation', 'outcome'))
+LLM_FAILURES = registry.counter(
+    'llm_failures_total', 'LLM generations that failed, by reason', labels=('operation', 'reason'))
+LLM_CACHE_HITS = registry.counter(
+    'llm_response_cache_hits_total', 'Generations served from the response cache', labels=('operation',))
+LLM_PROMPT_CHARS = registry.counter(
+    'llm_prompt_characters_total', 'Characters sent to the LLM backend', labels=('operation',))
+LLM_RESPONSE_CHARS = registry.counter(
+    'llm_response_characters_total', 'Characters received from the LLM backend', labels=('operation',))
+LLM_PROMPT_TOKENS = registry.counter(
+    'llm_prompt_tokens_total', 'Prompt tokens reported by the LLM backend', labels=('operation',))
+LLM_RESPONSE_TOKENS = registry.counter(
+    'llm_response_tokens_total', 'Response tokens reported by the LLM backend', labels=('operation',))
+LLM_JSON_RESPONSES = registry.counter(
+    'llm_json_responses_total', 'Schema-constrained JSON responses, by whether they parsed completely, '
+    'only in part (the fields before the error were kept) or not at all', labels=('operation', 'outcome'))
+LLM_PROMPT_TOKENS_SAVED = registry.counter(
+    'llm_prompt_digest_tokens_saved_total', 'Estimated prompt tokens left out by using the job and profile '
+    'digests instead of their full text', labels=('operation',))
+
+# Resume uploads: 'unchanged' skipped the LLM, 'partial' re-parsed changed sections, 'full' everything
+RESUME_PARSES = registry.counter(
+    'resume_parses_total', 'Uploaded resumes by how much of them was sent to the LLM', labels=('mode',))
+
+
+def record_llm_call(operation, seconds, prompt, response=None, usage=None, failure=None):
+    """Record one call to the LLM backend made by a JobAssistantService method"""
+    if not METRICS_ENABLED:
+        return
+    LLM_LATENCY.observe(seconds, (operation, 'error' if failure else 'success'))
+    LLM_PROMPT_CHARS.inc((operation,), len(prompt))
+    if failure:
+        LLM_FAILURES.inc((operation, failure))
+    if response:
+        LLM_RESPONSE_CHARS.inc((operation,), len(response))
+    if usage:
+        prompt_tokens, response_tokens = usage
+        LLM_PROMPT_TOKENS.inc((operation,), prompt_tokens or 0)
+        LLM_RESPONSE_TOKENS.inc((operation,), response_tokens or 0)
+
+def record_llm_cache_hit(operation):
+    if METRICS_ENABLED:
+        LLM_CACHE_HITS.inc((operation,))
+
+def record_prompt_digest_savings(operation, tokens):
+    if METRICS_ENABLED:
+        LLM_PROMPT_TOKENS_SAVED.inc((operation,), tokens)
+
+def record_llm_json_response(operation, outcome):
+    """Count a JSON response as 'complete', 'partial' or 'failed' for the parse failure rate"""
+    if METRICS_ENABLED:
+        LLM_JSON_RESPONSES.inc((operation, outcome))
+
+
+# SQL statements executed by the current request's thread
+_request_stats = threading.local()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    DB_QUERY_LATENCY.observe(elapsed)
+    if getattr(_request_stats, 'active', False):
+        _request_stats.queries += 1
+        _request_stats.seconds += elapsed
+
+def init_app(app, engine):
+    """Time every request and SQL statement of a Flask app and its engine"""
+    if not METRICS_ENABLED:
+        return
+
+    from flask import g, request
+    from sqlalchemy import event
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_started = time.perf_counter()
+        _request_stats.active = True
+        _request_stats.queries = 0
+        _request_stats.seconds = 0.0
+
+    def finish(histogram, started, endpoint, method, status):
+        histogram.observe(time.perf_counter() - started, (endpoint, method, str(status)))
+        if status >= 500:
+            REQUEST_ERRORS.inc((endpoint, str(status)))
+        REQUEST_QUERIES.observe(_request_stats.queries, (endpoint,))
+        REQUEST_DB_TIME.observe(_request_stats.seconds, (endpoint,))
+        _request_stats.active = False
+
+    @app.after_request
+    def note_response_status(response):
+        g._metrics_status = response.status_code
+        started = g.get('_metrics_started')
+        if response.is_streamed and started is not None:
+            # The body is produced after the view returns, and when teardown
+            # runs relative to it depends on the Flask version; so the latency
+            # histogram gets the time until the response started, and the
+            # whole stream (with its SQL) is recorded once it has been closed
+            g._metrics_streamed = True
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - started,
+                                    (endpoint, request.method, str(response.status_code)))
+            response.call_on_close(lambda method=request.method, status=response.status_code:
+                                   finish(STREAM_DURATION, started, endpoint, method, status))
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(error=None):
+        started = g.pop('_metrics_started', None)
+        if started is None or g.pop('_metrics_streamed', False):
+            return
+        status = 500 if error is not None else g.pop('_metrics_status', 500)
+        finish(REQUEST_LATENCY, started, request.endpoint or 'unmatched', request.method, status)
@@ -0,0 +1,28 @@
+import argparse
+from app import create_app, db
+from migrations import run_migrations, migration_status
+from compression import compress_existing_rows
+
+parser = argparse.ArgumentParser(description='Apply pending database schema migrations without losing data.')
+parser.add_argument('--status', action='store_true', help='list migrations and whether they are applied')
+parser.add_argument('--target', type=int, help='stop after this migration version')
+parser.add_argument('--compress-text', action='store_true',
+                    help='compress job descriptions and generated content stored before compression was enabled')
+parser.add_argument('--batch-size', type=int, default=500, help='rows per transaction for --compress-text')
+parser.add_argument('--pause', type=float, default=0.0, help='seconds to wait between --compress-text batches')
+args = parser.parse_args()
+
+app = create_app()
+with app.app_context():
+    if args.status:
+        for version, description, done in migration_status(db.engine):
+            print(f"{version:4d}  {'applied' if done else 'pending':8s} {description}")
+    elif args.compress_text:
+        with db.engine.connect() as connection:
+            rewritten = compress_existing_rows(connection, batch_size=args.batch_size, pause=args.pause)
+        print(f"Compressed {rewritten} rows")
+    else:
+        # New tables are created outright; migrations bring the existing ones up to date
+        db.create_all()
+        applied = run_migrations(db.engine, target=args.target)
+        print(f"Applied migrations: {applied}" if applied else "Database schema is up to date")
@@ -0,0 +1,191 @@
+import os
+import logging
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app import db
+
+# Each migration brings databases created by db.create_all() on an older
+# models.py up to date. They must be idempotent: a fresh database already has
+# everything create_all() could make. Workers that start at once take turns
+# through migration_lock().
+MIGRATIONS = []
+
+# Key of the PostgreSQL advisory lock held while migrating (any fixed number)
+MIGRATION_LOCK_KEY = 5_180_417
+# How long a worker waits for another one's migrations to finish
+MIGRATION_LOCK_TIMEOUT = int(os.getenv('MIGRATION_LOCK_TIMEOUT', 600))
+
+
+def migration(version, description):
+    """Register a schema migration function under a version number"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return decorator
+
+def column_exists(connection, table, column):
+    return any(c['name'] == column for c in inspect(connection).get_columns(table))
+
+def create_missing_indexes(connection, table):
+    """Create the indexes declared on a model's table that the database lacks"""
+    existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+
+    for index in sorted(table.indexes, key=lambda index: index.name):
+        if index.name in existing:
+            continue
+        logging.info(f"Creating index {index.name}")
+        if connection.dialect.name == 'postgresql':
+            # Build without holding a write lock on the table
+            columns = ', '.join(column.name for column in index.columns)
+            with connection.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as autocommit:
+                autocommit.execute(text(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {table.name} ({columns})'
+                ))
+        else:
+            index.create(connection, checkfirst=True)
+
+
+@migration(1, 'Add job_posting.bulk_import_id')
+def add_bulk_import_column(connection):
+    if not column_exists(connection, 'job_posting', 'bulk_import_id'):
+        connection.execute(text(
+            'ALTER TABLE job_posting ADD COLUMN bulk_import_id INTEGER REFERENCES bulk_import (id)'
+        ))
+
+@migration(2, 'Indexes for listing, history and per-posting content queries')
+def add_hot_path_indexes(connection):
+    from models import JobPosting, GeneratedContent, JobApplication
+
+    for model in (JobPosting, GeneratedContent, JobApplication):
+        create_missing_indexes(connection, model.__table__)
+
+@migration(3, 'Full-text search index over job postings and generated content')
+def add_search_index(connection):
+    from search import create_search_index
+
+    create_search_index(connection)
+
+@migration(4, 'MinHash fingerprints for near-duplicate job postings')
+def add_posting_fingerprints(connection):
+    from models import PostingFingerprint, PostingBand
+    from dedup import fingerprint_missing
+
+    PostingFingerprint.__table__.create(connection, checkfirst=True)
+    PostingBand.__table__.create(connection, checkfirst=True)
+    fingerprint_missing(connection)
+
+@migration(5, 'Read the full-text index through views that decompress stored text')
+def decompress_search_index(connection):
+    from search import create_search_index, drop_search_index
+
+    # PostgreSQL never stores compressed text (see compression.CompressedText)
+    if connection.dialect.name == 'sqlite':
+        drop_search_index(connection)
+        create_search_index(connection)
+
+@migration(6, 'Fingerprint of the last uploaded resume on user_profile')
+def add_resume_fingerprint_columns(connection):
+    if not column_exists(connection, 'user_profile', 'resume_fingerprint'):
+        connection.execute(text('ALTER TABLE user_profile ADD COLUMN resume_fingerprint VARCHAR(64)'))
+    if not column_exists(connection, 'user_profile', 'resume_sections'):
+        connection.execute(text('ALTER TABLE user_profile ADD COLUMN resume_sections TEXT'))
+
+@migration(7, 'Prompt digest of each job posting')
+def add_posting_digest_columns(connection):
+    if not column_exists(connection, 'job_posting', 'digest'):
+        connection.execute(text('ALTER TABLE job_posting ADD COLUMN digest TEXT'))
+    if not column_exists(connection, 'job_posting', 'digest_key'):
+        connection.execute(text('ALTER TABLE job_posting ADD COLUMN digest_key VARCHAR(40)'))
+
+
+def current_version(connection):
+    version = connection.execute(text('SELECT MAX(version) FROM schema_version')).scalar()
+    return version or 0
+
+@contextmanager
+def migration_lock(engine):
+    """Hold the database's migration lock, so only one process migrates at a time.
+
+    On SQLite this is a write transaction (BEGIN IMMEDIATE), which also blocks
+    this process's other connections, so the connection holding it is yielded
+    and every migration runs in that one transaction. On PostgreSQL a session
+    advisory lock is held and None is yielded: migrations open their own
+    connections, as CREATE INDEX CONCURRENTLY needs.
+    """
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            driver_connection = connection.connection.driver_connection
+            # Let the explicit BEGIN IMMEDIATE below open the transaction
+            isolation_level = driver_connection.isolation_level
+            driver_connection.isolation_level = None
+            busy_timeout = driver_connection.execute('PRAGMA busy_timeout').fetchone()[0]
+            driver_connection.execute(f'PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT * 1000}')
+            try:
+                with connection.begin():
+                    connection.exec_driver_sql('BEGIN IMMEDIATE')
+                    yield connection
+            finally:
+                driver_connection.execute(f'PRAGMA busy_timeout = {busy_timeout}')
+                driver_connection.isolation_level = isolation_level
+    elif engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text(f'SET lock_timeout = {MIGRATION_LOCK_TIMEOUT * 1000}'))
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            try:
+                yield None
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+                connection.execute(text('RESET lock_timeout'))
+    else:
+        yield None
+
+def run_migrations(engine, target=None):
+    """Apply pending migrations up to ``target`` (default: latest). Returns the versions applied."""
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_version ('
+            'version INTEGER PRIMARY KEY, description VARCHAR(200), applied_at TIMESTAMP)'
+        ))
+
+    applied = []
+    # A worker that waited for the lock finds the versions another one applied
+    # and skips them, since current_version() is read under the lock
+    with migration_lock(engine) as locked:
+        for version, description, func in MIGRATIONS:
+            if target is not None and version > target:
+                break
+
+            with nullcontext(locked) if locked is not None else engine.connect() as connection:
+                if version <= current_version(connection):
+                    continue
+
+                logging.info(f"Applying migration {version}: {description}")
+                func(connection)
+                connection.execute(
+                    text('INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)'),
+                    {'v': version, 'd': description, 't': datetime.utcnow()}
+                )
+                if locked is None:
+                    connection.commit()
+            applied.append(version)
+    return applied
+
+def migration_status(engine):
+    """(version, description, applied) for every known migration"""
+    with engine.connect() as connection:
+        done = current_version(connection) if inspect(connection).has_table('schema_version') else 0
+    return [(version, description, version <= done) for version, description, _ in MIGRATIONS]
+
+
+def reset_database(engine):
+    """Drop every table and rebuild the schema from scratch (deletes all data)"""
+    from search import drop_search_index
+
+    with engine.begin() as connection:
+        drop_search_index(connection)
+        connection.execute(text('DROP TABLE IF EXISTS schema_version'))
+    db.drop_all()
+    db.create_all()
+    run_migrations(engine)
@@ -1,13 +1,22 @@
 from datetime import datetime
 from app import db
+from compression import CompressedText
 
 class JobPosting(db.Model):
     __tablename__ = 'job_posting'
+    __table_args__ = (
+        db.Index('ix_job_posting_created_at', 'created_at'),
+        db.Index('ix_job_posting_bulk_import_id', 'bulk_import_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(100), nullable=False)
-    description = db.Column(db.Text, nullable=False)
+    description = db.Column(CompressedText, nullable=False)
     requirements = db.Column(db.Text)
+    # Compact stand-in for the description in generation prompts (see tasks.posting_digest)
+    digest = db.Column(db.Text)
+    digest_key = db.Column(db.String(40))  # what the digest was built from, and its token budget
+    bulk_import_id = db.Column(db.Integer, db.ForeignKey('bulk_import.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -25,6 +34,10 @@ class UserProfile(db.Model):
     skills = db.Column(db.Text)
     projects = db.Column(db.Text)
     certifications = db.Column(db.Text)
+    # Of the last uploaded resume, so an unchanged upload is not parsed again
+    # and a changed one only for its changed sections (see resume_fingerprint)
+    resume_fingerprint = db.Column(db.String(64))
+    resume_sections = db.Column(db.Text)  # JSON {section: hash}
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -33,9 +46,15 @@ class UserProfile(db.Model):
 
 class GeneratedContent(db.Model):
     __tablename__ = 'generated_content'
+    __table_args__ = (
+        # Content for a posting, newest first (results, application kit, application detail)
+        db.Index('ix_generated_content_posting_created', 'job_posting_id', 'created_at'),
+        # History listing, paginated on (created_at, id)
+        db.Index('ix_generated_content_created_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     content_type = db.Column(db.String(50), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(CompressedText, nullable=False)
     job_posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'))
     user_profile_id = db.Column(db.Integer, db.ForeignKey('user_profile.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -48,6 +67,13 @@ class GeneratedContent(db.Model):
 
 class JobApplication(db.Model):
     __tablename__ = 'job_application'
+    __table_args__ = (
+        # Applications listing filtered by status and paginated on (application_date, id);
+        # (user_profile_id, status) also covers the statistics aggregate
+        db.Index('ix_job_application_profile_status_date', 'user_profile_id', 'status', 'application_date', 'id'),
+        # Unfiltered listing
+        db.Index('ix_job_application_profile_date', 'user_profile_id', 'application_date', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     job_posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), nullable=False)
     user_profile_id = db.Column(db.Integer, db.ForeignKey('user_profile.id'), nullable=False)
@@ -92,3 +118,72 @@ class JobApplication(db.Model):
             'Withdrawn': 'secondary'
         }
         return colors.get(self.status, 'secondary')
+
+class BackgroundJob(db.Model):
+    __tablename__ = 'background_job'
+    id = db.Column(db.String(32), primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, finished, failed
+    
+    # JSON-encoded task arguments, per-step progress and result
+    payload = db.Column(db.Text)
+    progress = db.Column(db.Text)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    
+    # Metadata
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<BackgroundJob {self.job_type} {self.status}>'
+    
+    @property
+    def is_done(self):
+        return self.status in ('finished', 'failed')
+
+class BulkImport(db.Model):
+    __tablename__ = 'bulk_import'
+    id = db.Column(db.Integer, primary_key=True)
+    source_name = db.Column(db.String(500), nullable=False)
+    source_hash = db.Column(db.String(64), nullable=False, unique=True)  # SHA-256 of the file contents
+    status = db.Column(db.String(20), nullable=False, default='importing')  # importing, analyzing, finished
+    
+    # Checkpoints so an interrupted import resumes where it stopped
+    rows_read = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    postings_created = db.Column(db.Integer, nullable=False, default=0)
+    postings_analyzed = db.Column(db.Integer, nullable=False, default=0)
+    analysis_failures = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Metadata
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    postings = db.relationship('JobPosting', backref='bulk_import', lazy='dynamic')
+    
+    def __repr__(self):
+        return f'<BulkImport {self.source_name} {self.status}>'
+
+class PostingFingerprint(db.Model):
+    __tablename__ = 'posting_fingerprint'
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)  # MinHash signature, see dedup.py
+    
+    def __repr__(self):
+        return f'<PostingFingerprint {self.job_posting_id}>'
+
+class PostingBand(db.Model):
+    __tablename__ = 'posting_band'
+    __table_args__ = (
+        db.Index('ix_posting_band_key', 'band_key'),
+        db.Index('ix_posting_band_posting', 'job_posting_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    band_key = db.Column(db.String(32), nullable=False)  # LSH bucket: "<band>:<hash of the band's rows>"
+    job_posting_id = db.Column(db.Integer, db.ForeignKey('job_posting.id'), nullable=False)
+    
+    def __repr__(self):
+        return f'<PostingBand {self.band_key} {self.job_posting_id}>'
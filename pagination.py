@@ -0,0 +1,83 @@
+import json
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(values):
+    """Opaque URL-safe token for the sort key of the last row on a page"""
+    payload = [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    return token.decode('ascii').rstrip('=')
+
+def decode_cursor(token, size):
+    """Sort key values from a token produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        values = [datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value for value in payload]
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid pagination cursor: {str(e)}")
+
+    if not isinstance(payload, list) or len(values) != size:
+        raise InvalidCursor("Invalid pagination cursor: wrong number of values")
+    return values
+
+def after_clause(order_by, values):
+    """WHERE clause selecting rows that sort after ``values`` under ``order_by``.
+
+    Expands (a, b, c) > (x, y, z) into OR-ed prefix comparisons so columns can
+    mix directions. The redundant bound on the leading column gives the
+    database a range to seek to on a composite index; planners do not derive
+    one from the OR on their own.
+    """
+    clauses = []
+    for position, (column, descending) in enumerate(order_by):
+        equal = [order_by[i][0] == values[i] for i in range(position)]
+        comparison = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal, comparison))
+
+    leading, descending = order_by[0]
+    bound = leading <= values[0] if descending else leading >= values[0]
+    return and_(bound, or_(*clauses))
+
+
+class Page:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, next_cursor, cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+
+def keyset_page(query, order_by, key, cursor=None, page_size=25):
+    """Fetch one page of ``query`` ordered by ``order_by``.
+
+    ``order_by`` is a list of (column, descending) pairs ending in a unique
+    column such as the primary key, and ``key`` returns the matching values
+    from a result row. Instead of OFFSET the query seeks past the previous
+    page's last key, so deep pages cost the same as the first. Sort columns
+    are assumed to be non-null.
+    """
+    if cursor:
+        query = query.filter(after_clause(order_by, decode_cursor(cursor, len(order_by))))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order_by])
+    rows = query.limit(page_size + 1).all()
+
+    items = rows[:page_size]
+    next_cursor = encode_cursor(key(items[-1])) if len(rows) > page_size else None
+    return Page(items, next_cursor, cursor)
@@ -0,0 +1,92 @@
+import logging
+import threading
+from flask import g, has_app_context
+from sqlalchemy import select
+from app import db
+from models import UserProfile
+from gemini_service import PROMPT_FIELDS, format_prompt_block
+
+
+class CachedProfile:
+    """Read-only copy of a UserProfile row that outlives the session it was loaded in.
+
+    Has the same attributes as the model, plus prompt blocks that are built
+    once per version of the profile instead of once per generation.
+    """
+
+    def __init__(self, profile):
+        for column in UserProfile.__table__.columns:
+            setattr(self, column.key, getattr(profile, column.key))
+        self._prompt_blocks = {}
+
+    @property
+    def version(self):
+        return (self.id, self.updated_at)
+
+    def prompt_block(self, fields=PROMPT_FIELDS, indent='', tokens=None):
+        # The profile digest (tokens set) is built once per version, like the full block
+        key = (fields, indent, tokens)
+        block = self._prompt_blocks.get(key)
+        if block is None:
+            block = self._prompt_blocks[key] = format_prompt_block(self, fields, indent, tokens)
+        return block
+
+    def __repr__(self):
+        return f'<CachedProfile {self.name}>'
+
+
+# The one-row version check each request makes instead of loading the whole profile
+VERSION_QUERY = select(UserProfile.id, UserProfile.updated_at).order_by(UserProfile.id).limit(1)
+
+
+class ProfileCache:
+    """The app's single UserProfile, shared across requests in this process.
+
+    Every request still asks the database for the profile's (id, updated_at),
+    a one-row lookup without any of the large text columns, and only reloads
+    the full row when that version differs. Other workers that edit the
+    profile bump updated_at, so each worker notices on its next request.
+    The answer is kept on ``flask.g`` so a request checks at most once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profile = None
+
+    def get(self):
+        if has_app_context() and '_cached_profile' in g:
+            return g._cached_profile
+
+        current = db.session.execute(VERSION_QUERY).first()
+        with self._lock:
+            profile = self._profile
+        if current is None:
+            profile = None
+        elif profile is None or profile.version != tuple(current):
+            row = db.session.get(UserProfile, current.id)
+            profile = CachedProfile(row) if row else None
+            with self._lock:
+                self._profile = profile
+            logging.debug(f"Loaded profile {current.id} into the profile cache")
+
+        if has_app_context():
+            g._cached_profile = profile
+        return profile
+
+    def invalidate(self):
+        with self._lock:
+            self._profile = None
+        if has_app_context():
+            g.pop('_cached_profile', None)
+
+
+profile_cache = ProfileCache()
+
+
+def get_profile():
+    """The current profile as a CachedProfile, or None if none has been created"""
+    return profile_cache.get()
+
+def invalidate_profile():
+    """Forget the cached profile after it has been changed"""
+    profile_cache.invalidate()
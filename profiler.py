@@ -0,0 +1,139 @@
+import os
+import sys
+import hmac
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from datetime import datetime
+
+# Frames from these directories are shown relative to them in the stacks
+_PATH_PREFIXES = sorted({os.path.dirname(os.path.abspath(__file__)) + os.sep}
+                        | {path + os.sep for path in sys.path if path and 'site-packages' in path},
+                        key=len, reverse=True)
+
+
+@lru_cache(maxsize=8192)
+def frame_label(code):
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+def collapse(frame):
+    """A stack as 'root;...;leaf' in the collapsed format read by flamegraph.pl and speedscope"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels)).replace('\n', ' ')
+
+
+class SamplingProfiler:
+    """Samples the stacks of the threads handling profiled requests.
+
+    One background thread wakes every ``interval`` seconds while any request
+    is being profiled and records the current stack of each of those
+    threads, so a profiled request only pays for being sampled, not for
+    tracing every call. When no request is profiled the thread sleeps.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+            self._thread.start()
+
+    def start(self, thread_id):
+        with self._lock:
+            self._samples[thread_id] = Counter()
+            self._ensure_thread()
+        self._wake.set()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._samples.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                thread_ids = list(self._samples)
+                if not thread_ids:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id in thread_ids:
+                    frame = frames.get(thread_id)
+                    samples = self._samples.get(thread_id)
+                    if frame is not None and samples is not None:
+                        samples[collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+def write_collapsed(samples, directory, name):
+    """Write samples as '<stack> <count>' lines and return the file path"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{name}.collapsed')
+    with open(path, 'w') as f:
+        for stack, count in samples.most_common():
+            f.write(f'{stack} {count}\n')
+    return path
+
+def init_app(app):
+    """Profile a sample of requests (PROFILER_*) and keep the stacks of the slow ones.
+
+    With PROFILER_ENABLED off and no PROFILER_TOKEN, no hooks are installed and
+    requests run exactly as before. With a token set, a request carrying it in
+    the PROFILER_HEADER header is always profiled and saved.
+    """
+    enabled = app.config.get('PROFILER_ENABLED', False)
+    token = app.config.get('PROFILER_TOKEN')
+    if not enabled and not token:
+        return
+
+    from flask import g, request
+
+    profiler = SamplingProfiler(interval=app.config.get('PROFILER_INTERVAL_MS', 5) / 1000.0)
+    sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 1.0)
+    slow_seconds = app.config.get('PROFILER_SLOW_MS', 500) / 1000.0
+    header = app.config.get('PROFILER_HEADER', 'X-Profile')
+    directory = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+
+    @app.before_request
+    def start_profiling():
+        forced = bool(token) and hmac.compare_digest(request.headers.get(header, ''), token)
+        if not forced and not (enabled and random.random() < sample_rate):
+            return
+        g._profile = (time.perf_counter(), forced, threading.get_ident())
+        profiler.start(g._profile[2])
+
+    @app.teardown_request
+    def finish_profiling(error=None):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        started, forced, thread_id = profile
+        samples = profiler.stop(thread_id)
+        elapsed = time.perf_counter() - started
+        if not samples or (not forced and elapsed < slow_seconds):
+            return
+
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{request.endpoint or 'unmatched'}-{elapsed * 1000:.0f}ms"
+        try:
+            path = write_collapsed(samples, directory, name)
+            logging.info(f"Profiled {request.method} {request.path} ({elapsed * 1000:.0f} ms): {path}")
+        except OSError as e:
+            logging.error(f"Error writing request profile: {e}")
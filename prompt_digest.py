@@ -0,0 +1,132 @@
+import os
+import re
+
+# Generation prompts carry a digest of the job posting and of the profile
+# instead of their full text, each held to a token budget. Text that already
+# fits its budget is passed through unchanged.
+PROMPT_DIGESTS_ENABLED = os.getenv('PROMPT_DIGESTS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+JOB_DIGEST_TOKENS = int(os.getenv('JOB_DIGEST_TOKENS', 400))
+PROFILE_DIGEST_TOKENS = int(os.getenv('PROFILE_DIGEST_TOKENS', 700))
+
+# Roughly four characters per token, like Gemini on English text
+CHARS_PER_TOKEN = 4
+
+# Lines that cost tokens without telling the model anything about the role
+BOILERPLATE = re.compile(
+    r'equal (employment )?opportunity|\beeo\b|regardless of (race|age|gender)|without regard to|'
+    r'reasonable accommodation|background check|e-verify|privacy (policy|notice)|'
+    r'apply (now|today)|click (here|apply)|to apply,|how to apply|recruitment agenc|'
+    r'401\(?k\)?|paid time off|\bpto\b|dental|health insurance|perks|free (lunch|snacks)',
+    re.IGNORECASE)
+HEADING = re.compile(r'^(#+\s*\S.*|\d+\.\s+[^.]{1,60}:?|[A-Za-z][^.!?]{1,60}:)$')
+SENTENCE_END = re.compile(r'[.!?;](\s|$)')
+MARKDOWN_EMPHASIS = re.compile(r'(\*\*|__)(.+?)\1')
+
+
+class Digest(str):
+    """Prompt text standing in for a longer original; remembers how many tokens it saves"""
+
+    def __new__(cls, text, tokens_saved=0):
+        digest = super().__new__(cls, text)
+        digest.tokens_saved = max(0, tokens_saved)
+        return digest
+
+
+def estimate_tokens(text):
+    return -(-len(text or '') // CHARS_PER_TOKEN)
+
+def normalize_lines(text):
+    """Non-empty lines with whitespace collapsed, Markdown emphasis removed and repeats dropped"""
+    lines = []
+    seen = set()
+    for line in (text or '').splitlines():
+        line = MARKDOWN_EMPHASIS.sub(r'\2', ' '.join(line.split()))
+        if line and line.lower() not in seen:
+            seen.add(line.lower())
+            lines.append(line)
+    return lines
+
+def allocate(sizes, budget):
+    """Split a token budget over parts of the given sizes.
+
+    Parts smaller than an even share keep everything and what they leave
+    unused goes to the larger parts, which are cut to equal shares.
+    """
+    allocation = {}
+    remaining = budget
+    pending = sorted(sizes.items(), key=lambda item: item[1])
+    while pending:
+        share = remaining // len(pending)
+        key, size = pending[0]
+        if size > share:
+            allocation.update((key, share) for key, _ in pending)
+            break
+        allocation[key] = size
+        remaining -= size
+        pending.pop(0)
+    return allocation
+
+def truncate(lines, tokens):
+    """As many whole lines as fit in ``tokens``, then the next one cut at a sentence or word boundary"""
+    limit = tokens * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for line in lines:
+        if used + len(line) <= limit:
+            kept.append(line)
+            used += len(line) + 1
+            continue
+        room = limit - used
+        # Not worth a fragment shorter than a few words
+        if room >= 40:
+            cut = line[:room]
+            sentence_ends = [match.end() for match in SENTENCE_END.finditer(cut)]
+            if sentence_ends and sentence_ends[-1] > room // 2:
+                kept.append(cut[:sentence_ends[-1]].rstrip())
+            else:
+                cut = cut[:cut.rindex(' ')] if ' ' in cut else cut[:-1]
+                kept.append(cut.rstrip(' ,;:-') + '…')
+        break
+    return kept
+
+def split_sections(lines):
+    """[(heading or None, body lines)], splitting before each heading line"""
+    sections = [(None, [])]
+    for line in lines:
+        if HEADING.match(line) and len(line) <= 80:
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, body) for heading, body in sections if body]
+
+def compact_text(text, tokens):
+    """Text cut down to about ``tokens``: boilerplate lines dropped, then every section shortened evenly.
+
+    Sections are cut to equal shares of the budget (short ones are kept
+    whole), so the end of a long posting is not simply lost.
+    """
+    if estimate_tokens(text) <= tokens:
+        return text
+
+    lines = [line for line in normalize_lines(text) if not BOILERPLATE.search(line)]
+    sections = split_sections(lines)
+    sizes = {index: estimate_tokens('\n'.join(([heading] if heading else []) + body))
+             for index, (heading, body) in enumerate(sections)}
+    allocation = allocate(sizes, tokens)
+
+    out = []
+    for index, (heading, body) in enumerate(sections):
+        heading_tokens = estimate_tokens(heading) if heading else 0
+        kept = truncate(body, allocation[index] - heading_tokens)
+        if kept:
+            out.extend(([heading] if heading else []) + kept)
+    return '\n'.join(out)
+
+def profile_values(profile, fields, tokens):
+    """[(label, value)] for the profile fields, their text shortened to share ``tokens`` between them"""
+    values = [(label, getattr(profile, attribute)) for label, attribute in fields]
+    allocation = allocate({index: estimate_tokens(value) for index, (_, value) in enumerate(values)}, tokens)
+    # Values that fit their share are kept exactly as they are
+    return [(label, value if estimate_tokens(value) <= allocation[index]
+             else '\n'.join(truncate(normalize_lines(value), allocation[index])))
+            for index, (label, value) in enumerate(values)]
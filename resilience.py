@@ -0,0 +1,221 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream service that is known to be unhealthy"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` calls per ``per`` seconds.
+
+    Bursts of up to ``capacity`` calls are allowed; after that callers block
+    in ``acquire`` until a token refills.
+    """
+
+    def __init__(self, rate, per=60.0, capacity=None):
+        self.rate = rate
+        self.per = per
+        self.capacity = max(1, int(capacity if capacity is not None else rate))
+        self.tokens = float(self.capacity)
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def _take(self, started, waited):
+        """Take a token if one is available. Returns (taken, seconds until the next token, now)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.acquired += 1
+                if waited:
+                    self.throttled += 1
+                    self.wait_seconds += now - started
+                return True, 0.0, now
+            return False, (1 - self.tokens) / self.fill_rate, now
+
+    def acquire(self, timeout=None):
+        """Take a token, waiting for one if needed. Returns False if timeout expires first."""
+        started = time.monotonic()
+        waited = False
+        while True:
+            taken, wait_for, now = self._take(started, waited)
+            if taken:
+                return True
+            if timeout is not None and now - started + wait_for > timeout:
+                return False
+            waited = True
+            time.sleep(wait_for)
+
+    async def acquire_async(self, timeout=None):
+        """acquire() for coroutines: waits on the event loop instead of blocking the thread"""
+        started = time.monotonic()
+        waited = False
+        while True:
+            taken, wait_for, now = self._take(started, waited)
+            if taken:
+                return True
+            if timeout is not None and now - started + wait_for > timeout:
+                return False
+            waited = True
+            await asyncio.sleep(wait_for)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate_per_minute': self.rate * 60.0 / self.per,
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'wait_seconds': round(self.wait_seconds, 3),
+            }
+
+
+class RetryPolicy:
+    """Retries retryable errors with exponential backoff and full jitter"""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """Delay before the given retry attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def _should_retry(self, error, attempt, is_retryable):
+        """Delay before retrying after a failed attempt, or None to give up"""
+        if not is_retryable(error):
+            return None
+        if attempt == self.max_attempts:
+            with self._lock:
+                self.exhausted += 1
+            return None
+
+        delay = self.backoff(attempt)
+        logging.warning(f"Retryable error (attempt {attempt}/{self.max_attempts}), retrying in {delay:.2f}s: {error}")
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def call(self, func, is_retryable):
+        with self._lock:
+            self.calls += 1
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return func()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, is_retryable)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def call_async(self, func, is_retryable):
+        """call() for a coroutine function, sleeping between attempts on the event loop"""
+        with self._lock:
+            self.calls += 1
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await func()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, is_retryable)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'exhausted': self.exhausted,
+            }
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and every
+    call is rejected with CircuitOpenError for ``recovery_timeout`` seconds. Then
+    a single trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not be attempted"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError('The AI service is temporarily unavailable. Please try again shortly.')
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError('The AI service is recovering. Please try again shortly.')
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logging.error(f"Circuit opened after {self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that neither succeeded nor indicated an unhealthy upstream"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
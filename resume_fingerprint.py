@@ -0,0 +1,98 @@
+import re
+import hashlib
+import unicodedata
+
+# A resume is split on its section headings so that a changed upload only sends
+# the sections whose text changed to the LLM. Each section feeds these profile
+# fields; 'contact' is whatever precedes the first heading (name, email, phone).
+SECTION_FIELDS = {
+    'contact': ('name', 'email', 'phone'),
+    'summary': ('summary',),
+    'experience': ('experience',),
+    'education': ('education',),
+    'skills': ('skills',),
+    'projects': ('projects',),
+    'certifications': ('certifications',),
+}
+
+SECTION_HEADINGS = {
+    'summary': r'(professional |career |executive )?(summary|profile|objective)|about( me)?',
+    'experience': r'(work |professional |relevant )?experience|employment( history)?|work history|career history',
+    'education': r'education( and training| & training)?|academic (background|history|qualifications)',
+    'skills': r'(technical |core |key )?(skills|competencies)( summary)?|technologies|tech stack',
+    'projects': r'(personal |selected |key |academic )?projects',
+    'certifications': r'certifications?( and licenses| & licenses)?|licenses( and certifications| & certifications)?'
+                      r'|courses( and certifications| & certifications)?',
+}
+_HEADING_PATTERNS = [(section, re.compile(rf'(?:{pattern})', re.IGNORECASE))
+                     for section, pattern in SECTION_HEADINGS.items()]
+
+# Below this many recognized headings the split is not trusted and the whole
+# resume is parsed again
+MIN_SECTIONS = 2
+
+# Zero-width characters and soft hyphens that PDF extraction scatters through text
+_INVISIBLE = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff\u00ad'))
+
+
+def normalize_resume_text(text):
+    """Resume text with Unicode, whitespace and blank-line differences removed"""
+    text = unicodedata.normalize('NFKC', text or '').translate(_INVISIBLE)
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+def resume_fingerprint(text):
+    """SHA-256 of the normalized text; equal for uploads that differ only in whitespace"""
+    return hashlib.sha256(normalize_resume_text(text).encode('utf-8')).hexdigest()
+
+def heading_section(line):
+    """The section a (normalized) line is the heading of, or None"""
+    if len(line) > 40:
+        return None
+    label = line.strip(' :-–—•*#|').strip()
+    for section, pattern in _HEADING_PATTERNS:
+        if pattern.fullmatch(label):
+            return section
+    return None
+
+def split_sections(text):
+    """{section: normalized text including its heading}, in SECTION_FIELDS order.
+
+    A section whose heading appears twice gets both blocks.
+    """
+    blocks = {}
+    section = 'contact'
+    for line in normalize_resume_text(text).split('\n'):
+        section = heading_section(line) or section
+        blocks.setdefault(section, []).append(line)
+    return {section: '\n'.join(blocks[section]) for section in SECTION_FIELDS if section in blocks}
+
+def section_hashes(sections):
+    return {section: hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+            for section, body in sections.items()}
+
+def plan_reparse(previous_hashes, sections):
+    """Work out what a changed upload needs parsed, given the stored section hashes.
+
+    Returns (text, fields, cleared): the text of the changed sections, the
+    profile fields to extract from it, and the fields of sections that were
+    removed. Returns None when the whole resume has to be parsed: nothing was
+    stored, the headings were not recognized, or every section changed.
+    """
+    if not previous_hashes or len(sections.keys() - {'contact'}) < MIN_SECTIONS:
+        return None
+
+    hashes = section_hashes(sections)
+    changed = [section for section in sections if hashes[section] != previous_hashes.get(section)]
+    # A resume that now starts with a heading keeps the stored name and email
+    removed = [section for section in previous_hashes
+               if section in SECTION_FIELDS and section != 'contact' and section not in sections]
+    if changed and len(changed) == len(sections):
+        return None
+
+    fields = [field for section in changed for field in SECTION_FIELDS[section]]
+    if 'contact' in changed and 'summary' not in sections:
+        # Without a heading of its own, the summary is read from the top of the resume
+        fields.append('summary')
+    cleared = [field for section in removed for field in SECTION_FIELDS[section]]
+    return '\n\n'.join(sections[section] for section in changed), fields, cleared
@@ -1,22 +1,47 @@
-from flask import render_template, request, redirect, url_for, flash, session, make_response
-from app import app, db
+from flask import render_template, request, redirect, url_for, flash, session, make_response, abort, Response, stream_with_context, current_app
+from app import db
 from models import JobPosting, UserProfile, GeneratedContent, JobApplication
 from gemini_service import JobAssistantService
+from jobs import job_queue
+from tasks import save_generated_content, posting_digest
+from text_extraction import extract_text_from_file
 from datetime import datetime
+from sqlalchemy import case, func
+from sqlalchemy.orm import contains_eager, defer, joinedload
+from pagination import keyset_page, InvalidCursor
+from search import search as search_index, SEARCH_KINDS
+from exports import content_export_query, slugify, stream_zip
+from profile_cache import get_profile, invalidate_profile
+from metrics import registry as metrics_registry, RESUME_PARSES
+from resume_fingerprint import resume_fingerprint
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
 import logging
 import os
 import json
-import io
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
-@app.route('/')
+# (rule, view function, options) for every route, added to the app by init_app()
+_routes = []
+
+def route(rule, **options):
+    """Like Flask's app.route, but recorded so create_app() can register it on any app"""
+    def decorator(func):
+        _routes.append((rule, func, options))
+        return func
+    return decorator
+
+def init_app(app):
+    for rule, func, options in _routes:
+        app.add_url_rule(rule, view_func=func, **options)
+
+@route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/profile', methods=['GET', 'POST'])
+@route('/profile', methods=['GET', 'POST'])
 def profile():
     if request.method == 'POST':
         profile = UserProfile.query.first()
@@ -45,13 +70,14 @@ def profile():
             profile.certifications = request.form.get('certifications')
         
         db.session.commit()
+        invalidate_profile()
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('profile'))
     
-    profile = UserProfile.query.first()
+    profile = get_profile()
     return render_template('profile.html', profile=profile)
 
-@app.route('/upload_resume', methods=['POST'])
+@route('/upload_resume', methods=['POST'])
 def upload_resume():
     if 'resume_file' not in request.files:
         flash('No file uploaded', 'error')
@@ -72,29 +98,17 @@ def upload_resume():
                 flash('Could not extract text from file', 'error')
                 return redirect(url_for('profile'))
             
-            # Use AI to parse resume
-            parsed_data = JobAssistantService.parse_resume(text_content)
-            
-            # Update or create profile
-            profile = UserProfile.query.first()
-            if not profile:
-                profile = UserProfile(
-                    name=parsed_data.get('name', ''),
-                    email=parsed_data.get('email', ''),
-                    phone=parsed_data.get('phone', ''),
-                    summary=parsed_data.get('summary', ''),
-                    experience=parsed_data.get('experience', ''),
-                    education=parsed_data.get('education', ''),
-                    skills=parsed_data.get('skills', ''),
-                    projects=parsed_data.get('projects', ''),
-                    certifications=parsed_data.get('certifications', '')
-                )
-                db.session.add(profile)
-            else:
-                update_profile_from_parsed_data(profile, parsed_data)
+            # The same resume again (up to whitespace) has nothing new to parse
+            profile = get_profile()
+            if profile and profile.resume_fingerprint == resume_fingerprint(text_content):
+                RESUME_PARSES.inc(('unchanged',))
+                flash('This resume matches the one already on your profile; nothing to update.', 'info')
+                return redirect(url_for('profile'))
             
-            db.session.commit()
-            flash('Resume parsed and profile updated successfully!', 'success')
+            # Parse with AI in the background and update the profile when done
+            job_id = job_queue.submit('resume_parse', resume_text=text_content)
+            invalidate_profile()
+            return redirect(url_for('job_status', job_id=job_id))
             
         except Exception as e:
             logging.error(f"Error processing resume: {e}")
@@ -108,78 +122,7 @@ def allowed_file(filename):
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_file(file):
-    """Extract text from uploaded file"""
-    filename = file.filename.lower()
-    text_content = ""
-    
-    try:
-        if filename.endswith('.txt'):
-            text_content = file.read().decode('utf-8')
-        elif filename.endswith('.pdf'):
-            # You'll need to install PyPDF2: pip install PyPDF2
-            import PyPDF2
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text_content += page.extract_text()
-        elif filename.endswith(('.doc', '.docx')):
-            # You'll need to install python-docx: pip install python-docx
-            import docx
-            doc = docx.Document(file)
-            text_content = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-    except Exception as e:
-        logging.error(f"Error extracting text from file: {e}")
-        return ""
-    
-    return text_content
-
-def update_profile_from_parsed_data(profile, parsed_data):
-    """Update profile fields from AI-parsed resume data"""
-    try:
-        profile.name = parsed_data.get('name', profile.name)
-        profile.email = parsed_data.get('email', profile.email)
-        profile.phone = parsed_data.get('phone', profile.phone)
-        profile.summary = parsed_data.get('summary', profile.summary)
-        
-        # Handle experience - convert to string if it's a dict/list
-        experience = parsed_data.get('experience', profile.experience)
-        if isinstance(experience, (dict, list)):
-            profile.experience = json.dumps(experience, indent=2)
-        else:
-            profile.experience = experience
-        
-        # Handle education - convert to string if it's a dict/list
-        education = parsed_data.get('education', profile.education)
-        if isinstance(education, (dict, list)):
-            profile.education = json.dumps(education, indent=2)
-        else:
-            profile.education = education
-        
-        # Handle skills - convert to string if it's a dict/list
-        skills = parsed_data.get('skills', profile.skills)
-        if isinstance(skills, (dict, list)):
-            profile.skills = json.dumps(skills, indent=2)
-        else:
-            profile.skills = skills
-        
-        # Handle projects - convert to string if it's a dict/list
-        projects = parsed_data.get('projects', profile.projects)
-        if isinstance(projects, (dict, list)):
-            profile.projects = json.dumps(projects, indent=2)
-        else:
-            profile.projects = projects
-        
-        # Handle certifications - convert to string if it's a dict/list
-        certifications = parsed_data.get('certifications', profile.certifications)
-        if isinstance(certifications, (dict, list)):
-            profile.certifications = json.dumps(certifications, indent=2)
-        else:
-            profile.certifications = certifications
-    except Exception as e:
-        logging.error(f"Error updating profile: {e}")
-        raise
-
-@app.route('/analyze_job', methods=['GET', 'POST'])
+@route('/analyze_job', methods=['GET', 'POST'])
 def analyze_job():
     if request.method == 'POST':
         job_title = request.form.get('job_title', '')
@@ -190,30 +133,39 @@ def analyze_job():
             flash('Please provide a job description.', 'error')
             return render_template('analyze_job.html')
         
-        # Save job posting
+        # Save job posting with its near-duplicate fingerprint
         job_posting = JobPosting()
         job_posting.title = job_title
         job_posting.company = company_name
         job_posting.description = job_description
         db.session.add(job_posting)
+        db.session.flush()
+        # dedup and matching use numpy, so they are imported on first use
+        from dedup import fingerprint_posting, reusable_analysis
+        fingerprint_posting(job_posting)
         db.session.commit()
         
-        # Analyze with Gemini
+        # The same role pasted again (or reposted) can reuse the earlier analysis
+        reuse_mode = current_app.config['DUPLICATE_ANALYSIS_REUSE']
+        if reuse_mode != 'off' and not request.form.get('force_analysis'):
+            reusable = reusable_analysis(job_posting)
+            if reusable:
+                analysis, duplicate, score = reusable
+                if reuse_mode == 'offer':
+                    return render_template('duplicate_posting.html',
+                                         job_posting=job_posting,
+                                         duplicate=duplicate,
+                                         analysis=analysis,
+                                         similarity=round(score * 100))
+                content = copy_analysis(analysis, job_posting)
+                flash(f'This posting is {round(score * 100)}% similar to "{duplicate.title}" at {duplicate.company}, '
+                      f'so its analysis was reused. Use Regenerate for a fresh one.', 'info')
+                return redirect(url_for('view_content', content_id=content.id))
+        
+        # Analyze with Gemini in the background
         try:
-            analysis = JobAssistantService.analyze_job_posting(job_description)
-            
-            # Save analysis
-            content = GeneratedContent()
-            content.content_type = 'job_analysis'
-            content.content = analysis
-            content.job_posting_id = job_posting.id
-            db.session.add(content)
-            db.session.commit()
-            
-            return render_template('results.html', 
-                                 content=analysis, 
-                                 content_type='Job Analysis',
-                                 job_id=job_posting.id)
+            job_id = job_queue.submit('job_analysis', job_posting_id=job_posting.id)
+            return redirect(url_for('job_status', job_id=job_id))
             
         except Exception as e:
             flash(f'Error analyzing job posting: {str(e)}', 'error')
@@ -221,22 +173,73 @@ def analyze_job():
     
     return render_template('analyze_job.html')
 
-@app.route('/customize_resume')
+def copy_analysis(analysis, job_posting):
+    """Save an existing job analysis as the analysis of another posting"""
+    return save_generated_content('job_analysis', analysis.content, job_posting.id)
+
+@route('/process_job_analysis', methods=['POST'])
+def process_job_analysis():
+    """Analyze an already saved job posting, e.g. after declining a reused analysis"""
+    job_id = request.form.get('job_id')
+    job_posting = JobPosting.query.get(job_id)
+    
+    if not job_posting:
+        flash('Job posting not found.', 'error')
+        return redirect(url_for('analyze_job'))
+    
+    try:
+        background_job_id = job_queue.submit('job_analysis', job_posting_id=job_posting.id,
+                                             use_cache=not request.form.get('regenerate'))
+        return redirect(url_for('job_status', job_id=background_job_id))
+    
+    except Exception as e:
+        flash(f'Error analyzing job posting: {str(e)}', 'error')
+        return redirect(url_for('analyze_job'))
+
+@route('/reuse_analysis', methods=['POST'])
+def reuse_analysis():
+    """Accept the analysis of a near-duplicate posting instead of generating a new one"""
+    job_posting = JobPosting.query.get_or_404(request.form.get('job_id', type=int))
+    analysis = GeneratedContent.query.get_or_404(request.form.get('content_id', type=int))
+    if analysis.content_type != 'job_analysis':
+        abort(400)
+    
+    content = copy_analysis(analysis, job_posting)
+    return redirect(url_for('view_content', content_id=content.id))
+
+@route('/customize_resume')
 def customize_resume():
     job_id = request.args.get('job_id')
     job_posting = None
     if job_id:
         job_posting = JobPosting.query.get(job_id)
     
-    jobs = JobPosting.query.order_by(JobPosting.created_at.desc()).limit(10).all()
-    profile = UserProfile.query.first()
+    profile = get_profile()
+    view = request.args.get('view', 'recent')
+    matches = {}
+    
+    if view == 'ranked' and profile:
+        # Rank every posting against the profile locally, without any Gemini calls
+        from matching import rank_postings
+        ranked = rank_postings(profile, limit=20)
+        matches = {posting_id: (round(score * 100), terms) for posting_id, score, terms in ranked}
+        postings = {posting.id: posting for posting in JobPosting.query.filter(JobPosting.id.in_(matches))}
+        jobs = [postings[posting_id] for posting_id, _, _ in ranked if posting_id in postings]
+        if not jobs:
+            flash('No job postings share keywords with your profile yet. Add skills to your profile to rank them.', 'info')
+    
+    if not matches:
+        view = 'recent'
+        jobs = JobPosting.query.order_by(JobPosting.created_at.desc()).limit(10).all()
     
     return render_template('customize_resume.html', 
                          jobs=jobs, 
                          selected_job=job_posting,
-                         profile=profile)
+                         profile=profile,
+                         view=view,
+                         matches=matches)
 
-@app.route('/process_resume_customization', methods=['POST'])
+@route('/process_resume_customization', methods=['POST'])
 def process_resume_customization():
     job_id = request.form.get('job_id')
     
@@ -245,7 +248,7 @@ def process_resume_customization():
         return redirect(url_for('customize_resume'))
     
     job_posting = JobPosting.query.get(job_id)
-    profile = UserProfile.query.first()
+    profile = get_profile()
     
     if not job_posting:
         flash('Job posting not found.', 'error')
@@ -256,30 +259,17 @@ def process_resume_customization():
         return redirect(url_for('profile'))
     
     try:
-        customization = JobAssistantService.customize_resume(
-            job_posting.description, 
-            profile
-        )
-        
-        # Save customization
-        content = GeneratedContent()
-        content.content_type = 'resume_customization'
-        content.content = customization
-        content.job_posting_id = job_posting.id
-        content.user_profile_id = profile.id
-        db.session.add(content)
-        db.session.commit()
-        
-        return render_template('results.html', 
-                             content=customization, 
-                             content_type='Resume Customization Suggestions',
-                             job_id=job_posting.id)
+        job_id = job_queue.submit('resume_customization',
+                                  job_posting_id=job_posting.id,
+                                  user_profile_id=profile.id,
+                                  use_cache=not request.form.get('regenerate'))
+        return redirect(url_for('job_status', job_id=job_id))
         
     except Exception as e:
         flash(f'Error customizing resume: {str(e)}', 'error')
         return redirect(url_for('customize_resume'))
 
-@app.route('/generate_cover_letter')
+@route('/generate_cover_letter')
 def generate_cover_letter():
     job_id = request.args.get('job_id')
     job_posting = None
@@ -287,14 +277,14 @@ def generate_cover_letter():
         job_posting = JobPosting.query.get(job_id)
     
     jobs = JobPosting.query.order_by(JobPosting.created_at.desc()).limit(10).all()
-    profile = UserProfile.query.first()
+    profile = get_profile()
     
     return render_template('generate_cover_letter.html', 
                          jobs=jobs, 
                          selected_job=job_posting,
                          profile=profile)
 
-@app.route('/process_cover_letter', methods=['POST'])
+@route('/process_cover_letter', methods=['POST'])
 def process_cover_letter():
     job_id = request.form.get('job_id')
     
@@ -303,7 +293,7 @@ def process_cover_letter():
         return redirect(url_for('generate_cover_letter'))
     
     job_posting = JobPosting.query.get(job_id)
-    profile = UserProfile.query.first()
+    profile = get_profile()
     
     if not job_posting:
         flash('Job posting not found.', 'error')
@@ -313,34 +303,30 @@ def process_cover_letter():
         flash('Please create your profile first.', 'error')
         return redirect(url_for('profile'))
     
-    try:
-        cover_letter = JobAssistantService.generate_cover_letter(
-            job_posting.description,
-            profile,
-            job_posting.company,
-            job_posting.title
-        )
-        
-        # Save cover letter
-        content = GeneratedContent()
-        content.content_type = 'cover_letter'
-        content.content = cover_letter
-        content.job_posting_id = job_posting.id
-        content.user_profile_id = profile.id
-        db.session.add(content)
-        db.session.commit()
-        
-        return render_template('results.html', 
-                             content=cover_letter, 
+    if request.form.get('stream'):
+        return render_template('results.html',
+                             content='',
                              content_type='Cover Letter',
                              job_id=job_posting.id,
-                             show_download=True)
+                             show_download=True,
+                             regenerate_endpoint='process_cover_letter',
+                             stream_url=url_for('stream_content',
+                                                content_type='cover_letter',
+                                                job_id=job_posting.id,
+                                                regenerate=request.form.get('regenerate')))
+    
+    try:
+        job_id = job_queue.submit('cover_letter',
+                                  job_posting_id=job_posting.id,
+                                  user_profile_id=profile.id,
+                                  use_cache=not request.form.get('regenerate'))
+        return redirect(url_for('job_status', job_id=job_id))
         
     except Exception as e:
         flash(f'Error generating cover letter: {str(e)}', 'error')
         return redirect(url_for('generate_cover_letter'))
 
-@app.route('/interview_prep')
+@route('/interview_prep')
 def interview_prep():
     job_id = request.args.get('job_id')
     job_posting = None
@@ -353,7 +339,7 @@ def interview_prep():
                          jobs=jobs, 
                          selected_job=job_posting)
 
-@app.route('/process_interview_prep', methods=['POST'])
+@route('/process_interview_prep', methods=['POST'])
 def process_interview_prep():
     job_id = request.form.get('job_id')
     
@@ -362,7 +348,7 @@ def process_interview_prep():
         return redirect(url_for('interview_prep'))
     
     job_posting = JobPosting.query.get(job_id)
-    profile = UserProfile.query.first()  # Get the user profile
+    profile = get_profile()
     
     if not job_posting:
         flash('Job posting not found.', 'error')
@@ -372,54 +358,359 @@ def process_interview_prep():
         flash('Please create your profile first.', 'error')
         return redirect(url_for('profile'))
     
-    try:
-        questions = JobAssistantService.generate_interview_questions(
-            job_posting.description,
-            profile  # Pass the profile object, not job_posting.title
-        )
-        
-        # Save interview questions
-        content = GeneratedContent()
-        content.content_type = 'interview_questions'
-        content.content = questions
-        content.job_posting_id = job_posting.id
-        content.user_profile_id = profile.id  # Also link to user profile
-        db.session.add(content)
-        db.session.commit()
-        
-        return render_template('results.html', 
-                             content=questions, 
+    if request.form.get('stream'):
+        return render_template('results.html',
+                             content='',
                              content_type='Interview Questions',
-                             job_id=job_posting.id)
+                             job_id=job_posting.id,
+                             regenerate_endpoint='process_interview_prep',
+                             stream_url=url_for('stream_content',
+                                                content_type='interview_questions',
+                                                job_id=job_posting.id,
+                                                regenerate=request.form.get('regenerate')))
+    
+    try:
+        job_id = job_queue.submit('interview_questions',
+                                  job_posting_id=job_posting.id,
+                                  user_profile_id=profile.id,  # Also link to user profile
+                                  use_cache=not request.form.get('regenerate'))
+        return redirect(url_for('job_status', job_id=job_id))
         
     except Exception as e:
         flash(f'Error generating interview questions: {str(e)}', 'error')
         return redirect(url_for('interview_prep'))
 
-@app.route('/download/<int:content_id>')
-def download_content(content_id):
-    content = GeneratedContent.query.get_or_404(content_id)
+@route('/process_application_kit', methods=['POST'])
+def process_application_kit():
+    """Generate analysis, resume suggestions, cover letter and interview prep in one go"""
+    job_id = request.form.get('job_id')
+    
+    if not job_id:
+        flash('Please select a job posting.', 'error')
+        return redirect(url_for('applications'))
+    
+    job_posting = JobPosting.query.get(job_id)
+    profile = get_profile()
+    
+    if not job_posting:
+        flash('Job posting not found.', 'error')
+        return redirect(url_for('applications'))
+    
+    if not profile:
+        flash('Please create your profile first.', 'error')
+        return redirect(url_for('profile'))
+    
+    try:
+        background_job_id = job_queue.submit('application_kit',
+                                             job_posting_id=job_posting.id,
+                                             user_profile_id=profile.id,
+                                             use_cache=not request.form.get('regenerate'))
+        return redirect(url_for('job_status', job_id=background_job_id))
+        
+    except Exception as e:
+        flash(f'Error generating application kit: {str(e)}', 'error')
+        return redirect(request.referrer or url_for('applications'))
+
+@route('/application_kit/<int:job_id>')
+def application_kit(job_id):
+    """Show the latest version of every application kit artifact for a posting"""
+    job_posting = JobPosting.query.get_or_404(job_id)
+    
+    latest = {}
+    contents = GeneratedContent.query.filter(
+        GeneratedContent.job_posting_id == job_posting.id,
+        GeneratedContent.content_type.in_(JobAssistantService.APPLICATION_KIT)
+    ).order_by(GeneratedContent.created_at.desc()).all()
+    for content in contents:
+        latest.setdefault(content.content_type, content)
+    
+    artifacts = [
+        (content_type, CONTENT_TYPES[content_type]['label'], latest.get(content_type))
+        for content_type in JobAssistantService.APPLICATION_KIT
+    ]
+    
+    return render_template('application_kit.html',
+                         job_posting=job_posting,
+                         artifacts=artifacts)
+
+# Display settings for each kind of generated content
+CONTENT_TYPES = {
+    'job_analysis': {
+        'label': 'Job Analysis',
+        'pending': 'Analyzing job posting',
+        'regenerate_endpoint': 'process_job_analysis',
+    },
+    'resume_customization': {
+        'label': 'Resume Customization Suggestions',
+        'pending': 'Generating resume suggestions',
+        'regenerate_endpoint': 'process_resume_customization',
+    },
+    'cover_letter': {
+        'label': 'Cover Letter',
+        'pending': 'Writing cover letter',
+        'regenerate_endpoint': 'process_cover_letter',
+        'show_download': True,
+    },
+    'interview_questions': {
+        'label': 'Interview Questions',
+        'pending': 'Preparing interview questions',
+        'regenerate_endpoint': 'process_interview_prep',
+    },
+    'resume_parse': {
+        'label': 'Resume Parsing',
+        'pending': 'Parsing your resume',
+    },
+    'application_kit': {
+        'label': 'Application Kit',
+        'pending': 'Building your application kit',
+    },
+}
+
+def job_result_url(job):
+    """Where to send the user once a background job has finished"""
+    result = json.loads(job.result or '{}')
+    if 'content_id' in result:
+        return url_for('view_content', content_id=result['content_id'])
+    if 'content_ids' in result:
+        return url_for('application_kit', job_id=result['job_posting_id'])
+    return url_for('profile')
+
+@route('/jobs/<job_id>')
+def job_status(job_id):
+    """Progress page that polls until a background job finishes"""
+    job = job_queue.get(job_id)
+    if not job:
+        abort(404)
+    
+    if job.status == 'finished':
+        return redirect(job_result_url(job))
+    
+    return render_template('job_status.html',
+                         job=job,
+                         job_label=CONTENT_TYPES.get(job.job_type, {}).get('pending', 'Processing'))
+
+@route('/metrics')
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@route('/jobs/<job_id>/status')
+def job_status_api(job_id):
+    """JSON status of a background job for client-side polling"""
+    job = job_queue.get(job_id)
+    if not job:
+        return {'success': False, 'message': 'Job not found'}, 404
+    
+    response = {
+        'success': True,
+        'id': job.id,
+        'job_type': job.job_type,
+        'status': job.status,
+        'progress': json.loads(job.progress or '{}'),
+    }
+    if job.status == 'finished':
+        response['redirect_url'] = job_result_url(job)
+        # Shown by the polling page after it follows the redirect; a flash()
+        # here would be queued again by every poll that sees the finished job
+        if job.job_type == 'resume_parse':
+            sections = json.loads(job.result or '{}').get('sections_parsed')
+            if sections == []:
+                response['message'] = 'This resume matches the one already on your profile; nothing to update.'
+                response['message_category'] = 'info'
+            else:
+                response['message'] = 'Resume parsed and profile updated successfully!'
+                response['message_category'] = 'success'
+    elif job.status == 'failed':
+        response['error'] = job.error
     
-    # Create a text file with the content
-    output = io.StringIO()
-    output.write(content.content)
+    return response
+
+@route('/content/<int:content_id>')
+def view_content(content_id):
+    """Show a saved piece of generated content"""
+    content = GeneratedContent.query.get_or_404(content_id)
+    settings = CONTENT_TYPES.get(content.content_type, {})
+    
+    return render_template('results.html',
+                         content=content.content,
+                         content_type=settings.get('label', content.content_type),
+                         job_id=content.job_posting_id,
+                         content_id=content.id,
+                         created_at=content.created_at,
+                         show_download=settings.get('show_download', False),
+                         regenerate_endpoint=settings.get('regenerate_endpoint'))
+
+# Content types that can be streamed token by token to the browser
+STREAMING_GENERATORS = {
+    'cover_letter': lambda job_posting, profile, use_cache: JobAssistantService.stream_cover_letter(
+        posting_digest(job_posting), profile, job_posting.company, job_posting.title, use_cache=use_cache
+    ),
+    'interview_questions': lambda job_posting, profile, use_cache: JobAssistantService.stream_interview_questions(
+        posting_digest(job_posting), profile, use_cache=use_cache
+    ),
+}
+
+def sse_event(data, event=None):
+    """Format a Server-Sent Events message with a JSON payload"""
+    message = f'event: {event}\n' if event else ''
+    return message + f'data: {json.dumps(data)}\n\n'
+
+@route('/stream/<content_type>/<int:job_id>')
+def stream_content(content_type, job_id):
+    """Stream generated content over Server-Sent Events and save it once complete"""
+    if content_type not in STREAMING_GENERATORS:
+        abort(404)
+    
+    job_posting = JobPosting.query.get_or_404(job_id)
+    profile = get_profile()
+    use_cache = not request.args.get('regenerate')
+    
+    def generate():
+        # Send something immediately so proxies and the browser open the stream
+        yield ': stream opened\n\n'
+        
+        if not profile:
+            yield sse_event({'message': 'Please create your profile first.'}, event='failed')
+            return
+        
+        chunks = []
+        try:
+            for chunk in STREAMING_GENERATORS[content_type](job_posting, profile, use_cache):
+                chunks.append(chunk)
+                yield sse_event({'text': chunk})
+            
+            if not chunks:
+                raise ValueError('No content generated.')
+            
+            content = save_generated_content(content_type, ''.join(chunks), job_posting.id, profile.id)
+            yield sse_event({'content_id': content.id,
+                             'url': url_for('view_content', content_id=content.id)}, event='done')
+        
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error streaming {content_type}: {e}")
+            yield sse_event({'message': f'Error generating content: {str(e)}'}, event='failed')
     
-    # Create response
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/plain'
-    response.headers['Content-Disposition'] = f'attachment; filename={content.content_type}_{content.id}.txt'
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+@route('/download/<int:content_id>')
+def download_content(content_id):
+    # Generated content never changes once saved, so its id and timestamp make
+    # a stable validator and a revalidation can be answered without the text
+    content = GeneratedContent.query.options(defer(GeneratedContent.content)).get_or_404(content_id)
+    etag = f'{content.id}-{content.created_at:%Y%m%d%H%M%S%f}' if content.created_at else str(content.id)
+    
+    if is_resource_modified(request.environ, etag=etag, last_modified=content.created_at):
+        response = make_response(content.content)
+        response.headers['Content-Type'] = 'text/plain; charset=utf-8'
+        response.headers['Content-Disposition'] = f'attachment; filename={content.content_type}_{content.id}.txt'
+    else:
+        response = make_response('', 304)
     
+    response.set_etag(etag)
+    response.last_modified = content.created_at
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def zip_response(query, filename):
+    """Stream the query's GeneratedContent rows as a ZIP download"""
+    response = Response(stream_with_context(stream_zip(query)), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
     return response
 
-@app.route('/history')
+@route('/export/job/<int:job_id>')
+def export_job_content(job_id):
+    """Download everything generated for a job posting as a ZIP archive"""
+    job_posting = JobPosting.query.get_or_404(job_id)
+    return zip_response(content_export_query(job_posting_id=job_posting.id),
+                        f'{slugify(job_posting.title)}-{job_posting.id}.zip')
+
+@route('/export/profile')
+def export_profile_content():
+    """Download everything generated for the profile as a ZIP archive"""
+    profile = get_profile()
+    if not profile:
+        flash('Please create your profile first.', 'error')
+        return redirect(url_for('profile'))
+    return zip_response(content_export_query(user_profile_id=profile.id),
+                        f'job-assistant-export-{datetime.utcnow():%Y%m%d}.zip')
+
+def page_size_from_request():
+    """Rows per page: ?per_page= clamped to MAX_PAGE_SIZE, else PAGE_SIZE"""
+    per_page = request.args.get('per_page', type=int) or current_app.config['PAGE_SIZE']
+    return max(1, min(per_page, current_app.config['MAX_PAGE_SIZE']))
+
+@route('/history')
 def history():
-    recent_content = GeneratedContent.query.order_by(GeneratedContent.created_at.desc()).limit(20).all()
-    return render_template('history.html', content_list=recent_content)
+    query = GeneratedContent.query.options(
+        joinedload(GeneratedContent.job_posting).load_only(JobPosting.id, JobPosting.title, JobPosting.company)
+    )
+    try:
+        page = keyset_page(query,
+                           [(GeneratedContent.created_at, True), (GeneratedContent.id, True)],
+                           key=lambda content: (content.created_at, content.id),
+                           cursor=request.args.get('cursor'),
+                           page_size=page_size_from_request())
+    except InvalidCursor:
+        abort(400)
+    return render_template('history.html', content_list=page.items, page=page,
+                           per_page=request.args.get('per_page', type=int))
+
+# ?type= values accepted by /search
+SEARCH_TYPES = {
+    'all': SEARCH_KINDS,
+    'postings': ('job_posting',),
+    'content': ('generated_content',),
+}
 
-@app.route('/applications')
+@route('/search')
+def search():
+    """Full-text search across job postings and generated content"""
+    terms = request.args.get('q', '').strip()
+    search_type = request.args.get('type', 'all')
+    if search_type not in SEARCH_TYPES:
+        search_type = 'all'
+    page = max(request.args.get('page', 1, type=int), 1)
+    
+    results, has_next = [], False
+    if terms:
+        try:
+            results, has_next = search_index(terms, kinds=SEARCH_TYPES[search_type],
+                                             page=page, page_size=page_size_from_request())
+        except Exception as e:
+            logging.error(f"Error searching for {terms!r}: {str(e)}")
+            flash('Search failed. Please try different terms.', 'error')
+    
+    return render_template('search.html',
+                         terms=terms,
+                         search_type=search_type,
+                         results=results,
+                         page=page,
+                         has_next=has_next,
+                         per_page=request.args.get('per_page', type=int))
+
+# Statuses counted as still in progress on the applications page
+ACTIVE_STATUSES = ('Applied', 'Phone Screen', 'Interview', 'Technical Round', 'Final Round')
+
+# Keyset order for each sort mode; the trailing id makes every key unique
+APPLICATION_SORTS = {
+    'date_desc': ([(JobApplication.application_date, True), (JobApplication.id, True)],
+                  lambda application: (application.application_date, application.id)),
+    'date_asc': ([(JobApplication.application_date, False), (JobApplication.id, False)],
+                 lambda application: (application.application_date, application.id)),
+    'company': ([(JobPosting.company, False), (JobApplication.id, False)],
+                lambda application: (application.job_posting.company, application.id)),
+}
+
+@route('/applications')
 def applications():
     """View all job applications"""
-    profile = UserProfile.query.first()
+    profile = get_profile()
     
     if not profile:
         flash('Please create your profile first.', 'error')
@@ -428,43 +719,49 @@ def applications():
     # Get filter parameters
     status_filter = request.args.get('status', 'all')
     sort_by = request.args.get('sort', 'date_desc')
+    if sort_by not in APPLICATION_SORTS:
+        sort_by = 'date_desc'
     
-    # Base query
-    query = JobApplication.query.filter_by(user_profile_id=profile.id)
+    # Base query; the posting is joined and loaded in the same round trip since
+    # every row shows its title and company
+    query = JobApplication.query.filter_by(user_profile_id=profile.id).join(JobApplication.job_posting).options(
+        contains_eager(JobApplication.job_posting).load_only(JobPosting.id, JobPosting.title, JobPosting.company)
+    )
     
     # Apply status filter
     if status_filter != 'all':
-        query = query.filter_by(status=status_filter)
-    
-    # Apply sorting
-    if sort_by == 'date_desc':
-        query = query.order_by(JobApplication.application_date.desc())
-    elif sort_by == 'date_asc':
-        query = query.order_by(JobApplication.application_date.asc())
-    elif sort_by == 'company':
-        query = query.join(JobPosting).order_by(JobPosting.company)
+        query = query.filter(JobApplication.status == status_filter)
     
-    applications = query.all()
-    
-    # Get statistics
-    total_apps = JobApplication.query.filter_by(user_profile_id=profile.id).count()
-    active_apps = JobApplication.query.filter_by(user_profile_id=profile.id).filter(
-        JobApplication.status.in_(['Applied', 'Phone Screen', 'Interview', 'Technical Round', 'Final Round'])
-    ).count()
-    offers = JobApplication.query.filter_by(user_profile_id=profile.id, status='Offer').count()
+    # Fetch one page, seeking past the cursor rather than using OFFSET
+    order_by, key = APPLICATION_SORTS[sort_by]
+    try:
+        page = keyset_page(query, order_by, key=key,
+                           cursor=request.args.get('cursor'),
+                           page_size=page_size_from_request())
+    except InvalidCursor:
+        abort(400)
+    
+    # Get statistics in a single aggregate query
+    total_apps, active_apps, offers = db.session.query(
+        func.count(JobApplication.id),
+        func.coalesce(func.sum(case((JobApplication.status.in_(ACTIVE_STATUSES), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((JobApplication.status == 'Offer', 1), else_=0)), 0),
+    ).filter(JobApplication.user_profile_id == profile.id).one()
     
     return render_template('applications.html', 
-                         applications=applications,
+                         applications=page.items,
+                         page=page,
+                         per_page=request.args.get('per_page', type=int),
                          total_apps=total_apps,
                          active_apps=active_apps,
                          offers=offers,
                          status_filter=status_filter,
                          sort_by=sort_by)
 
-@app.route('/applications/add', methods=['GET', 'POST'])
+@route('/applications/add', methods=['GET', 'POST'])
 def add_application():
     """Add a new job application"""
-    profile = UserProfile.query.first()
+    profile = get_profile()
     
     if not profile:
         flash('Please create your profile first.', 'error')
@@ -527,7 +824,7 @@ def add_application():
     
     return render_template('add_application.html', jobs=jobs, profile=profile)
 
-@app.route('/applications/<int:app_id>')
+@route('/applications/<int:app_id>')
 def view_application(app_id):
     """View single application details"""
     application = JobApplication.query.get_or_404(app_id)
@@ -541,7 +838,7 @@ def view_application(app_id):
                          application=application,
                          related_content=related_content)
 
-@app.route('/applications/<int:app_id>/edit', methods=['GET', 'POST'])
+@route('/applications/<int:app_id>/edit', methods=['GET', 'POST'])
 def edit_application(app_id):
     """Edit an existing application"""
     application = JobApplication.query.get_or_404(app_id)
@@ -585,7 +882,7 @@ def edit_application(app_id):
     
     return render_template('edit_application.html', application=application)
 
-@app.route('/applications/<int:app_id>/delete', methods=['POST'])
+@route('/applications/<int:app_id>/delete', methods=['POST'])
 def delete_application(app_id):
     """Delete an application"""
     try:
@@ -601,7 +898,7 @@ def delete_application(app_id):
     
     return redirect(url_for('applications'))
 
-@app.route('/applications/<int:app_id>/quick-update', methods=['POST'])
+@route('/applications/<int:app_id>/quick-update', methods=['POST'])
 def quick_update_status(app_id):
     """Quick update application status via AJAX"""
     try:
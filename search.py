@@ -0,0 +1,225 @@
+import re
+import logging
+from markupsafe import Markup, escape
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload, load_only
+from app import db
+from models import JobPosting, GeneratedContent
+
+# Control characters wrapped around matched terms by the database; swapped for
+# <mark> tags only after the rest of the snippet has been HTML-escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+SEARCH_KINDS = ('job_posting', 'generated_content')
+
+# SQLite: external-content FTS5 tables read their text through views that
+# decompress the stored values (see compression.py), and triggers keep the
+# index in sync with every write, including bulk Core inserts. decompress_text()
+# is a Python function registered on each connection the app's engine opens, so
+# connections opened any other way (the sqlite3 shell, backup or ETL scripts, a
+# second engine) cannot insert, update or delete job_posting or generated_content
+# rows; scripts should connect with compression.connect_sqlite().
+SQLITE_SCHEMA = [
+    """CREATE VIEW IF NOT EXISTS job_posting_text AS
+        SELECT id, title, company, decompress_text(description) AS description FROM job_posting""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS job_posting_fts USING fts5(
+        title, company, description, content='job_posting_text', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS job_posting_fts_insert AFTER INSERT ON job_posting BEGIN
+        INSERT INTO job_posting_fts (rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, decompress_text(new.description));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_posting_fts_delete AFTER DELETE ON job_posting BEGIN
+        INSERT INTO job_posting_fts (job_posting_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, decompress_text(old.description));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_posting_fts_update AFTER UPDATE OF title, company, description ON job_posting BEGIN
+        INSERT INTO job_posting_fts (job_posting_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, decompress_text(old.description));
+        INSERT INTO job_posting_fts (rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, decompress_text(new.description));
+    END""",
+    """CREATE VIEW IF NOT EXISTS generated_content_text AS
+        SELECT id, decompress_text(content) AS content FROM generated_content""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS generated_content_fts USING fts5(
+        content, content='generated_content_text', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS generated_content_fts_insert AFTER INSERT ON generated_content BEGIN
+        INSERT INTO generated_content_fts (rowid, content) VALUES (new.id, decompress_text(new.content));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS generated_content_fts_delete AFTER DELETE ON generated_content BEGIN
+        INSERT INTO generated_content_fts (generated_content_fts, rowid, content)
+        VALUES ('delete', old.id, decompress_text(old.content));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS generated_content_fts_update AFTER UPDATE OF content ON generated_content BEGIN
+        INSERT INTO generated_content_fts (generated_content_fts, rowid, content)
+        VALUES ('delete', old.id, decompress_text(old.content));
+        INSERT INTO generated_content_fts (rowid, content) VALUES (new.id, decompress_text(new.content));
+    END""",
+    "INSERT INTO job_posting_fts (job_posting_fts) VALUES ('rebuild')",
+    "INSERT INTO generated_content_fts (generated_content_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS job_posting_fts_insert',
+    'DROP TRIGGER IF EXISTS job_posting_fts_delete',
+    'DROP TRIGGER IF EXISTS job_posting_fts_update',
+    'DROP TRIGGER IF EXISTS generated_content_fts_insert',
+    'DROP TRIGGER IF EXISTS generated_content_fts_delete',
+    'DROP TRIGGER IF EXISTS generated_content_fts_update',
+    'DROP TABLE IF EXISTS job_posting_fts',
+    'DROP TABLE IF EXISTS generated_content_fts',
+    'DROP VIEW IF EXISTS job_posting_text',
+    'DROP VIEW IF EXISTS generated_content_text',
+]
+
+# PostgreSQL: stored generated tsvector columns are recomputed by the database on
+# every insert and update, and GIN indexes make @@ matches index lookups
+POSTGRES_SCHEMA = [
+    """ALTER TABLE job_posting ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED""",
+    'CREATE INDEX IF NOT EXISTS ix_job_posting_search_vector ON job_posting USING GIN (search_vector)',
+    """ALTER TABLE generated_content ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(content, ''))) STORED""",
+    'CREATE INDEX IF NOT EXISTS ix_generated_content_search_vector ON generated_content USING GIN (search_vector)',
+]
+
+POSTGRES_DROP = [
+    'ALTER TABLE job_posting DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE generated_content DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_QUERIES = {
+    # bm25() is lower for better matches; title and company matches count for more than the body
+    'job_posting': """SELECT 'job_posting' AS kind, rowid AS id, -bm25(job_posting_fts, 10.0, 5.0, 1.0) AS score
+        FROM job_posting_fts WHERE job_posting_fts MATCH :query""",
+    'generated_content': """SELECT 'generated_content' AS kind, rowid AS id, -bm25(generated_content_fts) AS score
+        FROM generated_content_fts WHERE generated_content_fts MATCH :query""",
+}
+
+# Snippets are only built for the rows on the page being shown, after ranking
+SQLITE_SNIPPETS = {
+    'job_posting': """SELECT rowid AS id, snippet(job_posting_fts, -1, :start, :end, ' … ', 16) AS snippet
+        FROM job_posting_fts WHERE job_posting_fts MATCH :query AND rowid IN ({ids})""",
+    'generated_content': """SELECT rowid AS id, snippet(generated_content_fts, 0, :start, :end, ' … ', 16) AS snippet
+        FROM generated_content_fts WHERE generated_content_fts MATCH :query AND rowid IN ({ids})""",
+}
+
+POSTGRES_QUERIES = {
+    'job_posting': """SELECT 'job_posting' AS kind, id, ts_rank_cd(search_vector, query) AS score
+        FROM job_posting, websearch_to_tsquery('english', :query) AS query WHERE search_vector @@ query""",
+    'generated_content': """SELECT 'generated_content' AS kind, id, ts_rank_cd(search_vector, query) AS score
+        FROM generated_content, websearch_to_tsquery('english', :query) AS query WHERE search_vector @@ query""",
+}
+
+# Headlines are costly, so they are only computed for the page being shown
+POSTGRES_HEADLINES = """SELECT hits.kind, hits.id, hits.score,
+        ts_headline('english', coalesce(job_posting.description, generated_content.content, ''),
+                    websearch_to_tsquery('english', :query),
+                    'StartSel=' || :start || ', StopSel=' || :end || ', MaxWords=35, MinWords=15, MaxFragments=2') AS snippet
+    FROM ({hits}) AS hits
+    LEFT JOIN job_posting ON hits.kind = 'job_posting' AND job_posting.id = hits.id
+    LEFT JOIN generated_content ON hits.kind = 'generated_content' AND generated_content.id = hits.id
+    ORDER BY hits.score DESC, hits.kind, hits.id"""
+
+
+def create_search_index(connection):
+    """Create and populate the full-text index for the connection's database"""
+    statements = POSTGRES_SCHEMA if connection.dialect.name == 'postgresql' else SQLITE_SCHEMA
+    for statement in statements:
+        connection.execute(text(statement))
+
+def drop_search_index(connection):
+    statements = POSTGRES_DROP if connection.dialect.name == 'postgresql' else SQLITE_DROP
+    for statement in statements:
+        connection.execute(text(statement))
+
+def fts5_query(terms):
+    """FTS5 MATCH expression requiring every word, with prefix matching on the last one.
+
+    Words are quoted so user input can never be parsed as FTS5 query syntax.
+    """
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def highlight(snippet):
+    """Escape a database snippet and turn the highlight markers into <mark> tags"""
+    escaped = str(escape(snippet or ''))
+    return Markup(escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+
+class SearchResult:
+    """One ranked hit: a JobPosting or GeneratedContent row plus its highlighted snippet"""
+
+    def __init__(self, kind, item, score, snippet):
+        self.kind = kind
+        self.item = item
+        self.score = score
+        self.snippet = snippet
+
+
+def search(terms, kinds=SEARCH_KINDS, page=1, page_size=20):
+    """Ranked full-text search over job postings and generated content.
+
+    Returns ``(results, has_next)`` for the requested 1-based page.
+    """
+    kinds = [kind for kind in kinds if kind in SEARCH_KINDS]
+    postgres = db.engine.dialect.name == 'postgresql'
+
+    query = terms.strip() if postgres else fts5_query(terms)
+    if not query or not kinds:
+        return [], False
+
+    params = {'query': query, 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END,
+              'limit': page_size + 1, 'offset': (max(page, 1) - 1) * page_size}
+    queries = POSTGRES_QUERIES if postgres else SQLITE_QUERIES
+    hits = ' UNION ALL '.join(queries[kind] for kind in kinds)
+    hits = f'{hits} ORDER BY score DESC, kind, id LIMIT :limit OFFSET :offset'
+    if postgres:
+        hits = POSTGRES_HEADLINES.format(hits=hits)
+
+    try:
+        rows = db.session.execute(text(hits), params).fetchall()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        if postgres:
+            snippets = {(row.kind, row.id): row.snippet for row in rows}
+        else:
+            snippets = {}
+            for kind in kinds:
+                ids = [int(row.id) for row in rows if row.kind == kind]
+                if ids:
+                    statement = SQLITE_SNIPPETS[kind].format(ids=', '.join(str(i) for i in ids))
+                    snippets.update(((kind, row.id), row.snippet)
+                                    for row in db.session.execute(text(statement), params))
+    except Exception as e:
+        logging.error(f"Search for {terms!r} failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+    # Load the page's rows in one query per kind, keeping only the columns the results list shows
+    ids = {kind: [row.id for row in rows if row.kind == kind] for kind in kinds}
+    items = {}
+    if ids.get('job_posting'):
+        postings = JobPosting.query.options(
+            load_only(JobPosting.id, JobPosting.title, JobPosting.company, JobPosting.created_at)
+        ).filter(JobPosting.id.in_(ids['job_posting']))
+        items.update((('job_posting', posting.id), posting) for posting in postings)
+    if ids.get('generated_content'):
+        contents = GeneratedContent.query.options(
+            load_only(GeneratedContent.id, GeneratedContent.content_type,
+                      GeneratedContent.job_posting_id, GeneratedContent.created_at),
+            joinedload(GeneratedContent.job_posting).load_only(JobPosting.id, JobPosting.title, JobPosting.company)
+        ).filter(GeneratedContent.id.in_(ids['generated_content']))
+        items.update((('generated_content', content.id), content) for content in contents)
+
+    results = [
+        SearchResult(row.kind, items[(row.kind, row.id)], row.score, highlight(snippets.get((row.kind, row.id))))
+        for row in rows if (row.kind, row.id) in items
+    ]
+    return results, has_next
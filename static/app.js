@@ -23,6 +23,9 @@ function initializeApp() {
     
     // Character counters for textareas
     initializeCharacterCounters();
+
+    // Message left by a finished background job before redirecting here
+    showJobNotice();
 }
 
 // Auto-resize textareas based on content
@@ -205,14 +208,14 @@ function showNotification(message, type = 'info') {
                 <strong class="me-auto">Notification</strong>
                 <button type="button" class="btn-close" data-bs-dismiss="toast" aria-label="Close"></button>
             </div>
-            <div class="toast-body">
-                ${message}
-            </div>
+            <div class="toast-body"></div>
         </div>
     `;
     
     toastContainer.insertAdjacentHTML('beforeend', toastHtml);
     const toastElement = document.getElementById(toastId);
+    // Messages can come from the server, so they are never parsed as HTML
+    toastElement.querySelector('.toast-body').textContent = message;
     const toast = new bootstrap.Toast(toastElement, { delay: 3000 });
     
     toast.show();
@@ -338,6 +341,108 @@ function debounce(func, wait) {
     };
 }
 
+const JOB_NOTICE_KEY = 'jobAssistant.jobNotice';
+
+// Show (once) the message a finished job left for the page it redirected to
+function showJobNotice() {
+    const notice = sessionStorage.getItem(JOB_NOTICE_KEY);
+    if (!notice) {
+        return;
+    }
+    sessionStorage.removeItem(JOB_NOTICE_KEY);
+    try {
+        const { message, category } = JSON.parse(notice);
+        showNotification(message, category);
+    } catch (err) {
+        console.error('Could not show job notice: ', err);
+    }
+}
+
+// Poll a background job until it finishes, then follow its redirect
+function pollJobStatus(statusUrl, interval = 1000) {
+    const pending = document.getElementById('job-pending');
+    const failed = document.getElementById('job-failed');
+    const progressList = document.getElementById('job-progress');
+
+    const poll = () => {
+        fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => {
+                if (progressList && data.progress) {
+                    progressList.innerHTML = Object.entries(data.progress).map(([step, state]) =>
+                        `<li><small class="text-muted">${step.replace(/_/g, ' ')}: ${state}</small></li>`
+                    ).join('');
+                }
+
+                if (data.status === 'finished' && data.redirect_url) {
+                    if (data.message) {
+                        sessionStorage.setItem(JOB_NOTICE_KEY, JSON.stringify({
+                            message: data.message,
+                            category: data.message_category || 'info'
+                        }));
+                    }
+                    window.location.href = data.redirect_url;
+                } else if (data.status === 'failed' || !data.success) {
+                    document.getElementById('job-error').textContent = data.error || data.message || '';
+                    pending.classList.add('d-none');
+                    failed.classList.remove('d-none');
+                } else {
+                    setTimeout(poll, interval);
+                }
+            })
+            .catch(err => {
+                console.error('Could not check job status: ', err);
+                setTimeout(poll, interval * 2);
+            });
+    };
+
+    poll();
+}
+
+// Stream generated text from a Server-Sent Events endpoint into an element
+function streamContent(streamUrl, target, statusElement = null) {
+    const source = new EventSource(streamUrl);
+
+    source.onmessage = function(event) {
+        const data = JSON.parse(event.data);
+        target.textContent += data.text;
+    };
+
+    source.addEventListener('done', function(event) {
+        source.close();
+        const data = JSON.parse(event.data);
+        if (statusElement) {
+            statusElement.innerHTML = `<i class="fas fa-check me-1"></i>Saved. <a href="${data.url}">Permalink</a>`;
+        }
+    });
+
+    source.addEventListener('failed', function(event) {
+        source.close();
+        const data = JSON.parse(event.data);
+        if (statusElement) {
+            // The message is the server's error text, so it is set as text, like the streamed content
+            const error = document.createElement('span');
+            error.className = 'text-danger';
+            error.innerHTML = '<i class="fas fa-exclamation-circle me-1"></i>';
+            error.append(data.message);
+            statusElement.replaceChildren(error);
+        }
+        showNotification(data.message, 'error');
+    });
+
+    // The browser would otherwise reconnect and start a second generation
+    source.onerror = function() {
+        if (source.readyState !== EventSource.CLOSED) {
+            source.close();
+            if (statusElement) {
+                statusElement.innerHTML = '<span class="text-danger">Connection lost while generating content.</span>';
+            }
+        }
+    };
+
+    return source;
+}
+
 // Initialize advanced features
 setTimeout(() => {
     initializeSmoothScrolling();
@@ -350,5 +455,7 @@ window.JobAssistant = {
     copyToClipboard,
     showNotification,
     showLoadingState,
-    restoreButtonState
+    restoreButtonState,
+    pollJobStatus,
+    streamContent
 };
@@ -0,0 +1,357 @@
+import json
+import logging
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from models import JobPosting, UserProfile, GeneratedContent
+from gemini_service import JobAssistantService, RESUME_FIELDS
+from jobs import job_queue
+import prompt_digest
+from profile_cache import CachedProfile, get_profile, invalidate_profile
+from resume_fingerprint import SECTION_FIELDS, resume_fingerprint, split_sections, section_hashes, plan_reparse
+from metrics import RESUME_PARSES
+
+
+def _load_posting(job_posting_id):
+    job_posting = db.session.get(JobPosting, job_posting_id)
+    if not job_posting:
+        raise ValueError('Job posting not found.')
+    return job_posting
+
+def _load_profile(user_profile_id):
+    # The cached copy carries prebuilt prompt blocks for the current version of the profile
+    profile = get_profile()
+    if not profile or profile.id != user_profile_id:
+        profile = db.session.get(UserProfile, user_profile_id)
+    if not profile:
+        raise ValueError('Please create your profile first.')
+    return profile
+
+def posting_digest(job_posting):
+    """The posting's text for generation prompts: a digest stored on the posting, built on first use.
+
+    It is made from the latest job analysis when there is one (a structured
+    summary of what the role asks for), otherwise from the description, and
+    cut to JOB_DIGEST_TOKENS. A description shorter than that is used as is.
+    """
+    if not prompt_digest.PROMPT_DIGESTS_ENABLED:
+        return job_posting.description
+
+    analysis_key = f'analysis:{prompt_digest.JOB_DIGEST_TOKENS}'
+    if job_posting.digest is None or job_posting.digest_key != analysis_key:
+        analysis = db.session.query(GeneratedContent.content).filter(
+            GeneratedContent.job_posting_id == job_posting.id,
+            GeneratedContent.content_type == 'job_analysis'
+        ).order_by(GeneratedContent.created_at.desc()).limit(1).scalar()
+        key = analysis_key if analysis else f'description:{prompt_digest.JOB_DIGEST_TOKENS}'
+        if job_posting.digest is None or job_posting.digest_key != key:
+            digest = prompt_digest.compact_text(job_posting.description, prompt_digest.JOB_DIGEST_TOKENS)
+            if analysis:
+                from_analysis = prompt_digest.compact_text(analysis, prompt_digest.JOB_DIGEST_TOKENS)
+                if prompt_digest.estimate_tokens(from_analysis) < prompt_digest.estimate_tokens(digest):
+                    digest = from_analysis
+            # Written with an UPDATE: a streaming response's posting has outlived its session
+            db.session.query(JobPosting).filter(JobPosting.id == job_posting.id).update(
+                {JobPosting.digest: digest, JobPosting.digest_key: key}, synchronize_session=False)
+            db.session.commit()
+            set_committed_value(job_posting, 'digest', digest)
+            set_committed_value(job_posting, 'digest_key', key)
+
+    saved = prompt_digest.estimate_tokens(job_posting.description) - prompt_digest.estimate_tokens(job_posting.digest)
+    return prompt_digest.Digest(job_posting.digest, saved)
+
+def _reset_posting_digest(job_posting_id):
+    # A new analysis makes a better digest; it is rebuilt on next use
+    db.session.query(JobPosting).filter(JobPosting.id == job_posting_id).update(
+        {JobPosting.digest: None, JobPosting.digest_key: None}, synchronize_session=False)
+
+def save_generated_content(content_type, text, job_posting_id, user_profile_id=None):
+    """Persist a generated artifact and return the new row"""
+    content = GeneratedContent()
+    content.content_type = content_type
+    content.content = text
+    content.job_posting_id = job_posting_id
+    content.user_profile_id = user_profile_id
+    db.session.add(content)
+    if content_type == 'job_analysis' and job_posting_id:
+        _reset_posting_digest(job_posting_id)
+    db.session.commit()
+    return content
+
+@job_queue.task('job_analysis')
+def analyze_job_task(job, job_posting_id, use_cache=True):
+    """Analyze a saved job posting with Gemini"""
+    job_posting = _load_posting(job_posting_id)
+    analysis = JobAssistantService.analyze_job_posting(job_posting.description, use_cache=use_cache)
+    content = save_generated_content('job_analysis', analysis, job_posting.id)
+    return {'content_id': content.id}
+
+@job_queue.task('resume_customization')
+def customize_resume_task(job, job_posting_id, user_profile_id, use_cache=True):
+    """Generate resume customization suggestions for a posting"""
+    job_posting = _load_posting(job_posting_id)
+    profile = _load_profile(user_profile_id)
+    customization = JobAssistantService.customize_resume(
+        posting_digest(job_posting),
+        profile,
+        use_cache=use_cache
+    )
+    content = save_generated_content('resume_customization', customization, job_posting.id, profile.id)
+    return {'content_id': content.id}
+
+@job_queue.task('cover_letter')
+def cover_letter_task(job, job_posting_id, user_profile_id, use_cache=True):
+    """Generate a cover letter for a posting"""
+    job_posting = _load_posting(job_posting_id)
+    profile = _load_profile(user_profile_id)
+    cover_letter = JobAssistantService.generate_cover_letter(
+        posting_digest(job_posting),
+        profile,
+        job_posting.company,
+        job_posting.title,
+        use_cache=use_cache
+    )
+    content = save_generated_content('cover_letter', cover_letter, job_posting.id, profile.id)
+    return {'content_id': content.id}
+
+@job_queue.task('interview_questions')
+def interview_questions_task(job, job_posting_id, user_profile_id, use_cache=True):
+    """Generate interview questions and suggested answers for a posting"""
+    job_posting = _load_posting(job_posting_id)
+    profile = _load_profile(user_profile_id)
+    questions = JobAssistantService.generate_interview_questions(
+        posting_digest(job_posting),
+        profile,
+        use_cache=use_cache
+    )
+    content = save_generated_content('interview_questions', questions, job_posting.id, profile.id)
+    return {'content_id': content.id}
+
+@job_queue.task('application_kit')
+def application_kit_task(job, job_posting_id, user_profile_id, use_cache=True):
+    """Generate every artifact for a posting at once and save them together"""
+    job_posting = _load_posting(job_posting_id)
+    profile = _load_profile(user_profile_id)
+    job_digest = posting_digest(job_posting)
+
+    # Progress commits expire loaded objects; detach the profile so the worker
+    # threads building prompts never trigger a refresh on this thread's session
+    # (a CachedProfile is already a plain copy)
+    if not isinstance(profile, CachedProfile):
+        db.session.expunge(profile)
+
+    job_queue.update_progress(job, **{content_type: 'queued' for content_type in JobAssistantService.APPLICATION_KIT})
+    results, errors = JobAssistantService.generate_application_kit(
+        job_posting.description,
+        profile,
+        job_posting.company,
+        job_posting.title,
+        use_cache=use_cache,
+        on_progress=lambda content_type, state: job_queue.update_progress(job, **{content_type: state}),
+        job_digest=job_digest
+    )
+
+    if not results:
+        raise ValueError('; '.join(f'{content_type}: {error}' for content_type, error in errors.items()))
+
+    return {
+        'job_posting_id': job_posting.id,
+        'content_ids': save_application_kit(results, job_posting.id, profile.id),
+        'errors': errors,
+    }
+
+def save_application_kit(results, job_posting_id, user_profile_id):
+    """Save all generated artifacts in a single transaction and return their ids by content type"""
+    contents = {}
+    for content_type in JobAssistantService.APPLICATION_KIT:
+        if content_type not in results:
+            continue
+        content = GeneratedContent()
+        content.content_type = content_type
+        content.content = results[content_type]
+        content.job_posting_id = job_posting_id
+        content.user_profile_id = None if content_type == 'job_analysis' else user_profile_id
+        db.session.add(content)
+        contents[content_type] = content
+    if 'job_analysis' in contents:
+        _reset_posting_digest(job_posting_id)
+    db.session.commit()
+    return {content_type: content.id for content_type, content in contents.items()}
+
+
+# Coroutine versions of the generation tasks, used with JOB_BACKEND=async. They
+# read and write the database through job_queue.run_sync and only hold plain
+# values (and a CachedProfile) while they wait on the LLM.
+
+def _load_inputs(job_posting_id, user_profile_id=None):
+    """(description, company, title, profile, digest) for a generation, detached from the session"""
+    job_posting = _load_posting(job_posting_id)
+    profile = digest = None
+    if user_profile_id is not None:
+        profile = _load_profile(user_profile_id)
+        if not isinstance(profile, CachedProfile):
+            profile = CachedProfile(profile)
+        digest = posting_digest(job_posting)
+    return job_posting.description, job_posting.company, job_posting.title, profile, digest
+
+def _save_content_id(content_type, text, job_posting_id, user_profile_id=None):
+    return save_generated_content(content_type, text, job_posting_id, user_profile_id).id
+
+@job_queue.async_task('job_analysis')
+async def analyze_job_async(job_id, job_posting_id, use_cache=True):
+    description, _, _, _, _ = await job_queue.run_sync(_load_inputs, job_posting_id)
+    analysis = await JobAssistantService.analyze_job_posting_async(description, use_cache=use_cache)
+    return {'content_id': await job_queue.run_sync(_save_content_id, 'job_analysis', analysis, job_posting_id)}
+
+@job_queue.async_task('resume_customization')
+async def customize_resume_async(job_id, job_posting_id, user_profile_id, use_cache=True):
+    _, _, _, profile, digest = await job_queue.run_sync(_load_inputs, job_posting_id, user_profile_id)
+    customization = await JobAssistantService.customize_resume_async(digest, profile, use_cache=use_cache)
+    return {'content_id': await job_queue.run_sync(
+        _save_content_id, 'resume_customization', customization, job_posting_id, profile.id)}
+
+@job_queue.async_task('cover_letter')
+async def cover_letter_async(job_id, job_posting_id, user_profile_id, use_cache=True):
+    _, company, title, profile, digest = await job_queue.run_sync(_load_inputs, job_posting_id, user_profile_id)
+    cover_letter = await JobAssistantService.generate_cover_letter_async(
+        digest, profile, company, title, use_cache=use_cache)
+    return {'content_id': await job_queue.run_sync(
+        _save_content_id, 'cover_letter', cover_letter, job_posting_id, profile.id)}
+
+@job_queue.async_task('interview_questions')
+async def interview_questions_async(job_id, job_posting_id, user_profile_id, use_cache=True):
+    _, _, _, profile, digest = await job_queue.run_sync(_load_inputs, job_posting_id, user_profile_id)
+    questions = await JobAssistantService.generate_interview_questions_async(digest, profile, use_cache=use_cache)
+    return {'content_id': await job_queue.run_sync(
+        _save_content_id, 'interview_questions', questions, job_posting_id, profile.id)}
+
+@job_queue.async_task('application_kit')
+async def application_kit_async(job_id, job_posting_id, user_profile_id, use_cache=True):
+    description, company, title, profile, digest = await job_queue.run_sync(
+        _load_inputs, job_posting_id, user_profile_id)
+
+    await job_queue.update_progress_async(
+        job_id, **{content_type: 'queued' for content_type in JobAssistantService.APPLICATION_KIT})
+    results, errors = await JobAssistantService.generate_application_kit_async(
+        description, profile, company, title, use_cache=use_cache,
+        on_progress=lambda content_type, state: job_queue.update_progress_async(job_id, **{content_type: state}),
+        job_digest=digest
+    )
+
+    if not results:
+        raise ValueError('; '.join(f'{content_type}: {error}' for content_type, error in errors.items()))
+
+    return {
+        'job_posting_id': job_posting_id,
+        'content_ids': await job_queue.run_sync(save_application_kit, results, job_posting_id, profile.id),
+        'errors': errors,
+    }
+
+@job_queue.task('resume_parse')
+def parse_resume_task(job, resume_text):
+    """Parse uploaded resume text and create or update the profile.
+
+    Only the sections that changed since the last upload are sent to the LLM;
+    an upload whose normalized text is unchanged is not parsed at all.
+    """
+    profile = UserProfile.query.first()
+    fingerprint = resume_fingerprint(resume_text)
+    if profile and profile.resume_fingerprint == fingerprint:
+        RESUME_PARSES.inc(('unchanged',))
+        return {'user_profile_id': profile.id, 'sections_parsed': []}
+
+    sections = split_sections(resume_text)
+    plan = plan_reparse(json.loads(profile.resume_sections or 'null') if profile else None, sections)
+    if plan is None:
+        RESUME_PARSES.inc(('full',))
+        text, fields, cleared = resume_text, [field for field, _ in RESUME_FIELDS], []
+    else:
+        text, fields, cleared = plan
+        RESUME_PARSES.inc(('partial' if fields else 'unchanged',))
+
+    parsed_data = {}
+    if fields:
+        # Fields are saved together at the end, but reported as they stream in
+        job_queue.update_progress(job, **{field: 'parsing' for field in fields})
+        parsed_data = JobAssistantService.parse_resume(
+            text, fields=None if plan is None else fields,
+            on_field=lambda field, value: job_queue.update_progress(job, **{field: 'done'}))
+    parsed_data.update((field, '') for field in cleared)
+
+    hashes = section_hashes(sections)
+    missing = set(fields) - parsed_data.keys()
+    if missing:
+        # A response cut off part way: keep what arrived, and parse the rest on the next upload
+        hashes = {section: digest for section, digest in hashes.items()
+                  if not missing & set(SECTION_FIELDS[section])}
+        if missing - {field for section in sections for field in SECTION_FIELDS[section]}:
+            hashes = {}
+    sections_parsed = [section for section in sections
+                       if set(SECTION_FIELDS[section]) & (set(fields) - missing)]
+
+    if not profile:
+        profile = UserProfile(
+            name=parsed_data.get('name', ''),
+            email=parsed_data.get('email', ''),
+            phone=parsed_data.get('phone', ''),
+            summary=parsed_data.get('summary', ''),
+            experience=parsed_data.get('experience', ''),
+            education=parsed_data.get('education', ''),
+            skills=parsed_data.get('skills', ''),
+            projects=parsed_data.get('projects', ''),
+            certifications=parsed_data.get('certifications', '')
+        )
+        db.session.add(profile)
+    else:
+        update_profile_from_parsed_data(profile, parsed_data)
+
+    profile.resume_fingerprint = None if missing else fingerprint
+    profile.resume_sections = json.dumps(hashes)
+    db.session.commit()
+    invalidate_profile()
+    return {'user_profile_id': profile.id, 'sections_parsed': sections_parsed}
+
+def update_profile_from_parsed_data(profile, parsed_data):
+    """Update profile fields from AI-parsed resume data"""
+    try:
+        profile.name = parsed_data.get('name', profile.name)
+        profile.email = parsed_data.get('email', profile.email)
+        profile.phone = parsed_data.get('phone', profile.phone)
+        profile.summary = parsed_data.get('summary', profile.summary)
+
+        # Handle experience - convert to string if it's a dict/list
+        experience = parsed_data.get('experience', profile.experience)
+        if isinstance(experience, (dict, list)):
+            profile.experience = json.dumps(experience, indent=2)
+        else:
+            profile.experience = experience
+
+        # Handle education - convert to string if it's a dict/list
+        education = parsed_data.get('education', profile.education)
+        if isinstance(education, (dict, list)):
+            profile.education = json.dumps(education, indent=2)
+        else:
+            profile.education = education
+
+        # Handle skills - convert to string if it's a dict/list
+        skills = parsed_data.get('skills', profile.skills)
+        if isinstance(skills, (dict, list)):
+            profile.skills = json.dumps(skills, indent=2)
+        else:
+            profile.skills = skills
+
+        # Handle projects - convert to string if it's a dict/list
+        projects = parsed_data.get('projects', profile.projects)
+        if isinstance(projects, (dict, list)):
+            profile.projects = json.dumps(projects, indent=2)
+        else:
+            profile.projects = projects
+
+        # Handle certifications - convert to string if it's a dict/list
+        certifications = parsed_data.get('certifications', profile.certifications)
+        if isinstance(certifications, (dict, list)):
+            profile.certifications = json.dumps(certifications, indent=2)
+        else:
+            profile.certifications = certifications
+    except Exception as e:
+        logging.error(f"Error updating profile: {e}")
+        raise
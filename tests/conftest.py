@@ -0,0 +1,15 @@
+import pytest
+from app import create_app, init_db
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """App on a fresh in-memory SQLite database with the offline LLM backend"""
+    monkeypatch.setenv('LLM_BACKEND', 'stub')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'JOB_BACKEND': 'inline',
+    })
+    init_db(app)
+    return app
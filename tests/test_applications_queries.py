@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from models import JobApplication, JobPosting, UserProfile
+
+
+@pytest.fixture(autouse=True)
+def profile(app):
+    with app.app_context():
+        db.session.add(UserProfile(name='Test User', email='test@example.com'))
+        db.session.commit()
+
+
+def add_applications(count):
+    profile = UserProfile.query.one()
+    for n in range(count):
+        posting = JobPosting(title=f'Engineer {n}', company=f'Company {n}', description='Build things.')
+        db.session.add(JobApplication(job_posting=posting, user_profile_id=profile.id, status='Applied'))
+    db.session.commit()
+
+
+def count_queries(app, client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_applications_query_count_does_not_grow_with_rows(app):
+    client = app.test_client()
+    url = '/applications?per_page=100'
+    # The first request loads the profile into the process-wide cache
+    client.get(url)
+
+    with app.app_context():
+        add_applications(5)
+    few = count_queries(app, client, url)
+
+    with app.app_context():
+        add_applications(45)
+    many = count_queries(app, client, url)
+
+    assert few == many == 3
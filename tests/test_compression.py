@@ -0,0 +1,94 @@
+import sqlite3
+import zlib
+import pytest
+from sqlalchemy import text
+import compression
+from app import create_app, db, init_db
+from compression import ZLIB_HEADER, ZSTD_HEADER, compress_text, connect_sqlite, decompress_text
+from models import JobPosting
+from search import search
+
+DESCRIPTION = 'Design and build data pipelines in Python and SQL for the analytics team. ' * 20
+
+
+def stored_description(posting_id):
+    return db.session.execute(text('SELECT description FROM job_posting WHERE id = :id'), {'id': posting_id}).scalar()
+
+def add_posting(description=DESCRIPTION):
+    posting = JobPosting(title='Data Engineer', company='Acme', description=description)
+    db.session.add(posting)
+    db.session.commit()
+    db.session.expire_all()
+    return posting.id
+
+
+def test_zlib_round_trip():
+    stored = compress_text(DESCRIPTION, codec='zlib')
+    assert stored.startswith(ZLIB_HEADER)
+    assert len(stored) < len(DESCRIPTION)
+    assert decompress_text(stored) == DESCRIPTION
+
+def test_zstd_round_trip():
+    pytest.importorskip('zstandard')
+    stored = compress_text(DESCRIPTION, codec='zstd')
+    assert stored.startswith(ZSTD_HEADER)
+    assert decompress_text(stored) == DESCRIPTION
+
+def test_short_and_uncompressed_values_stay_text():
+    assert compress_text('Short note', codec='zlib') == 'Short note'
+    assert compress_text(DESCRIPTION, codec='none') == DESCRIPTION
+    assert compress_text(None) is None
+    assert decompress_text(None) is None
+
+def test_legacy_values_read_back_unchanged():
+    # Rows written before compression: text, or text that SQLite handed back as bytes
+    assert decompress_text('Plain description') == 'Plain description'
+    assert decompress_text('Plain déscription'.encode('utf-8')) == 'Plain déscription'
+
+
+@pytest.mark.parametrize('codec, header', [('zlib', ZLIB_HEADER), ('zstd', ZSTD_HEADER), ('none', None)])
+def test_compressed_column_round_trip(app, monkeypatch, codec, header):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+    monkeypatch.setattr(compression, 'TEXT_COMPRESSION', codec)
+    with app.app_context():
+        posting_id = add_posting()
+        stored = stored_description(posting_id)
+        if header:
+            assert bytes(stored).startswith(header)
+        else:
+            assert stored == DESCRIPTION
+        assert db.session.get(JobPosting, posting_id).description == DESCRIPTION
+
+@pytest.mark.parametrize('stored', [
+    DESCRIPTION,
+    ZLIB_HEADER + zlib.compress(DESCRIPTION.encode('utf-8')),
+])
+def test_rows_written_by_other_versions_are_readable(app, stored):
+    with app.app_context():
+        posting_id = add_posting()
+        db.session.execute(text('UPDATE job_posting SET description = :d WHERE id = :id'),
+                           {'d': stored, 'id': posting_id})
+        db.session.commit()
+        db.session.expire_all()
+        assert db.session.get(JobPosting, posting_id).description == DESCRIPTION
+        # The full-text index was rebuilt from the decompressed text by the update trigger
+        assert [result.item.id for result in search('pipelines', kinds=['job_posting'])[0]] == [posting_id]
+
+
+def test_scripts_need_connect_sqlite_to_write(tmp_path, monkeypatch):
+    monkeypatch.setenv('LLM_BACKEND', 'stub')
+    path = tmp_path / 'app.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    init_db(app)
+    insert = "INSERT INTO job_posting (title, company, description) VALUES ('Data Engineer', 'Acme', 'Pipelines')"
+
+    with sqlite3.connect(path) as connection, pytest.raises(sqlite3.OperationalError, match='decompress_text'):
+        connection.execute(insert)
+
+    connection = connect_sqlite(path)
+    with connection:
+        connection.execute(insert)
+    connection.close()
+    with app.app_context():
+        assert len(search('pipelines', kinds=['job_posting'])[0]) == 1
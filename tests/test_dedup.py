@@ -0,0 +1,62 @@
+from app import db
+from dedup import fingerprint_missing, find_duplicates, reusable_analysis
+from models import GeneratedContent, JobPosting
+
+DESCRIPTION = (
+    'We are hiring a data engineer to design, build and operate the batch and streaming pipelines '
+    'behind our analytics platform. You will own ingestion from product databases and third party '
+    'APIs, model data in the warehouse with dbt, and keep Airflow schedules reliable. The role works '
+    'closely with analysts and machine learning engineers, reviews pull requests, writes design '
+    'documents and takes part in a light on-call rotation. Requirements: five years of Python and '
+    'SQL, experience with Spark or Flink, cloud data warehouses such as BigQuery or Snowflake, and a '
+    'habit of testing data as carefully as code. Nice to have: Kafka, Terraform and Kubernetes.'
+)
+
+
+def add_posting(title, description):
+    posting = JobPosting(title=title, company='Acme', description=description)
+    db.session.add(posting)
+    db.session.commit()
+    return posting
+
+
+def test_near_duplicate_posting_is_found(app):
+    with app.app_context():
+        original = add_posting('Data Engineer', DESCRIPTION)
+        add_posting('Pastry Chef', 'Bake bread, croissants and seasonal tarts for our neighbourhood bakery '
+                                   'from four in the morning, and train two apprentices.')
+        assert fingerprint_missing() == 2
+
+        # The same role pasted again with a small edit
+        repost = add_posting('Data Engineer', DESCRIPTION.replace('five years', 'four years'))
+        duplicates = find_duplicates(repost)
+
+        assert [posting.id for posting, _ in duplicates] == [original.id]
+        assert duplicates[0][1] >= 0.85
+
+
+def test_unrelated_posting_has_no_duplicates(app):
+    with app.app_context():
+        add_posting('Data Engineer', DESCRIPTION)
+        fingerprint_missing()
+
+        other = add_posting('Pastry Chef', 'Bake bread, croissants and seasonal tarts for our neighbourhood '
+                                           'bakery from four in the morning, and train two apprentices.')
+        assert find_duplicates(other) == []
+        assert reusable_analysis(other) is None
+
+
+def test_analysis_of_a_near_duplicate_is_reused(app):
+    with app.app_context():
+        original = add_posting('Data Engineer', DESCRIPTION)
+        db.session.add(GeneratedContent(content_type='job_analysis', content='Key skills: Python, SQL, Spark',
+                                        job_posting_id=original.id))
+        db.session.commit()
+        fingerprint_missing()
+
+        repost = add_posting('Data Engineer', DESCRIPTION + ' Apply by the end of the month.')
+        analysis, duplicate, score = reusable_analysis(repost)
+
+    assert analysis.content == 'Key skills: Python, SQL, Spark'
+    assert duplicate.id == original.id
+    assert score >= 0.85
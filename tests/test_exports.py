@@ -0,0 +1,28 @@
+import io
+import zipfile
+from datetime import datetime
+from app import db
+from exports import ZIP_EPOCH, content_export_query, stream_zip
+from models import GeneratedContent
+
+
+def test_rows_without_a_zip_timestamp_get_the_zip_epoch(app):
+    with app.app_context():
+        rows = [
+            GeneratedContent(content_type='cover_letter', content='Dear Acme',
+                             created_at=datetime(2024, 5, 6, 7, 8, 10)),
+            GeneratedContent(content_type='cover_letter', content='Dear Initech',
+                             created_at=datetime(1970, 1, 1)),
+            GeneratedContent(content_type='cover_letter', content='Dear Globex'),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        # A NULL created_at, as rows written before the column had a default have
+        db.session.execute(db.update(GeneratedContent).where(GeneratedContent.id == rows[2].id).values(created_at=None))
+        db.session.commit()
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(stream_zip(content_export_query()))))
+
+    entries = archive.infolist()
+    assert [entry.date_time for entry in entries] == [(2024, 5, 6, 7, 8, 10), ZIP_EPOCH, ZIP_EPOCH]
+    assert archive.read(entries[2]) == b'Dear Globex'
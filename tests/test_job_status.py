@@ -0,0 +1,22 @@
+import json
+import pytest
+from app import db
+from models import BackgroundJob
+
+
+@pytest.mark.parametrize('sections, category', [([], 'info'), (['skills'], 'success')])
+def test_finished_resume_parse_reports_its_message_in_json(app, sections, category):
+    with app.app_context():
+        db.session.add(BackgroundJob(id='a' * 32, job_type='resume_parse', status='finished',
+                                     result=json.dumps({'sections_parsed': sections})))
+        db.session.commit()
+
+    client = app.test_client()
+    for _ in range(2):
+        data = client.get(f'/jobs/{"a" * 32}/status').get_json()
+        assert data['status'] == 'finished'
+        assert data['message_category'] == category
+
+    # Polling must not queue flash messages for the next HTML page
+    with client.session_transaction() as session:
+        assert '_flashes' not in session
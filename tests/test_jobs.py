@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from app import db
+from jobs import job_queue
+from models import BackgroundJob
+
+LONG_AGO = datetime.utcnow() - timedelta(hours=2)
+
+
+def add_job(job_id, status, **values):
+    db.session.add(BackgroundJob(id=job_id, job_type='resume_parse', status=status, **values))
+    db.session.commit()
+    # updated_at defaults to now on insert; backdate it like an old row
+    BackgroundJob.query.filter_by(id=job_id).update({'updated_at': LONG_AGO})
+    db.session.commit()
+    db.session.expire_all()
+
+
+def test_queued_jobs_do_not_go_stale(app):
+    with app.app_context():
+        add_job('queued', 'queued', created_at=LONG_AGO)
+        assert job_queue.get('queued').status == 'queued'
+
+def test_running_job_without_heartbeat_is_failed(app):
+    with app.app_context():
+        add_job('lost', 'running', created_at=LONG_AGO, started_at=LONG_AGO)
+        job = job_queue.get('lost')
+        assert job.status == 'failed'
+        assert 'restarted' in job.error
+
+def test_running_job_with_recent_heartbeat_is_kept(app):
+    with app.app_context():
+        add_job('alive', 'running', created_at=LONG_AGO, started_at=LONG_AGO)
+        BackgroundJob.query.filter_by(id='alive').update({'updated_at': datetime.utcnow()})
+        db.session.commit()
+        assert job_queue.get('alive').status == 'running'
+
+def test_late_outcome_does_not_overwrite_failure(app):
+    with app.app_context():
+        add_job('late', 'running', started_at=LONG_AGO)
+        assert job_queue.get('late').status == 'failed'
+
+        job_queue._finish('late', result={'ok': True})
+        job = db.session.get(BackgroundJob, 'late')
+        assert job.status == 'failed'
+        assert job.result is None
@@ -0,0 +1,79 @@
+from app import db
+from matching import MatchIndex, tokenize
+from models import JobPosting
+
+PROFILE = 'Python Django PostgreSQL REST APIs'
+
+
+def add_posting(title, description):
+    posting = JobPosting(title=title, company='Acme', description=description)
+    db.session.add(posting)
+    db.session.commit()
+    return posting.id
+
+
+def test_tokenize_keeps_language_names_and_drops_stopwords():
+    assert tokenize('Experience with C++, C# and Node.js for the team') == ['c++', 'c#', 'node.js']
+
+def test_rank_orders_postings_by_similarity(app):
+    with app.app_context():
+        backend = add_posting('Backend Engineer', 'Build REST APIs in Python with Django and PostgreSQL.')
+        data = add_posting('Data Analyst', 'Python reporting with Excel dashboards.')
+        add_posting('Store Manager', 'Manage retail staff and inventory.')
+
+        index = MatchIndex()
+        assert index.refresh() == 3
+        ranked = index.rank(PROFILE)
+        assert [posting_id for posting_id, _ in ranked] == [backend, data]
+        assert ranked[0][1] > ranked[1][1] > 0
+        assert index.matched_terms(PROFILE, backend, limit=10)[0] in ('django', 'postgresql', 'rest', 'apis')
+
+def test_refresh_only_adds_new_postings(app):
+    with app.app_context():
+        add_posting('Backend Engineer', 'Python and Django.')
+        index = MatchIndex()
+        index.refresh()
+        assert index.refresh() == 0
+        newer = add_posting('Platform Engineer', 'Python and Kubernetes.')
+        assert index.refresh() == 1
+        assert newer in [posting_id for posting_id, _ in index.rank('kubernetes')]
+
+def test_deleted_posting_is_dropped_even_after_a_newer_one_is_added(app):
+    with app.app_context():
+        deleted = add_posting('Backend Engineer', 'Python and Django.')
+        kept = add_posting('Django Developer', 'Django templates and Python.')
+        index = MatchIndex()
+        index.refresh()
+
+        db.session.delete(db.session.get(JobPosting, deleted))
+        db.session.commit()
+        newer = add_posting('Python Developer', 'Python services.')
+        index.refresh()
+
+        assert sorted(posting_id for posting_id, _ in index.rank('python django')) == [kept, newer]
+
+def test_reused_highest_id_is_reindexed(app):
+    with app.app_context():
+        add_posting('Backend Engineer', 'Python and Django.')
+        last = add_posting('Rust Engineer', 'Rust systems programming.')
+        index = MatchIndex()
+        index.refresh()
+
+        db.session.delete(db.session.get(JobPosting, last))
+        db.session.commit()
+        # SQLite gives the next row the deleted highest id
+        assert add_posting('Go Engineer', 'Go microservices.') == last
+        index.refresh()
+
+        assert index.rank('rust') == []
+        assert [posting_id for posting_id, _ in index.rank('go microservices')] == [last]
+
+def test_rank_uses_the_vocabulary_of_its_snapshot(app):
+    with app.app_context():
+        add_posting('Backend Engineer', 'Python and Django.')
+        index = MatchIndex()
+        index.refresh()
+        vocabulary = index.vocabulary
+        index._reset()
+        # A reset swaps in new objects instead of clearing the ones a reader may hold
+        assert vocabulary and index.vocabulary == {}
@@ -0,0 +1,50 @@
+from app import db
+from metrics import LLM_PROMPT_TOKENS_SAVED, REQUEST_LATENCY, STREAM_DURATION
+from models import JobPosting, UserProfile
+
+
+def test_streamed_responses_are_timed_separately(app):
+    with app.app_context():
+        posting = JobPosting(title='Data Engineer', company='Acme', description='Pipelines')
+        db.session.add(posting)
+        db.session.commit()
+        url = f'/export/job/{posting.id}'
+
+    labels = ('export_job_content', 'GET', '200')
+    latency_before = REQUEST_LATENCY.count(labels)
+    streams_before = STREAM_DURATION.count(labels)
+
+    response = app.test_client().get(url, buffered=False)
+    # The response has started but its body has not been read yet
+    assert REQUEST_LATENCY.count(labels) == latency_before + 1
+    assert STREAM_DURATION.count(labels) == streams_before
+    response.get_data()
+    response.close()
+    assert REQUEST_LATENCY.count(labels) == latency_before + 1
+    assert STREAM_DURATION.count(labels) == streams_before + 1
+
+
+def test_digest_savings_are_counted_only_for_backend_calls(app, monkeypatch, tmp_path):
+    import gemini_service
+    from gemini_service import JobAssistantService
+    from llm_backends import StubBackend
+    from llm_cache import ResponseCache
+    from prompt_digest import Digest
+
+    monkeypatch.setattr(gemini_service, 'backend', StubBackend())
+    monkeypatch.setattr(gemini_service, 'response_cache', ResponseCache(path=str(tmp_path / 'cache.db')))
+    profile = UserProfile(name='Ada', summary='Builds data pipelines. ' * 400, skills='Python, SQL')
+    job = Digest('Data Engineer at Acme', tokens_saved=50)
+
+    prompt = JobAssistantService._cover_letter_prompt(job, profile, 'Acme', 'Data Engineer')
+    assert prompt.tokens_saved > 50
+    # Building a prompt alone counts nothing
+    before = LLM_PROMPT_TOKENS_SAVED.value(('cover_letter',))
+    JobAssistantService._cover_letter_prompt(job, profile, 'Acme', 'Data Engineer')
+    assert LLM_PROMPT_TOKENS_SAVED.value(('cover_letter',)) == before
+
+    JobAssistantService.generate_cover_letter(job, profile, 'Acme', 'Data Engineer')
+    assert LLM_PROMPT_TOKENS_SAVED.value(('cover_letter',)) == before + prompt.tokens_saved
+    # The second request is answered from the response cache
+    JobAssistantService.generate_cover_letter(job, profile, 'Acme', 'Data Engineer')
+    assert LLM_PROMPT_TOKENS_SAVED.value(('cover_letter',)) == before + prompt.tokens_saved
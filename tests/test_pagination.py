@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from models import GeneratedContent
+from pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+
+START = datetime(2024, 3, 1, 9, 30)
+
+
+def add_content(timestamps):
+    """GeneratedContent rows created at the given minutes after START, in insertion (id) order"""
+    for minutes in timestamps:
+        db.session.add(GeneratedContent(content_type='cover_letter', content=f'Letter {minutes}',
+                                        created_at=START + timedelta(minutes=minutes)))
+    db.session.commit()
+
+def walk(order_by, page_size):
+    """Ids of every page in order, following next_cursor from the first page"""
+    pages = []
+    cursor = None
+    while True:
+        page = keyset_page(GeneratedContent.query, order_by, key=lambda row: (row.created_at, row.id),
+                           cursor=cursor, page_size=page_size)
+        pages.append([row.id for row in page.items])
+        if not page.has_next:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_pages_split_runs_of_equal_timestamps(app):
+    with app.app_context():
+        # Five rows share one timestamp, so page boundaries fall inside the run
+        add_content([0, 5, 5, 5, 5, 5, 10, 10, 15])
+        expected = [row.id for row in sorted(GeneratedContent.query.all(),
+                                             key=lambda row: (row.created_at, row.id), reverse=True)]
+
+        pages = walk([(GeneratedContent.created_at, True), (GeneratedContent.id, True)], page_size=2)
+
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    assert [row_id for page in pages for row_id in page] == expected
+
+
+def test_pages_follow_mixed_sort_directions(app):
+    with app.app_context():
+        add_content([5, 0, 5, 10, 5, 0, 10])
+        # Oldest first, newest id first among equal timestamps
+        expected = [row.id for row in sorted(GeneratedContent.query.all(),
+                                             key=lambda row: (row.created_at, -row.id))]
+
+        pages = walk([(GeneratedContent.created_at, False), (GeneratedContent.id, True)], page_size=3)
+
+    assert [row_id for page in pages for row_id in page] == expected
+    assert len(pages) == 3
+
+
+def test_last_full_page_has_no_next_cursor(app):
+    with app.app_context():
+        add_content([0, 1, 2, 3])
+        pages = walk([(GeneratedContent.created_at, True), (GeneratedContent.id, True)], page_size=2)
+
+    assert len(pages) == 2
+
+
+def test_cursor_round_trips_datetimes():
+    values = [START, 42]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(values), 3)
+    with pytest.raises(InvalidCursor):
+        decode_cursor('not a cursor', 2)
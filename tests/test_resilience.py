@@ -0,0 +1,95 @@
+import pytest
+import gemini_service
+import resilience
+from gemini_service import GenerationError, JobAssistantService
+from llm_backends import StubBackend
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class Clock:
+    """Stands in for time.monotonic so recovery timeouts pass instantly"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+
+def test_breaker_opens_then_closes_after_a_successful_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30.0)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # After the recovery timeout a single trial call is let through
+    clock.now += 30.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    assert breaker.stats() == {'state': 'closed', 'consecutive_failures': 0, 'times_opened': 1, 'rejected': 2}
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30.0)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 30.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+
+    # The recovery timeout starts again from the failed trial
+    clock.now += 29.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_trial_lets_the_next_call_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30.0)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 30.0
+    breaker.before_call()
+    # A non-retryable error says nothing about upstream health
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_generation_retries_then_fails_fast_once_the_breaker_opens(app, monkeypatch):
+    stub = StubBackend(error_rate=1.0)
+    monkeypatch.setattr(gemini_service, 'backend', stub)
+    monkeypatch.setattr(gemini_service, 'retry_policy', RetryPolicy(max_attempts=3, base_delay=0.0))
+    monkeypatch.setattr(gemini_service, 'circuit_breaker', CircuitBreaker(failure_threshold=2))
+
+    for _ in range(2):
+        with pytest.raises(GenerationError):
+            JobAssistantService._generate_content('Describe the role', use_cache=False)
+    assert stub.calls == 6
+    assert gemini_service.retry_policy.stats() == {'calls': 2, 'retries': 4, 'exhausted': 2}
+
+    # The open breaker rejects the call without reaching the backend
+    with pytest.raises(GenerationError, match='temporarily unavailable'):
+        JobAssistantService._generate_content('Describe the role', use_cache=False)
+    assert stub.calls == 6
+    assert gemini_service.circuit_breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,209 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from llm_cache import ResponseCache
+
+# Resume text extraction runs in worker processes, so a slow or pathological
+# PDF costs a worker process (and is abandoned after EXTRACTION_TIMEOUT seconds)
+# instead of holding a request thread and the GIL.
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', 30))
+EXTRACTION_MAX_PAGES = int(os.getenv('EXTRACTION_MAX_PAGES', 50))
+
+# Extracted text is cached by a hash of the file's content, so uploading the same
+# resume again skips extraction; shared between worker processes like the LLM cache
+EXTRACTION_CACHE_PATH = os.getenv('EXTRACTION_CACHE_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'instance', 'extraction_cache.db'))
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+class ExtractionError(Exception):
+    """Raised when a file could not be read within the extraction limits"""
+
+
+def _cache_from_env():
+    directory = os.path.dirname(EXTRACTION_CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return ResponseCache(
+        path=EXTRACTION_CACHE_PATH,
+        ttl_seconds=int(os.getenv('EXTRACTION_CACHE_TTL', 30 * 24 * 3600)),
+        max_entries=int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', 1000)),
+        enabled=os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no'),
+    )
+
+extraction_cache = _cache_from_env()
+
+
+# Run in the worker processes; they open the spooled file themselves, so only
+# paths and page numbers cross the process boundary on the way in
+
+def _count_pdf_pages(path):
+    import PyPDF2
+    return len(PyPDF2.PdfReader(path).pages)
+
+def _extract_pdf_pages(path, start, stop):
+    import PyPDF2
+    pages = PyPDF2.PdfReader(path).pages
+    return [pages[number].extract_text() or '' for number in range(start, stop)]
+
+def _extract_docx(path):
+    import docx
+    return '\n'.join([paragraph.text for paragraph in docx.Document(path).paragraphs])
+
+
+class TextExtractor:
+    """Extracts text from uploaded PDF, DOCX and TXT files in a process pool.
+
+    A PDF's pages (at most ``max_pages``) are split into one contiguous range
+    per worker and extracted in parallel. Each document gets ``timeout``
+    seconds in total; when that runs out its workers are terminated, so the
+    pool is never left busy with a file nobody is waiting for. Workers start
+    the way multiprocessing's forkserver does, so scripts that extract text
+    need the usual ``if __name__ == '__main__':`` guard.
+    """
+
+    def __init__(self, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT, max_pages=EXTRACTION_MAX_PAGES,
+                 cache=None):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache = cache
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+        return self._executor
+
+    def _terminate(self, executor):
+        """Stop a pool whose workers are stuck on an abandoned document"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # ProcessPoolExecutor cannot cancel running work, so end its processes
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, calls, deadline):
+        """Run (func, *args) calls in the pool and return their results in order, or raise ExtractionError"""
+        executor = self._get_executor()
+        futures = [executor.submit(*call) for call in calls]
+        remaining = max(0.0, deadline - time.monotonic())
+        done, pending = wait(futures, timeout=remaining, return_when=FIRST_EXCEPTION)
+        if pending:
+            failed = [future for future in done if future.exception() is not None]
+            if failed:
+                for future in pending:
+                    future.cancel()
+                raise failed[0].exception()
+            self._terminate(executor)
+            raise ExtractionError('The file took too long to read. Please upload a smaller or simpler file.')
+        return [future.result() for future in futures]
+
+    def _extract_pdf(self, path, deadline):
+        page_count = self._run([(_count_pdf_pages, path)], deadline)[0]
+        if page_count > self.max_pages:
+            logging.warning(f"Resume has {page_count} pages; extracting the first {self.max_pages}")
+            page_count = self.max_pages
+
+        chunk = -(-page_count // self.workers) or 1
+        calls = [(_extract_pdf_pages, path, start, min(start + chunk, page_count))
+                 for start in range(0, page_count, chunk)]
+        # One list per worker, joined once at the end
+        return '\n'.join(text for pages in self._run(calls, deadline) for text in pages)
+
+    def extract_path(self, path, extension):
+        """Extract text from a file on disk by its extension ('pdf', 'docx', 'doc' or 'txt')"""
+        deadline = time.monotonic() + self.timeout
+        if extension == 'txt':
+            with open(path, 'rb') as f:
+                return f.read().decode('utf-8')
+        if extension == 'pdf':
+            return self._extract_pdf(path, deadline)
+        if extension in ('doc', 'docx'):
+            return self._run([(_extract_docx, path)], deadline)[0]
+        raise ValueError(f"Unsupported file type: {extension}")
+
+    def extract_upload(self, file):
+        """Extract text from an uploaded werkzeug FileStorage.
+
+        The upload is copied to a temporary file in chunks while it is hashed,
+        so it is never held in memory whole. Returns "" when the file cannot be
+        parsed and raises ExtractionError when it exceeds the time limit.
+        """
+        extension = file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
+        path, digest = spool_upload(file, suffix=f'.{extension}')
+        try:
+            # The page cap changes what is extracted, so it is part of the key
+            cache_key = (f'extract:{extension}:{self.max_pages}', digest)
+            if self.cache is not None:
+                cached = self.cache.get(*cache_key)
+                if cached is not None:
+                    logging.debug("Serving extracted resume text from the extraction cache.")
+                    return cached
+
+            try:
+                text = self.extract_path(path, extension)
+            except ExtractionError:
+                raise
+            except Exception as e:
+                logging.error(f"Error extracting text from file: {e}")
+                return ""
+
+            if text and self.cache is not None:
+                self.cache.set(*cache_key, text)
+            return text
+        finally:
+            os.unlink(path)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _mp_context():
+    # Fork workers from a small single-threaded server process rather than from
+    # the (multithreaded) web worker itself
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def spool_upload(file, suffix=''):
+    """Copy an upload to a temporary file in chunks. Returns (path, SHA-256 hex digest of the content)."""
+    digest = hashlib.sha256()
+    handle, path = tempfile.mkstemp(prefix='upload-', suffix=suffix)
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            while True:
+                chunk = file.stream.read(SPOOL_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+
+text_extractor = TextExtractor(cache=extraction_cache)
+
+
+def extract_text_from_file(file):
+    """Extract text from uploaded file"""
+    return text_extractor.extract_upload(file)